@@ -25,15 +25,24 @@
 ╚═══════════════════════════════════════════════════════════════════════════╝
 """
 
+import atexit
+import bisect
+import copy
 import json
+import marshal
 import os
 import random
 import time
 import sys
-import csv
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
-from collections import defaultdict
+import heapq
+import itertools
+import math
+import unicodedata
+import zlib
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
+from collections import OrderedDict, defaultdict
 import re
 
 # ============================================================================
@@ -70,13 +79,369 @@ class Colors:
     BG_YELLOW = '\033[43m'
     BG_BLUE = '\033[44m'
 
+# ============================================================================
+# TERMINAL RENDERING
+# ============================================================================
+
+try:
+    import termios
+except ImportError:  # Windows: prompts fall back to plain blocking input()
+    termios = None
+
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+def display_width(text: str) -> int:
+    """Terminal columns taken by text (ANSI codes ignored, wide characters count twice)"""
+    width = 0
+    for char in ANSI_ESCAPE.sub('', text).expandtabs(8):
+        if unicodedata.category(char) in ('Mn', 'Me', 'Cf'):
+            continue  # combining marks, variation selectors, zero-width joiners
+        width += 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+    return width
+
+def terminal_size(stream) -> Tuple[int, int]:
+    """(columns, rows) of the terminal behind stream, like shutil.get_terminal_size"""
+    try:
+        columns, rows = os.get_terminal_size(stream.fileno())
+    except (AttributeError, ValueError, OSError):
+        columns, rows = 0, 0
+    columns = int(os.environ.get('COLUMNS', 0) or 0) or columns or 80
+    rows = int(os.environ.get('LINES', 0) or 0) or rows or 24
+    return columns, rows
+
+class InputTimeout(Exception):
+    """Raised when a prompt's deadline passes before a line is entered"""
+    pass
+
+class TerminalInput:
+    """Line input from a terminal on an asyncio event loop
+    
+    stdin is watched through the loop's selector, so waiting for a line can be
+    cancelled exactly at a deadline and a once-a-second tick (countdowns,
+    the Pomodoro) keeps running while the user sits at a prompt.
+    """
+    
+    def __init__(self, fd: int, on_tick: Callable[[], None]):
+        self.fd = fd
+        self.on_tick = on_tick
+        self.buffer = b''
+        self.loop = None  # created on the first read, after the first screen is drawn
+    
+    def readline(self, deadline: Optional[float] = None) -> str:
+        """Next line of input; raises InputTimeout once time.time() reaches deadline"""
+        if self.loop is None:
+            import asyncio
+            self.loop = asyncio.new_event_loop()
+        return self.loop.run_until_complete(self._readline(deadline))
+    
+    async def _readline(self, deadline: Optional[float]) -> str:
+        import asyncio
+        if b'\n' not in self.buffer:
+            line_ready = self.loop.create_future()
+            
+            def on_readable():
+                data = os.read(self.fd, 4096)
+                self.buffer += data
+                if (not data or b'\n' in self.buffer) and not line_ready.done():
+                    line_ready.set_result(None)
+            
+            self.loop.add_reader(self.fd, on_readable)
+            ticker = self.loop.create_task(self._tick())
+            try:
+                timeout = None if deadline is None else max(0.0, deadline - time.time())
+                await asyncio.wait_for(line_ready, timeout)
+            except asyncio.TimeoutError:
+                # Throw away the half-typed answer, in our buffer and the terminal's
+                self.buffer = b''
+                termios.tcflush(self.fd, termios.TCIFLUSH)
+                raise InputTimeout() from None
+            finally:
+                self.loop.remove_reader(self.fd)
+                ticker.cancel()
+        
+        line, newline, self.buffer = self.buffer.partition(b'\n')
+        return (line + newline).decode('utf-8', 'replace')
+    
+    async def _tick(self):
+        """Call on_tick at each whole second"""
+        import asyncio
+        while True:
+            await asyncio.sleep(1 - time.time() % 1)
+            self.on_tick()
+
+class TerminalRenderer:
+    """Frame-buffered replacement for sys.stdout on a terminal
+    
+    clear_screen() starts a new frame; everything printed is kept in memory
+    and written in a single write when the frame is flushed (input() flushes
+    before reading). Only lines that differ from what is already on screen
+    are redrawn, using cursor addressing instead of clearing the terminal.
+    
+    Running timers are shown on a status line at the top of every frame and
+    updated in place each second while a prompt is waiting.
+    """
+    
+    def __init__(self, stream, stdin):
+        self.stream = stream
+        self.stdin = stdin
+        self.lines = ['']
+        self.shown: Optional[List[str]] = None  # None: screen contents unknown
+        self.addressable = False  # whether the shown frame fits on screen
+        self.size = None
+        self.pid = os.getpid()
+        self.encoding = getattr(stream, 'encoding', 'utf-8')
+        self.input: Optional[TerminalInput] = None  # set when prompts can time out
+        self.deadline: Optional[float] = None  # prompts raise InputTimeout after this
+        self.timers: Dict[str, list] = {}  # name -> [label, end time, on_expire]
+        self.status_shown = False
+    
+    def start_timer(self, name: str, label: str, seconds: float,
+                    on_expire: Optional[Callable[[], None]] = None):
+        """Show a countdown on the status line; on_expire runs when it reaches zero"""
+        self.timers[name] = [label, time.time() + seconds, on_expire]
+    
+    def status_line(self) -> str:
+        """Running timers as one line"""
+        now = time.time()
+        parts = []
+        for label, end, _ in self.timers.values():
+            mins, secs = divmod(max(0, int(math.ceil(end - now))), 60)
+            parts.append(f"{label} {mins:02d}:{secs:02d}")
+        return f"{Colors.BRIGHT_YELLOW}{'   '.join(parts)}{Colors.RESET}" if parts else ''
+    
+    def tick(self):
+        """Fire expired timers and redraw the status line in place"""
+        now = time.time()
+        for name, (label, end, on_expire) in list(self.timers.items()):
+            if now >= end:
+                del self.timers[name]
+                self.stream.write('\a')
+                if on_expire is not None:
+                    on_expire()
+        if self.status_shown and self.addressable and self.size == terminal_size(self.stream):
+            # Save and restore the cursor so text being typed is left alone
+            status = self.status_line()
+            if status != self.shown[0]:
+                self.stream.write(f'\x1b7\x1b[1;1H{status}\x1b[K\x1b8')
+                self.shown[0] = status
+        self.stream.flush()
+    
+    def frame(self) -> List[str]:
+        """Lines of the current frame, status line first"""
+        return ([self.status_line()] if self.timers else []) + self.lines
+    
+    def clear(self):
+        """Start a new frame"""
+        self.lines = ['']
+    
+    def write(self, text: str) -> int:
+        """Add text to the current frame"""
+        for i, part in enumerate(text.split('\n')):
+            if i:
+                self.lines.append('')
+            if '\r' in part:
+                self.lines[-1] = part.rsplit('\r', 1)[1]
+            else:
+                self.lines[-1] += part
+        return len(text)
+    
+    def readline(self) -> str:
+        """Read a line from stdin, recording the terminal's echo in the frame"""
+        if self.input is None:
+            line = self.stdin.readline()
+        else:
+            try:
+                line = self.input.readline(self.deadline)
+            except InputTimeout:
+                self.shown = None  # the half-typed answer is still on screen
+                raise
+        if line:
+            typed = line.rstrip('\n')
+            self.lines[-1] += typed
+            self.lines.append('')
+            if self.shown is not None:
+                self.shown[-1] += typed
+                self.shown.append('')
+        return line
+    
+    def isatty(self) -> bool:
+        return True
+    
+    def close(self):
+        pass  # multiprocessing children close stdin after forking
+    
+    def flush(self):
+        """Draw the current frame"""
+        if os.getpid() != self.pid:
+            return  # forked worker: the parent owns the screen
+        frame = self.render_frame()
+        if frame:
+            self.stream.write(frame)
+        self.stream.flush()
+    
+    def render_frame(self) -> str:
+        """Escape sequences and text that bring the screen up to date with the frame"""
+        lines, shown = self.frame(), self.shown
+        if shown == lines:
+            return ''
+        size = terminal_size(self.stream)
+        columns, rows = size
+        heights = [max(1, -(-display_width(line) // columns)) for line in lines]
+        
+        # Frame only grew since the last flush: write the new text at the cursor
+        if (shown is not None and size == self.size and len(shown) <= len(lines) and lines[:len(shown) - 1] == shown[:-1]
+                and lines[len(shown) - 1].startswith(shown[-1])):
+            out = '\n'.join([lines[len(shown) - 1][len(shown[-1]):]] + lines[len(shown):])
+        elif shown is None or not self.addressable or size != self.size or sum(heights) > rows:
+            # Unknown screen, or a frame too tall to address: clear and write it all
+            out = '\x1b[H\x1b[2J' + '\n'.join(lines)
+        else:
+            parts = []
+            row = 1
+            old_heights = [max(1, -(-display_width(line) // columns)) for line in shown]
+            for i, line in enumerate(lines):
+                if i < len(shown) and shown[i] == line:
+                    row += heights[i]
+                    continue
+                if i < len(shown) and old_heights[i] == heights[i]:
+                    parts.append(f'\x1b[{row};1H{line}\x1b[K')
+                    row += heights[i]
+                    continue
+                # The layout changes from here on: rewrite the rest of the frame
+                parts.append(f'\x1b[{row};1H\x1b[J' + '\n'.join(lines[i:]))
+                break
+            else:
+                if len(shown) > len(lines) and row <= rows:
+                    parts.append(f'\x1b[{row};1H\x1b[J')
+            # Leave the cursor at the end of the frame, where input will be typed
+            last_row = sum(heights) - heights[-1] + 1
+            last_col = display_width(lines[-1]) % columns + 1
+            parts.append(f'\x1b[{last_row};{last_col}H')
+            out = ''.join(parts)
+        self.shown = lines
+        self.status_shown = bool(self.timers)
+        self.addressable = sum(heights) <= rows
+        self.size = size
+        return out
+    
+    def install(self):
+        """Route sys.stdout and sys.stdin through the renderer"""
+        sys.stdout = sys.stdin = self
+    
+    def uninstall(self):
+        """Flush the last frame and restore the real streams"""
+        self.flush()
+        sys.stdout, sys.stdin = self.stream, self.stdin
+
+def use_terminal_renderer() -> Optional[TerminalRenderer]:
+    """Install the frame renderer when attached to an ANSI-capable terminal"""
+    if not (sys.stdout.isatty() and sys.stdin.isatty()) or os.environ.get('TERM') == 'dumb':
+        return None
+    renderer = TerminalRenderer(sys.stdout, sys.stdin)
+    if termios is not None:
+        renderer.input = TerminalInput(sys.stdin.fileno(), renderer.tick)
+    renderer.install()
+    return renderer
+
+def live_terminal() -> Optional[TerminalRenderer]:
+    """The active renderer, if prompts can time out and timers run in the background"""
+    renderer = sys.stdout
+    if isinstance(renderer, TerminalRenderer) and renderer.input is not None:
+        return renderer
+    return None
+
+# ============================================================================
+# SYNTAX HIGHLIGHTING
+# ============================================================================
+
+HIGHLIGHT_CACHE_SIZE = 256  # highlighted snippets kept
+
+SYNTAX_COLORS = {
+    'keyword': Colors.MAGENTA,
+    'constant': Colors.YELLOW,
+    'builtin': Colors.CYAN,
+    'definition': Colors.BRIGHT_BLUE,
+    'string': Colors.GREEN,
+    'number': Colors.YELLOW,
+    'comment': Colors.DIM,
+}
+
+_highlight_cache: 'OrderedDict[str, str]' = OrderedDict()
+
+def _syntax_tokens(code: str) -> Iterator[Tuple[int, int, str]]:
+    """(start, end, kind) spans of the tokens worth coloring, as offsets into code"""
+    import builtins
+    import keyword
+    import tokenize
+    
+    line_starts = [0]
+    for line in code.splitlines(keepends=True):
+        line_starts.append(line_starts[-1] + len(line))
+    string_parts = {tokenize.STRING} | {getattr(tokenize, name) for name in
+                                         ('FSTRING_START', 'FSTRING_MIDDLE', 'FSTRING_END') if hasattr(tokenize, name)}
+    previous = ''
+    for token in tokenize.generate_tokens(iter(code.splitlines(keepends=True)).__next__):
+        if token.type == tokenize.NAME:
+            if token.string in ('True', 'False', 'None'):
+                kind = 'constant'
+            elif keyword.iskeyword(token.string):
+                kind = 'keyword'
+            elif previous in ('def', 'class'):
+                kind = 'definition'
+            elif hasattr(builtins, token.string) and previous != '.':
+                kind = 'builtin'
+            else:
+                kind = None
+        elif token.type in string_parts:
+            kind = 'string'
+        elif token.type == tokenize.NUMBER:
+            kind = 'number'
+        elif token.type == tokenize.COMMENT:
+            kind = 'comment'
+        else:
+            kind = None
+        if token.type not in (tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT):
+            previous = token.string
+        if kind:
+            yield (line_starts[token.start[0] - 1] + token.start[1],
+                   line_starts[token.end[0] - 1] + token.end[1], kind)
+
+def highlight_code(code: str) -> str:
+    """Python source with ANSI syntax colors (memoized; plain cyan if it doesn't tokenize)"""
+    import tokenize
+    highlighted = _highlight_cache.get(code)
+    if highlighted is not None:
+        _highlight_cache.move_to_end(code)
+        return highlighted
+    try:
+        pieces = []
+        position = 0
+        for start, end, kind in _syntax_tokens(code):
+            color = SYNTAX_COLORS[kind]
+            pieces.append(code[position:start])
+            # Color each line on its own so a frame never starts inside an open color
+            pieces.append('\n'.join(f"{color}{line}{Colors.RESET}" if line else line
+                                    for line in code[start:end].split('\n')))
+            position = end
+        pieces.append(code[position:])
+        highlighted = ''.join(pieces)
+    except (SyntaxError, tokenize.TokenError):
+        highlighted = f"{Colors.CYAN}{code}{Colors.RESET}"
+    _highlight_cache[code] = highlighted
+    if len(_highlight_cache) > HIGHLIGHT_CACHE_SIZE:
+        _highlight_cache.popitem(last=False)
+    return highlighted
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
 def clear_screen():
-    """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """Clear the terminal screen (start a new frame when the renderer is active)"""
+    if isinstance(sys.stdout, TerminalRenderer):
+        sys.stdout.clear()
+    else:
+        sys.stdout.write('\033[H\033[2J')
 
 def print_header(text: str, color=Colors.CYAN):
     """Print a formatted header"""
@@ -114,6 +479,193 @@ def press_enter():
     """Wait for user to press enter"""
     input(f"\n{Colors.DIM}Press Enter to continue...{Colors.RESET}")
 
+def pause(seconds: float):
+    """Show what has been printed so far, then wait"""
+    sys.stdout.flush()
+    time.sleep(seconds)
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+METRICS_INTERVAL = 15  # seconds between textfile writes
+METRIC_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+# name -> (type, help), in export order
+METRIC_DEFINITIONS = {
+    'aws_quiz_quizzes_started_total': ('counter', "Quizzes started"),
+    'aws_quiz_quizzes_completed_total': ('counter', "Quizzes finished (all questions answered or time ran out)"),
+    'aws_quiz_answers_graded_total': ('counter', "Answers graded, by result"),
+    'aws_quiz_saves_total': ('counter', "Writes of the data file"),
+    'aws_quiz_save_seconds': ('histogram', "Time to write the data file"),
+    'aws_quiz_data_file_bytes': ('gauge', "Size of the data file after the last write"),
+    'aws_quiz_profile_load_seconds': ('histogram', "Time to build one user profile from saved data"),
+    'aws_quiz_challenge_seconds': ('histogram', "Time to run a coding challenge submission against its tests"),
+}
+
+class MetricsRegistry:
+    """In-process counters, gauges and histograms, exported in Prometheus text format
+    
+    Every thread counts into its own shard, so recording never takes a lock;
+    render() sums the shards. Labels are tuples of (name, value) pairs.
+    """
+    
+    def __init__(self):
+        self._local = None
+        self._shards: List[dict] = []
+        self.gauges: Dict[str, float] = {}
+    
+    def _new_shard(self) -> dict:
+        """The calling thread's first shard"""
+        import threading
+        if self._local is None:
+            self._local = threading.local()
+        shard = self._local.shard = {}
+        self._shards.append(shard)
+        return shard
+    
+    def inc(self, name: str, labels: tuple = (), value: float = 1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+    
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        """Record one histogram sample"""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        key = (name, labels)
+        counts = shard.get(key)
+        if counts is None:
+            counts = shard[key] = [0] * (len(METRIC_BUCKETS) + 2)  # buckets, +Inf, sum
+        counts[bisect.bisect_left(METRIC_BUCKETS, value)] += 1
+        counts[-1] += value
+    
+    def set(self, name: str, value: float):
+        self.gauges[name] = value
+    
+    def reset(self):
+        """Forget everything recorded (a forked worker inherits its parent's counts)"""
+        self._local = None
+        self._shards = []
+        self.gauges = {}
+    
+    def merge(self, totals: Dict[tuple, object], gauges: Dict[str, float]):
+        """Add another process's totals() and gauges into this registry"""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        for key, value in totals.items():
+            if isinstance(value, list):
+                counts = shard.setdefault(key, [0] * len(value))
+                for i, count in enumerate(value):
+                    counts[i] += count
+            else:
+                shard[key] = shard.get(key, 0) + value
+        self.gauges.update(gauges)
+    
+    def totals(self) -> Dict[tuple, object]:
+        """Every (name, labels) summed over the thread shards"""
+        totals = {}
+        for shard in list(self._shards):
+            for key, value in list(shard.items()):
+                if isinstance(value, list):
+                    merged = totals.setdefault(key, [0] * len(value))
+                    for i, count in enumerate(value):
+                        merged[i] += count
+                else:
+                    totals[key] = totals.get(key, 0) + value
+        return totals
+    
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        totals = self.totals()
+        by_name = defaultdict(list)
+        for (name, labels), value in sorted(totals.items()):
+            by_name[name].append((labels, value))
+        lines = []
+        for name, (kind, description) in METRIC_DEFINITIONS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'gauge':
+                if name in self.gauges:
+                    lines.append(f"{name} {self.gauges[name]:g}")
+                continue
+            samples = by_name.get(name) or [((), [0] * (len(METRIC_BUCKETS) + 2) if kind == 'histogram' else 0)]
+            for labels, value in samples:
+                if kind == 'counter':
+                    lines.append(f"{name}{format_labels(labels)} {value:g}")
+                    continue
+                cumulative = 0
+                for bound, count in zip([f"{bound:g}" for bound in METRIC_BUCKETS] + ['+Inf'], value):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {value[-1]:g}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+    
+    def write_textfile(self, path: str):
+        """Write render() for node_exporter's textfile collector (atomically, as it requires)"""
+        import threading
+        tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                f.write(self.render())
+            os.replace(tmp_file, path)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.unlink(tmp_file)
+            raise
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+METRICS = MetricsRegistry()
+
+def _metered(func: Callable, *args):
+    """Pool worker job: func(*args), plus the metrics it recorded in this process"""
+    METRICS.reset()
+    return func(*args), METRICS.totals(), dict(METRICS.gauges)
+
+def collect_metered(parts: list) -> list:
+    """Merge the metrics of _metered results into this process; returns the plain results"""
+    results = []
+    for result, totals, gauges in parts:
+        METRICS.merge(totals, gauges)
+        results.append(result)
+    return results
+
+def start_metrics_export(path: str, interval: float = METRICS_INTERVAL):
+    """Write the metrics to a textfile every interval seconds, and once more at exit"""
+    import threading
+    stop = threading.Event()
+    
+    def export():
+        while not stop.wait(interval):
+            try:
+                METRICS.write_textfile(path)
+            except OSError:
+                pass
+    
+    def finish():
+        stop.set()
+        exporter.join()  # so the last write cannot race a periodic one
+        try:
+            METRICS.write_textfile(path)
+        except OSError as e:
+            print_warning(f"Could not write metrics to {path}: {e}")
+    
+    exporter = threading.Thread(target=export, name='metrics-export', daemon=True)
+    exporter.start()
+    atexit.register(finish)
+
 # ============================================================================
 # QUESTION CLASS
 # ============================================================================
@@ -123,7 +675,7 @@ class Question:
     
     def __init__(self, week: int, difficulty: str, q_type: str, question: str,
                  options: List[str], correct: str, explanation: str, 
-                 hint: str = "", code: str = "", q_id: str = ""):
+                 hint: str = "", code: str = "", q_id: str = "", template: str = ""):
         self.week = week
         self.difficulty = difficulty  # Beginner, Intermediate, Advanced
         self.q_type = q_type  # MCQ, TrueFalse, FillBlank, CodeOutput, Coding
@@ -133,7 +685,13 @@ class Question:
         self.explanation = explanation
         self.hint = hint
         self.code = code
-        self.q_id = q_id or f"W{week}_{q_type}_{random.randint(1000, 9999)}"
+        # Stable across runs so saved progress and calibration data stay attached
+        self.q_id = q_id or f"W{week}_{q_type}_{zlib.crc32((question + code).encode('utf-8')):08x}"
+        self.template = template  # QuestionTemplate id whose variants stand in for this wording
+        
+        # Calibrated 2PL parameters (see IRTCalibrator); None until calibrated
+        self.irt_a: Optional[float] = None
+        self.irt_b: Optional[float] = None
     
     def display(self, show_hint: bool = False):
         """Display the question"""
@@ -150,9 +708,9 @@ class Question:
         
         # Display code if present
         if self.code:
-            print(f"{Colors.CYAN}```python")
-            print(self.code)
-            print(f"```{Colors.RESET}\n")
+            print(f"{Colors.CYAN}```python{Colors.RESET}")
+            print(highlight_code(self.code))
+            print(f"{Colors.CYAN}```{Colors.RESET}\n")
         
         # Display options
         if self.options:
@@ -179,6 +737,12 @@ class Question:
         else:
             return answer == correct
     
+    def irt_params(self) -> Tuple[float, float]:
+        """Return (discrimination, difficulty), falling back to the label when uncalibrated"""
+        if self.irt_b is None:
+            return 1.0, LABEL_DIFFICULTY.get(self.difficulty, 0.0)
+        return self.irt_a, self.irt_b
+    
     def to_dict(self) -> dict:
         """Convert to dictionary"""
         return {
@@ -336,6 +900,13 @@ class UserProfile:
         # Question tracking
         self.incorrect_questions = []  # List of question IDs
         self.mastered_questions = []   # Questions answered correctly multiple times
+        self.question_history = {}     # q_id -> {'attempts', 'correct', 'last_seen'}
+        self.flashcards = {}           # q_id -> SM-2 state {'interval', 'ease', 'reps', 'due'}
+        self._review_queue: Optional[ReviewQueue] = None
+        self.question_selection = 'random'  # key of QUESTION_SELECTION
+        self.question_seed = random.getrandbits(64)  # keys this user's no-repeat order
+        self.question_cursors: Dict[str, List[int]] = {}  # scope ('all' or week) -> [pass, position]
+        self._weakness_samplers: Dict[Optional[int], WeaknessSampler] = {}
         
         # Study sessions
         self.study_days = []  # List of dates
@@ -346,7 +917,8 @@ class UserProfile:
     def update_stats(self, correct: bool, week: int, question_id: str):
         """Update user statistics"""
         self.total_questions += 1
-        self.last_active = datetime.now().isoformat()
+        now = datetime.now()
+        self.last_active = now.isoformat()
         
         if correct:
             self.total_correct += 1
@@ -366,10 +938,40 @@ class UserProfile:
         
         self.week_stats[week]['attempted'] += 1
         
-        # Track study day
-        today = datetime.now().date().isoformat()
-        if today not in self.study_days:
+        # Per-question history (feeds IRT calibration)
+        history = self.question_history.setdefault(
+            question_id, {'attempts': 0, 'correct': 0, 'last_seen': None})
+        history['attempts'] += 1
+        if correct:
+            history['correct'] += 1
+        history['last_seen'] = self.last_active
+        
+        # Track study day (days are appended in order, so check the last one first)
+        today = now.date().isoformat()
+        if not self.study_days or (self.study_days[-1] != today and today not in self.study_days):
             self.study_days.append(today)
+        
+        for sampler in self._weakness_samplers.values():
+            sampler.update(question_id, week)
+    
+    @property
+    def review_queue(self) -> 'ReviewQueue':
+        """Flashcard review queue (built on first use)"""
+        if self._review_queue is None:
+            self._review_queue = ReviewQueue(self.flashcards)
+        return self._review_queue
+    
+    def weakness_sampler(self, questions: List[Question], key: Optional[int] = None) -> 'WeaknessSampler':
+        """Weighted sampler over questions (built on first use per key, e.g. per week)"""
+        sampler = self._weakness_samplers.get(key)
+        if sampler is None or sampler.questions is not questions:
+            sampler = self._weakness_samplers[key] = WeaknessSampler(self, questions)
+        return sampler
+    
+    def next_questions(self, questions: List[Question], k: int, scope: str = 'all') -> List[Question]:
+        """The next k questions of this user's no-repeat order over questions (one cursor per scope)"""
+        cursor = self.question_cursors.setdefault(scope, [0, -1])
+        return next_in_order(questions, k, self.question_seed, cursor)
     
     def get_accuracy(self) -> float:
         """Calculate accuracy percentage"""
@@ -480,6 +1082,65 @@ class UserProfile:
         for i, rec in enumerate(recommendations, 1):
             print(f"  {i}. {rec}")
     
+    def check_achievements(self) -> List[Achievement]:
+        """Award the achievements the current stats have earned; return the new ones"""
+        return self.achievements.check_achievements({
+            'total_correct': self.total_correct,
+            'best_streak': self.best_streak,
+            'perfect_quizzes': self.perfect_quizzes,
+            'coding_completed': self.coding_completed,
+            'weeks_completed': self.weeks_completed
+        })
+    
+    def summary(self) -> dict:
+        """Headline statistics, for scripts and reports"""
+        return {
+            'name': self.name,
+            'last_active': self.last_active,
+            'total_questions': self.total_questions,
+            'total_correct': self.total_correct,
+            'total_incorrect': self.total_incorrect,
+            'accuracy': round(self.get_accuracy(), 1),
+            'current_streak': self.current_streak,
+            'best_streak': self.best_streak,
+            'study_days': len(self.study_days),
+            'perfect_quizzes': self.perfect_quizzes,
+            'coding_completed': self.coding_completed,
+            'to_review': len(self.incorrect_questions),
+            'weeks': {week: dict(stats) for week, stats in self.week_stats.items()},
+        }
+    
+    def write_csv(self, filename: str):
+        """Write a progress report as CSV"""
+        import csv
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            
+            # Header
+            writer.writerow(['AWS Cloud Institute Quiz - Progress Report'])
+            writer.writerow(['User', self.name])
+            writer.writerow(['Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+            writer.writerow([])
+            
+            # Overall stats
+            writer.writerow(['Overall Statistics'])
+            writer.writerow(['Total Questions', self.total_questions])
+            writer.writerow(['Correct Answers', self.total_correct])
+            writer.writerow(['Incorrect Answers', self.total_incorrect])
+            writer.writerow(['Accuracy', f"{self.get_accuracy():.1f}%"])
+            writer.writerow(['Best Streak', self.best_streak])
+            writer.writerow([])
+            
+            # Week breakdown
+            writer.writerow(['Week', 'Attempted', 'Correct', 'Accuracy'])
+            for week in range(1, 11):
+                stats = self.week_stats[week]
+                if stats['attempted'] > 0:
+                    accuracy = (stats['correct'] / stats['attempted']) * 100
+                    writer.writerow([f"Week {week}", stats['attempted'], stats['correct'], f"{accuracy:.1f}%"])
+                else:
+                    writer.writerow([f"Week {week}", 0, 0, "N/A"])
+    
     def to_dict(self) -> dict:
         """Convert profile to dictionary"""
         return {
@@ -498,7 +1159,12 @@ class UserProfile:
             'weeks_completed': self.weeks_completed,
             'incorrect_questions': self.incorrect_questions,
             'mastered_questions': self.mastered_questions,
+            'question_history': self.question_history,
+            'flashcards': self.flashcards,
             'study_days': self.study_days,
+            'question_selection': self.question_selection,
+            'question_seed': self.question_seed,
+            'question_cursors': self.question_cursors,
             'achievements': {
                 a.name: {'earned': a.earned, 'earned_date': a.earned_date}
                 for a in self.achievements.achievements
@@ -508,6 +1174,7 @@ class UserProfile:
     @classmethod
     def from_dict(cls, data: dict) -> 'UserProfile':
         """Create profile from dictionary"""
+        start = time.perf_counter()
         profile = cls(data['name'])
         profile.created_date = data.get('created_date', datetime.now().isoformat())
         profile.last_active = data.get('last_active', datetime.now().isoformat())
@@ -519,11 +1186,19 @@ class UserProfile:
         profile.total_time_seconds = data.get('total_time_seconds', 0)
         profile.perfect_quizzes = data.get('perfect_quizzes', 0)
         profile.coding_completed = data.get('coding_completed', 0)
-        profile.week_stats = data.get('week_stats', {i: {'attempted': 0, 'correct': 0} for i in range(1, 11)})
+        # JSON turns the int week keys into strings; restore them
+        week_stats = data.get('week_stats', {})
+        profile.week_stats = {i: week_stats.get(str(i), week_stats.get(i, {'attempted': 0, 'correct': 0}))
+                              for i in range(1, 11)}
         profile.weeks_completed = data.get('weeks_completed', [])
         profile.incorrect_questions = data.get('incorrect_questions', [])
         profile.mastered_questions = data.get('mastered_questions', [])
+        profile.question_history = data.get('question_history', {})
+        profile.flashcards = data.get('flashcards', {})
         profile.study_days = data.get('study_days', [])
+        profile.question_selection = data.get('question_selection', 'random')
+        profile.question_seed = data.get('question_seed', profile.question_seed)
+        profile.question_cursors = data.get('question_cursors', {})
         
         # Restore achievements
         saved_achievements = data.get('achievements', {})
@@ -534,12 +1209,305 @@ class UserProfile:
                     achievement.earned = True
                     achievement.earned_date = ach_data['earned_date']
         
+        METRICS.observe('aws_quiz_profile_load_seconds', time.perf_counter() - start)
         return profile
 
+# ============================================================================
+# SPACED REPETITION
+# ============================================================================
+
+# Recall ratings offered after each flashcard, mapped to SM-2 quality grades
+RECALL_GRADES = {'1': ('Again', 1), '2': ('Hard', 3), '3': ('Good', 4), '4': ('Easy', 5)}
+
+def sm2_review(card: dict, grade: int, today: date) -> dict:
+    """Apply one SM-2 review (grade 0-5) to a card's scheduling state"""
+    if grade < 3:
+        card['reps'] = 0
+        card['interval'] = 1
+    else:
+        if card['reps'] == 0:
+            card['interval'] = 1
+        elif card['reps'] == 1:
+            card['interval'] = 6
+        else:
+            card['interval'] = round(card['interval'] * card['ease'])
+        card['reps'] += 1
+    card['ease'] = max(1.3, card['ease'] + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    card['due'] = (today + timedelta(days=card['interval'])).isoformat()
+    return card
+
+class ReviewQueue:
+    """Due-date priority queue over one user's flashcard states
+    
+    The heap is only built the first time cards are requested, and
+    rescheduled cards are pushed again instead of re-sorting; stale entries
+    are recognized by their due date and dropped when popped.
+    """
+    
+    def __init__(self, cards: Dict[str, dict]):
+        self.cards = cards
+        self._heap: Optional[List[Tuple[str, str]]] = None
+    
+    @property
+    def heap(self) -> List[Tuple[str, str]]:
+        """(due, q_id) min-heap, built from the card states on first access"""
+        if self._heap is None:
+            self._heap = [(card['due'], q_id) for q_id, card in self.cards.items()]
+            heapq.heapify(self._heap)
+        return self._heap
+    
+    def due(self, today: date, accept=None) -> Iterator[str]:
+        """Yield due card IDs, earliest first; cards left unreviewed stay queued"""
+        heap = self.heap
+        today_iso = today.isoformat()
+        held = []
+        try:
+            while heap and heap[0][0] <= today_iso:
+                entry = heapq.heappop(heap)
+                due, q_id = entry
+                card = self.cards.get(q_id)
+                if card is None or card['due'] != due:
+                    continue  # stale entry
+                if accept is not None and not accept(q_id):
+                    held.append(entry)
+                    continue
+                held.append(entry)
+                yield q_id
+                if card['due'] != due:
+                    held.pop()  # reviewed and rescheduled
+        finally:
+            for entry in held:
+                heapq.heappush(heap, entry)
+    
+    def review(self, q_id: str, grade: int, today: date):
+        """Record a review and reschedule the card"""
+        card = self.cards.get(q_id)
+        if card is None:
+            card = self.cards[q_id] = {'interval': 0, 'ease': 2.5, 'reps': 0, 'due': today.isoformat()}
+        sm2_review(card, grade, today)
+        heapq.heappush(self.heap, (card['due'], q_id))
+
+# ============================================================================
+# WEIGHTED SAMPLING
+# ============================================================================
+
+# Question selection modes offered in Settings: (name, description)
+QUESTION_SELECTION = {
+    'random': ("Random", "Every question equally likely"),
+    'weakness': ("Weak spots first", "Favour missed, unseen and long-unseen questions and weak weeks"),
+    'no_repeat': ("No repeats", "See every question once before any comes back"),
+}
+
+# Selection weights: missed and unseen questions come up most, mastered ones least
+WEIGHT_INCORRECT = 4.0
+WEIGHT_UNSEEN = 3.0
+WEIGHT_MASTERED = 0.25
+WEAK_WEEK_BOOST = 1.5
+STALE_DAYS = 14  # each STALE_DAYS since a question was last seen adds its base weight again
+
+class FenwickSampler:
+    """Weighted sampling without replacement over a Fenwick (binary indexed) tree
+    
+    Building is O(n); changing one weight and drawing one item are O(log n),
+    so a k-question quiz costs O(k log n) however large the bank grows.
+    """
+    
+    def __init__(self, weights: List[float]):
+        n = len(weights)
+        self.weights = array('d', weights)
+        self.tree = array('d', [0.0]) * (n + 1)
+        tree = self.tree
+        for i, weight in enumerate(self.weights, 1):
+            tree[i] += weight
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self.top = 1 << (n.bit_length() - 1) if n else 0
+    
+    def __len__(self) -> int:
+        return len(self.weights)
+    
+    @property
+    def total(self) -> float:
+        tree, i, total = self.tree, len(self.weights), 0.0
+        while i:
+            total += tree[i]
+            i -= i & -i
+        return total
+    
+    def set(self, index: int, weight: float):
+        """Change one item's weight"""
+        tree, n = self.tree, len(self.weights)
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        i = index + 1
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+    
+    def find(self, target: float) -> int:
+        """Index of the item whose slice of the cumulative weight contains target"""
+        tree, n = self.tree, len(self.weights)
+        position, step = 0, self.top
+        while step:
+            following = position + step
+            if following <= n and tree[following] <= target:
+                position = following
+                target -= tree[following]
+            step >>= 1
+        return min(position, n - 1)
+    
+    def sample(self, k: int, rng=random) -> List[int]:
+        """k distinct indices drawn in proportion to their weights (fewer if too few are weighted)"""
+        chosen, saved = [], []
+        for _ in range(4 * k):
+            if len(chosen) == k:
+                break
+            total = self.total
+            if total <= 1e-9:
+                break
+            index = self.find(rng.random() * total)
+            # Rounding in the tree can land on an item that is already drawn
+            if self.weights[index] > 0:
+                chosen.append(index)
+                saved.append(self.weights[index])
+                self.set(index, 0.0)
+        for index, weight in zip(chosen, saved):
+            self.set(index, weight)
+        return chosen
+
+class WeaknessSampler:
+    """One user's questions, drawn in proportion to how much they need them
+    
+    A question's weight comes from the profile: missed or unseen questions
+    weigh most, then its own accuracy, scaled up the longer it has not been
+    seen, down once mastered, and up again if its week is a weak week.
+    update() reweights after each answer instead of rebuilding.
+    """
+    
+    def __init__(self, profile: 'UserProfile', questions: List[Question], today: Optional[date] = None):
+        self.profile = profile
+        self.questions = questions
+        self.today = today or date.today()
+        self.position = {q.q_id: i for i, q in enumerate(questions)}
+        self.by_week = defaultdict(list)
+        for i, q in enumerate(questions):
+            self.by_week[q.week].append(i)
+        self.incorrect = set(profile.incorrect_questions)
+        self.mastered = set(profile.mastered_questions)
+        self.weak_weeks = set(profile.get_weak_weeks())
+        self.tree = FenwickSampler([self.weight(q) for q in questions])
+    
+    def weight(self, question: Question) -> float:
+        history = self.profile.question_history.get(question.q_id)
+        if question.q_id in self.incorrect:
+            weight = WEIGHT_INCORRECT
+        elif not history or not history['attempts']:
+            weight = WEIGHT_UNSEEN
+        else:
+            weight = 1.0 + 2.0 * (1 - history['correct'] / history['attempts'])
+            if question.q_id in self.mastered:
+                weight *= WEIGHT_MASTERED
+            if history.get('last_seen'):
+                days = (self.today - date.fromisoformat(history['last_seen'][:10])).days
+                weight *= 1 + min(max(days, 0), 4 * STALE_DAYS) / STALE_DAYS
+        if question.week in self.weak_weeks:
+            weight *= WEAK_WEEK_BOOST
+        return weight
+    
+    def update(self, question_id: str, week: int):
+        """Reweight after an answer: the question itself, and its week if it became (or stopped being) weak"""
+        profile = self.profile
+        for ids, members in ((profile.incorrect_questions, self.incorrect),
+                             (profile.mastered_questions, self.mastered)):
+            if question_id in ids:
+                members.add(question_id)
+            else:
+                members.discard(question_id)
+        weak_weeks = set(profile.get_weak_weeks())
+        if weak_weeks != self.weak_weeks:
+            changed = weak_weeks ^ self.weak_weeks
+            self.weak_weeks = weak_weeks
+            for changed_week in changed:
+                for i in self.by_week[changed_week]:
+                    self.tree.set(i, self.weight(self.questions[i]))
+        i = self.position.get(question_id)
+        if i is not None:
+            self.tree.set(i, self.weight(self.questions[i]))
+    
+    def sample(self, k: int, rng=random) -> List[Question]:
+        return [self.questions[i] for i in self.tree.sample(k, rng)]
+
+# ============================================================================
+# NO-REPEAT ORDER
+# ============================================================================
+
+MASK32 = 0xFFFFFFFF
+MASK64 = 0xFFFFFFFFFFFFFFFF
+FEISTEL_ROUNDS = 4
+
+def splitmix64(x: int) -> int:
+    """SplitMix64 finalizer: a fast, well-mixed 64-bit hash of an integer"""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+def feistel_permute(value: int, keys: List[int]) -> int:
+    """Keyed bijection on 64-bit integers (a balanced Feistel network)"""
+    left, right = value >> 32, value & MASK32
+    for key in keys:
+        left, right = right, left ^ (splitmix64(right ^ key) & MASK32)
+    return (left << 32) | right
+
+def question_key(question: Question) -> int:
+    """64-bit key for a question, from its stable q_id"""
+    data = question.q_id.encode('utf-8')
+    return (zlib.crc32(data) << 32) | zlib.adler32(data)
+
+def next_in_order(questions: List[Question], k: int, seed: int, cursor: List[int]) -> List[Question]:
+    """The next k questions of a user's endless no-repeat order; advances cursor in place
+    
+    Each pass is a fresh keyed permutation: a question's place in pass p is
+    feistel_permute(question_key(q), keys(seed, p)). cursor is [pass,
+    position of the last question served], so a user's state stays two
+    integers whatever the bank size. The permutation works on question keys
+    rather than bank positions, so new questions take their own place in the
+    order: this pass if it lies ahead of the cursor, otherwise the next one.
+    """
+    k = min(k, len(questions))
+    chosen = []
+    while len(chosen) < k:
+        pass_number, position = cursor
+        keys = [splitmix64(seed ^ splitmix64(pass_number * FEISTEL_ROUNDS + r)) for r in range(FEISTEL_ROUNDS)]
+        picked = {id(q) for q in chosen}
+        places = ((feistel_permute(question_key(q), keys), i) for i, q in enumerate(questions)
+                  if id(q) not in picked)
+        ahead = heapq.nsmallest(k - len(chosen), ((place, i) for place, i in places if place > position))
+        chosen.extend(questions[i] for _, i in ahead)
+        if len(chosen) < k:
+            cursor[:] = [pass_number + 1, -1]  # every question seen: start a new pass
+        else:
+            cursor[1] = ahead[-1][0]
+    return chosen
+
 # ============================================================================
 # QUESTION DATABASE
 # ============================================================================
 
+WEEK_TOPICS = {
+    1: "Python Basics",
+    2: "Control Flow",
+    3: "Lists & APIs",
+    4: "Dictionaries & Functions",
+    5: "Files & Error Handling",
+    6: "Object-Oriented Programming",
+    7: "Git & Version Control",
+    8: "Databases (SQL & DynamoDB)",
+    9: "Cloud Storage (S3 & Textract)",
+    10: "Serverless (Lambda & API Gateway)"
+}
+
 def create_question_database() -> List[Question]:
     """Create comprehensive question database"""
     questions = []
@@ -559,14 +1527,14 @@ def create_question_database() -> List[Question]:
                 'What is the output of: print(type(5.0))?',
                 ["<class 'int'>", "<class 'float'>", "<class 'str'>", "<class 'number'>"],
                 'B', '5.0 is a floating-point number, so its type is float.',
-                'The .0 indicates a decimal number'),
+                'The .0 indicates a decimal number', template='literal_type'),
         
         Question(1, 'Intermediate', 'CodeOutput',
                 'What is the output of the following code?',
                 ['5', '2', '2.5', 'Error'],
                 'B', 'The // operator performs floor division, returning only the integer part.',
                 'Look at the operator carefully - double slash',
-                'x = 5\ny = 2\nprint(x // y)'),
+                'x = 5\ny = 2\nprint(x // y)', template='floor_division'),
         
         Question(1, 'Intermediate', 'MCQ',
                 'What does the len() function return for the string "Hello"?',
@@ -610,7 +1578,7 @@ def create_question_database() -> List[Question]:
                 ['ABC', 'ABCABCABC', 'Error', 'AAA BBB CCC'],
                 'B', 'String multiplication repeats the string n times.',
                 'The * operator with strings creates repetition',
-                'print("ABC" * 3)'),
+                'print("ABC" * 3)', template='string_repeat'),
     ])
     
     # ========================================================================
@@ -642,7 +1610,8 @@ def create_question_database() -> List[Question]:
                 ['1 2 4 5', '1 2 4', '1 2 3 4 5', '1 4 5'],
                 'A', 'continue skips printing 3, break stops the loop at 5.',
                 'continue skips one iteration, break exits the loop',
-                'for i in range(1, 6):\n    if i == 3:\n        continue\n    if i == 5:\n        break\n    print(i, end=" ")'),
+                'for i in range(1, 6):\n    if i == 3:\n        continue\n    if i == 5:\n        break\n    print(i, end=" ")',
+                template='skip_and_stop'),
         
         Question(2, 'Intermediate', 'TrueFalse',
                 'A while loop always executes at least once.',
@@ -729,7 +1698,7 @@ def create_question_database() -> List[Question]:
                 ['3', '2', '4', 'Error'],
                 'A', 'Negative indices count from the end. -1 is the last element.',
                 'Negative indices count backwards',
-                'nums = [1, 2, 3, 4]\nprint(nums[-2])'),
+                'nums = [1, 2, 3, 4]\nprint(nums[-2])', template='negative_index'),
         
         Question(3, 'Beginner', 'MCQ',
                 'What does the len() function return for [1, 2, 3, 4, 5]?',
@@ -1296,107 +2265,944 @@ def create_question_database() -> List[Question]:
     return questions
 
 # ============================================================================
-# CODING CHALLENGES
+# QUESTION TEMPLATES
 # ============================================================================
 
-class CodingChallenge:
-    """Represents a coding challenge"""
+TEMPLATE_CACHE_FILE = 'template_variants.json'
+TEMPLATE_VARIANTS = 50  # cached variants per template
+TEMPLATE_BATCH = 25     # variants per task sent to a pool worker
+
+class QuestionTemplate:
+    """A question whose values are re-rolled on each use
     
-    def __init__(self, week: int, title: str, description: str, 
-                 example_input: str, example_output: str, hint: str, 
-                 test_cases: List[Tuple], solution: str):
-        self.week = week
-        self.title = title
-        self.description = description
-        self.example_input = example_input
-        self.example_output = example_output
-        self.hint = hint
-        self.test_cases = test_cases
-        self.solution = solution
+    code, question and explanation are str.format templates over the
+    variables; each variable is a list of choices, and a name like
+    'skip, halt' takes a tuple apart. The correct option is what the rendered
+    code actually prints; the others come from distractor_code (plausible
+    mistakes, run with the same values), then other rolls, then the fixed
+    distractors. Inline templates show the code inside the question text.
+    """
     
-    def display(self):
-        """Display the challenge"""
-        print_subheader(f"🔨 Coding Challenge - Week {self.week}")
-        print(f"{Colors.BOLD}{self.title}{Colors.RESET}\n")
-        print(f"{self.description}\n")
-        print(f"{Colors.CYAN}Example Input:{Colors.RESET} {self.example_input}")
-        print(f"{Colors.GREEN}Expected Output:{Colors.RESET} {self.example_output}\n")
+    def __init__(self, template_id: str, code: str, variables: Dict[str, list], explanation: str,
+                 question: str = "What is the output?", distractor_code: Tuple[str, ...] = (),
+                 distractors: Tuple[str, ...] = ('Error',), inline: bool = False):
+        self.template_id = template_id
+        self.code = code
+        self.variables = variables
+        self.explanation = explanation
+        self.question = question
+        self.distractor_code = distractor_code
+        self.distractors = distractors
+        self.inline = inline
     
-    def test_solution(self, user_code: str) -> Tuple[bool, str]:
-        """Test user's solution against test cases"""
-        try:
-            # Create a namespace for execution
-            namespace = {}
-            exec(user_code, namespace)
-            
-            # Run test cases
-            passed = 0
-            for input_data, expected in self.test_cases:
-                # Extract function name (assume first function defined)
-                func_name = [name for name in namespace if callable(namespace[name]) and not name.startswith('__')][0]
-                func = namespace[func_name]
-                
-                result = func(*input_data) if isinstance(input_data, tuple) else func(input_data)
-                
-                if result == expected:
-                    passed += 1
-                else:
-                    return False, f"Test failed: input {input_data}, expected {expected}, got {result}"
-            
-            return True, f"All {passed}/{len(self.test_cases)} tests passed!"
-        
-        except Exception as e:
-            return False, f"Error: {str(e)}"
+    @property
+    def fingerprint(self) -> int:
+        """Changes whenever the template does, so stale cached variants are dropped"""
+        return zlib.crc32(repr((self.code, self.variables, self.explanation, self.question,
+                                self.distractor_code, self.distractors, self.inline)).encode('utf-8'))
+    
+    def roll(self, rng: random.Random) -> Dict[str, str]:
+        values = {}
+        for name, choices in self.variables.items():
+            choice = rng.choice(choices)
+            if ',' in name:
+                values.update(zip((part.strip() for part in name.split(',')), map(str, choice)))
+            else:
+                values[name] = str(choice)
+        return values
 
-def create_coding_challenges() -> List[CodingChallenge]:
-    """Create coding challenges"""
-    return [
-        CodingChallenge(
-            week=3,
-            title="Remove Duplicates",
-            description="Write a function that removes duplicates from a list while preserving order.",
-            example_input="[1, 2, 2, 3, 4, 3, 5]",
-            example_output="[1, 2, 3, 4, 5]",
-            hint="Use a set to track seen items, but build a new list to preserve order.",
-            test_cases=[
-                (([1, 2, 2, 3, 4, 3, 5],), [1, 2, 3, 4, 5]),
-                (([5, 5, 5],), [5]),
-                (([ ],), []),
-            ],
-            solution="""def remove_duplicates(lst):
-    seen = set()
-    result = []
-    for item in lst:
-        if item not in seen:
-            seen.add(item)
-            result.append(item)
-    return result"""
-        ),
-        
-        CodingChallenge(
-            week=4,
-            title="Count Word Frequency",
-            description="Write a function that counts the frequency of each word in a string.",
-            example_input='"hello world hello"',
-            example_output='{"hello": 2, "world": 1}',
-            hint="Use a dictionary to track counts. Split the string into words first.",
-            test_cases=[
-                (("hello world hello",), {"hello": 2, "world": 1}),
-                (("test",), {"test": 1}),
-            ],
-            solution="""def word_frequency(text):
-    words = text.split()
-    freq = {}
-    for word in words:
-        freq[word] = freq.get(word, 0) + 1
-    return freq"""
-        ),
-        
-        CodingChallenge(
-            week=2,
-            title="FizzBuzz",
-            description="Write a function that returns 'Fizz' for multiples of 3, 'Buzz' for multiples of 5, 'FizzBuzz' for multiples of both, and the number otherwise.",
-            example_input="15",
+def run_snippet(code: str) -> str:
+    """What a snippet prints, written the way options are ('\\n' for line breaks), or 'Error'"""
+    import contextlib
+    import io
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            exec(compile(code, '<template>', 'exec'), {})
+    except Exception:
+        return 'Error'
+    return buffer.getvalue().rstrip().replace('\n', '\\n')
+
+def render_variant(template: QuestionTemplate, seed: int) -> dict:
+    """Variant number seed of a template (the same seed always gives the same variant)"""
+    rng = random.Random(f"{template.template_id}/{seed}")
+    values = template.roll(rng)
+    code = template.code.format(**values)
+    correct = run_snippet(code)
+    options = [correct]
+    
+    def offer(option: str):
+        if option not in options and len(options) < 4:
+            options.append(option)
+    
+    for alternative in template.distractor_code:
+        offer(run_snippet(alternative.format(**values)))
+    for _ in range(20):
+        if len(options) == 4:
+            break
+        offer(run_snippet(template.code.format(**template.roll(rng))))
+    for option in template.distractors:
+        offer(option)
+    rng.shuffle(options)
+    
+    fields = dict(values, code=code, output=correct)
+    return {
+        'question': template.question.format(**fields),
+        'code': '' if template.inline else code,
+        'options': options,
+        'correct': chr(65 + options.index(correct)),
+        'explanation': template.explanation.format(**fields),
+    }
+
+class VariantCache:
+    """Rendered template variants by (template, seed), saved as JSON
+    
+    The file maps template_id -> {'fingerprint', 'variants'}, where a
+    variant's seed is its position in the list.
+    """
+    
+    def __init__(self, path: str = TEMPLATE_CACHE_FILE):
+        self.path = path
+        self._entries: Optional[Dict[str, dict]] = None
+    
+    @property
+    def entries(self) -> Dict[str, dict]:
+        """Cached entries (loaded on first use)"""
+        if self._entries is None:
+            try:
+                with open(self.path, 'r') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+    
+    def variants(self, template: QuestionTemplate) -> List[dict]:
+        """Cached variants of a template, or [] if none (or only stale ones) are cached"""
+        entry = self.entries.get(template.template_id)
+        if entry is None or entry['fingerprint'] != template.fingerprint:
+            return []
+        return entry['variants']
+    
+    def get(self, template: QuestionTemplate, seed: int) -> Optional[dict]:
+        variants = self.variants(template)
+        return variants[seed] if seed < len(variants) else None
+    
+    def missing(self, templates: List[QuestionTemplate], count: int = TEMPLATE_VARIANTS) -> List[Tuple[QuestionTemplate, int]]:
+        """(template, seed) jobs still to render"""
+        return [(template, seed) for template in templates
+                for seed in range(len(self.variants(template)), count)]
+    
+    def store(self, jobs: List[Tuple[QuestionTemplate, int]], results: List[dict]):
+        for (template, seed), variant in zip(jobs, results):
+            entry = self.entries.get(template.template_id)
+            if entry is None or entry['fingerprint'] != template.fingerprint:
+                entry = self.entries[template.template_id] = {'fingerprint': template.fingerprint, 'variants': []}
+            if seed == len(entry['variants']):
+                entry['variants'].append(variant)
+    
+    def save(self):
+        tmp_file = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_file, self.path)
+    
+    def fill(self, templates: List[QuestionTemplate], count: int = TEMPLATE_VARIANTS, workers: int = 1) -> int:
+        """Render every missing variant (in a worker pool if workers > 1) and save; returns how many"""
+        jobs = self.missing(templates, count)
+        if not jobs:
+            return 0
+        if workers > 1:
+            import multiprocessing
+            with multiprocessing.Pool(workers) as pool:
+                results = pool.starmap(render_variant, jobs, chunksize=TEMPLATE_BATCH)
+        else:
+            results = [render_variant(template, seed) for template, seed in jobs]
+        self.store(jobs, results)
+        self.save()
+        return len(jobs)
+
+def create_question_templates() -> Dict[str, QuestionTemplate]:
+    """Templates behind the bank questions marked with template=..."""
+    templates = [
+        QuestionTemplate(
+            'literal_type', 'print(type({value}))',
+            {'value': ['5', '5.0', '"5"', 'True', '[5]', '(5,)', '{5}', 'None', '5j', "{'a': 5}",
+                       "'5.0'", '5e0', '-5', '0.5', 'False', '[]', '()', '""']},
+            "type() returns the class of the value it is given, so {value} gives {output}.",
+            question="What is the output of: {code}?", distractors=("<class 'number'>",), inline=True),
+        QuestionTemplate(
+            'floor_division', 'x = {x}\ny = {y}\nprint(x // y)',
+            {'x': list(range(7, 30)), 'y': [2, 3, 4, 5, 6]},
+            "The // operator performs floor division: {x} // {y} is {output}, the remainder is dropped.",
+            question="What is the output of the following code?",
+            distractor_code=('print({x} / {y})', 'print({x} % {y})', 'print({x} // {y} + 1)')),
+        QuestionTemplate(
+            'string_repeat', 'print("{text}" * {n})',
+            {'text': ['ABC', 'Hi', 'xy', 'Go', 'ab', 'XYZ'], 'n': [2, 3, 4]},
+            "String multiplication repeats the string {n} times.",
+            distractor_code=('print("{text}" * ({n} - 1))', 'print("{text}" + "{n}")', 'print(*"{text}" * {n})')),
+        QuestionTemplate(
+            'negative_index', 'nums = {nums}\nprint(nums[{i}])',
+            {'nums': [[1, 2, 3, 4], [10, 20, 30, 40, 50], [5, 8, 13, 21], [7, 14, 21, 28, 35, 42], [3, 1, 4, 1, 5]],
+             'i': [-1, -2, -3]},
+            "Negative indices count back from the end, -1 being the last element, so nums[{i}] is {output}.",
+            distractor_code=('print({nums}[{i} - 1])', 'print({nums}[{i} + 1])', 'print({nums}[-({i}) - 1])')),
+        QuestionTemplate(
+            'skip_and_stop',
+            'for i in range(1, {stop}):\n    if i == {skip}:\n        continue\n'
+            '    if i == {halt}:\n        break\n    print(i, end=" ")',
+            {'stop': [6, 7, 8], 'skip, halt': [(2, 4), (2, 5), (3, 5), (3, 6), (4, 6), (2, 6)]},
+            "continue skips printing {skip}; break ends the loop once i reaches {halt} (if it gets that far).",
+            distractor_code=(
+                'for i in range(1, {stop}):\n    if i == {skip}:\n        break\n'
+                '    if i == {halt}:\n        continue\n    print(i, end=" ")',
+                'for i in range(1, {stop}):\n    if i == {halt}:\n        break\n    print(i, end=" ")',
+                'for i in range(1, {stop}):\n    if i == {skip}:\n        continue\n    print(i, end=" ")')),
+    ]
+    return {template.template_id: template for template in templates}
+
+# ============================================================================
+# SANDBOXED EXECUTION
+# ============================================================================
+
+try:
+    import resource  # POSIX only; limits are skipped elsewhere
+except ImportError:
+    resource = None
+
+def find_solution_function(namespace: dict):
+    """Return the function a submission defines (the first public callable)"""
+    for name, value in namespace.items():
+        if callable(value) and not name.startswith('__'):
+            return value
+    raise ValueError("No function defined in your solution")
+
+def _load_function(code):
+    """Execute a submission (source or marshaled code) in a fresh namespace and return its function"""
+    namespace = {}
+    exec(marshal.loads(code) if isinstance(code, bytes) else compile(code, '<submission>', 'exec'), namespace)
+    return find_solution_function(namespace)
+
+def _run_test_case(code: str, input_data, expected) -> Tuple[str, Optional[str]]:
+    """Worker job: run one test case"""
+    func = _load_function(code)
+    result = func(*input_data) if isinstance(input_data, tuple) else func(input_data)
+    return ('pass', None) if result == expected else ('fail', repr(result))
+
+def _time_call(func, args: tuple, min_time: float = 0.01, repeat: int = 3) -> float:
+    """Best per-call time, timeit-style (autoranged loop count, best of repeat)
+    
+    Every call gets its own deep copy of args, made before the clock starts,
+    so solutions that consume their input are timed on the real input size.
+    """
+    def run(number: int) -> float:
+        batch = [copy.deepcopy(args) for _ in range(number)]
+        start = time.perf_counter()
+        for call_args in batch:
+            func(*call_args)
+        return time.perf_counter() - start
+    
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed >= min_time or number >= 1 << 16:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        if best > 5 * min_time:
+            break  # slow calls are already well above timer noise
+        best = min(best, run(number))
+    return best / number
+
+def _peak_memory(func, args: tuple) -> int:
+    """Peak bytes allocated by one call, via tracemalloc"""
+    import tracemalloc
+    args = copy.deepcopy(args)
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _run_benchmark(code: str, reference: str, inputs: List[Tuple[int, tuple]],
+                   max_call_seconds: float = 0.5) -> List[Tuple[int, float, float, int, int]]:
+    """Worker job: time and measure both functions on inputs of growing size
+    
+    Returns (size, user time, reference time, user peak, reference peak) rows;
+    stops growing once a user call takes longer than max_call_seconds.
+    """
+    user_func = _load_function(code)
+    ref_func = _load_function(reference)
+    rows = []
+    for size, args in inputs:
+        # The timing and memory helpers copy args per call, in case a function mutates them
+        user_time = _time_call(user_func, args)
+        ref_time = _time_call(ref_func, args)
+        rows.append((size, user_time, ref_time, _peak_memory(user_func, args), _peak_memory(ref_func, args)))
+        if user_time > max_call_seconds:
+            break
+    return rows
+
+def _shrink_candidates(value):
+    """Smaller variants of a generated value, most aggressive first"""
+    if isinstance(value, bool):
+        return
+    if isinstance(value, int):
+        # Shrink towards +/-1 rather than 0, which is often outside the input domain
+        if abs(value) > 1:
+            yield 1 if value > 0 else -1
+            yield int(value / 2)
+            yield value - 1 if value > 0 else value + 1
+    elif isinstance(value, str):
+        words = value.split(' ')
+        if len(words) > 1:
+            for variant in _shrink_candidates(words):
+                yield ' '.join(variant)
+        elif value:
+            yield ''
+            yield value[:len(value) // 2]
+            yield value[1:]
+    elif isinstance(value, (list, tuple)):
+        chunk = len(value) // 2
+        while chunk >= 1:
+            for start in range(0, len(value), chunk):
+                yield value[:start] + value[start + chunk:]
+            chunk //= 2
+        for i, item in enumerate(value):
+            for smaller in _shrink_candidates(item):
+                yield value[:i] + type(value)((smaller,)) + value[i + 1:]
+
+def _compare(user_func, ref_func, args: tuple) -> Optional[Tuple[str, str]]:
+    """None if the functions agree (or the input is invalid for the reference), else (expected, got)"""
+    try:
+        expected = ref_func(*copy.deepcopy(args))
+    except Exception:
+        return None
+    try:
+        got = user_func(*copy.deepcopy(args))
+        if got == expected:
+            return None
+        got_text = repr(got)
+    except Exception as e:
+        got_text = f"{type(e).__name__}: {e}"
+    return _truncate(repr(expected)), _truncate(got_text)
+
+def _truncate(text: str, limit: int = 200) -> str:
+    """Shorten long reprs for display"""
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+def _run_differential(code: str, reference: str, inputs: List[tuple], budget: int = 2000):
+    """Worker job: compare both functions on every input and shrink the first mismatch
+    
+    Returns ('pass', count) or ('fail', (input, expected, got)).
+    """
+    user_func = _load_function(code)
+    ref_func = _load_function(reference)
+    for args in inputs:
+        if _compare(user_func, ref_func, args) is None:
+            continue
+        
+        # Greedy shrink: take any smaller argument tuple that still fails
+        improved = True
+        while improved and budget > 0:
+            improved = False
+            for i, value in enumerate(args):
+                for smaller in _shrink_candidates(value):
+                    budget -= 1
+                    candidate = args[:i] + (smaller,) + args[i + 1:]
+                    if _compare(user_func, ref_func, candidate) is not None:
+                        args, improved = candidate, True
+                        break
+                    if budget <= 0:
+                        break
+                if improved or budget <= 0:
+                    break
+        expected, got = _compare(user_func, ref_func, args)
+        return 'fail', (args, expected, got)
+    return 'pass', len(inputs)
+
+def _run_grade(code: str, test_cases: List[Tuple], reference: str, inputs: List[tuple]):
+    """Worker job: full verdict for one submission as (verdict, failing case, seconds)"""
+    start = time.perf_counter()
+    try:
+        for input_data, expected in test_cases:
+            status, detail = _run_test_case(code, input_data, expected)
+            if status == 'fail':
+                return 'fail', f"input {input_data}, expected {expected}, got {detail}", time.perf_counter() - start
+        if inputs:
+            status, detail = _run_differential(code, reference, inputs)
+            if status == 'fail':
+                args, expected, got = detail
+                return 'fail', f"input {args}, expected {expected}, got {got}", time.perf_counter() - start
+    except MemoryError:
+        return 'error', "Memory limit exceeded", time.perf_counter() - start
+    except Exception as e:
+        return 'error', f"{type(e).__name__}: {e}", time.perf_counter() - start
+    return 'pass', '', time.perf_counter() - start
+
+SANDBOX_JOBS = {'test': _run_test_case, 'bench': _run_benchmark, 'diff': _run_differential,
+                'grade': _run_grade}
+
+def _sandbox_worker(conn, memory_mb: int):
+    """Worker loop: run (kind, cpu_seconds, args) jobs under rlimits"""
+    if resource is not None and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+    
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        kind, cpu_seconds, args = job
+        
+        if resource is not None and cpu_seconds:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            used = int(usage.ru_utime + usage.ru_stime) + 1
+            hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+            soft = used + cpu_seconds
+            try:
+                resource.setrlimit(resource.RLIMIT_CPU, (soft if hard < 0 else min(soft, hard), hard))
+            except (ValueError, OSError):
+                pass
+        
+        try:
+            reply = SANDBOX_JOBS[kind](*args)
+        except MemoryError:
+            reply = ('error', "Memory limit exceeded")
+        except BaseException as e:
+            reply = ('error', f"{type(e).__name__}: {e}" if str(e) else type(e).__name__)
+        try:
+            conn.send(reply)
+        except (OSError, ValueError):
+            return
+
+class SandboxPool:
+    """Pre-forked worker processes that run untrusted submissions
+    
+    Each test case runs in its own warm worker with a wall-clock timeout and
+    CPU/memory rlimits; a worker that overruns or dies is replaced. Jobs
+    carry their code first, and a worker is also replaced before it runs a
+    different submission, since the last one may have patched builtins or
+    module state.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, timeout: float = 2.0,
+                 cpu_seconds: int = 2, memory_mb: int = 512):
+        self.size = workers or max(2, min(4, os.cpu_count() or 1))
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self._workers: List[Optional[Tuple['multiprocessing.Process', object]]] = [None] * self.size
+        self._ran: List[object] = [None] * self.size  # code each worker has run, if any
+    
+    def _spawn(self, slot: int):
+        """Start a fresh worker in the given slot"""
+        import multiprocessing
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_sandbox_worker, args=(child_conn, self.memory_mb),
+                                          daemon=True)
+        process.start()
+        child_conn.close()
+        self._workers[slot] = (process, parent_conn)
+        self._ran[slot] = None
+    
+    def _kill(self, slot: int):
+        """Terminate the worker in a slot (it is respawned on next use)"""
+        worker = self._workers[slot]
+        self._workers[slot] = None
+        if worker:
+            process, conn = worker
+            process.kill()
+            process.join()
+            conn.close()
+    
+    def start(self):
+        """Pre-fork every worker"""
+        for slot in range(self.size):
+            if self._workers[slot] is None or not self._workers[slot][0].is_alive():
+                self._spawn(slot)
+    
+    def map(self, kind: str, jobs: List[tuple], timeout: Optional[float] = None) -> list:
+        """Run jobs in parallel across the workers; return the replies in job order
+        
+        A job that overruns its wall-clock timeout yields ('timeout', None) and
+        one whose worker dies (or cannot be sent the job) yields ('crash', detail).
+        """
+        import multiprocessing.connection
+        self.start()
+        timeout = timeout or self.timeout
+        cpu_seconds = max(self.cpu_seconds, int(math.ceil(timeout)))
+        results: list = [None] * len(jobs)
+        pending = list(range(len(jobs)))
+        running = {}  # slot -> (job index, deadline)
+        
+        while pending or running:
+            # Hand queued jobs to idle workers
+            for slot in range(self.size):
+                if not pending:
+                    break
+                if slot in running:
+                    continue
+                job = pending.pop(0)
+                code = jobs[job][0]
+                if self._ran[slot] is not None and self._ran[slot] != code:
+                    self._kill(slot)
+                if self._workers[slot] is None:
+                    self._spawn(slot)
+                self._ran[slot] = code
+                try:
+                    self._workers[slot][1].send((kind, cpu_seconds, jobs[job]))
+                except (OSError, ValueError) as e:
+                    results[job] = ('crash', f"Could not send job: {e}")
+                    self._kill(slot)
+                    continue
+                running[slot] = (job, time.monotonic() + timeout)
+            
+            # Wait for the next reply or the nearest deadline
+            if not running:
+                continue
+            wait_for = max(0.0, min(deadline for _, deadline in running.values()) - time.monotonic())
+            ready = multiprocessing.connection.wait([self._workers[s][1] for s in running], wait_for)
+            for slot in list(running):
+                job, deadline = running[slot]
+                conn = self._workers[slot][1]
+                if conn in ready:
+                    try:
+                        results[job] = conn.recv()
+                    except (EOFError, OSError):
+                        results[job] = ('crash', None)
+                        self._kill(slot)
+                    del running[slot]
+                elif time.monotonic() >= deadline:
+                    results[job] = ('timeout', None)
+                    self._kill(slot)
+                    del running[slot]
+        
+        return results
+    
+    def run(self, code: str, test_cases: List[Tuple]) -> List[Tuple[str, Optional[str]]]:
+        """Run every test case in parallel; return (status, detail) per case in order
+        
+        status is 'pass', 'fail' (detail is repr of the result), 'error',
+        'timeout' or 'crash'.
+        """
+        return self.map('test', [(code, input_data, expected) for input_data, expected in test_cases])
+    
+    def call(self, kind: str, args: tuple, timeout: float):
+        """Run a single job; return its reply, ('timeout', None) or ('crash', None)"""
+        return self.map(kind, [args], timeout)[0]
+    
+    def close(self):
+        """Shut every worker down"""
+        for slot, worker in enumerate(self._workers):
+            if worker:
+                try:
+                    worker[1].send(None)
+                except (OSError, ValueError):
+                    pass
+                self._kill(slot)
+
+# Replies that depend on the machine (load, a dying worker) rather than the code; never cached
+TRANSIENT_STATUSES = ('timeout', 'crash')
+
+# Differential testing: generated inputs per run and wall-clock budget per batch
+DIFF_TEST_COUNT = 2000
+DIFF_TIMEOUT = 5.0
+
+# Performance judging: input sizes, overall time budget and failure thresholds
+PERF_SIZES = (1000, 2000, 4000, 8000, 16000)
+PERF_TIMEOUT = 10.0
+PERF_EXPONENT_SLACK = 0.5
+PERF_RATIO_LIMIT = 4.0
+
+_sandbox_pool: Optional[SandboxPool] = None
+
+def get_sandbox_pool() -> SandboxPool:
+    """Shared sandbox pool, started on first use"""
+    global _sandbox_pool
+    if _sandbox_pool is None:
+        _sandbox_pool = SandboxPool()
+        _sandbox_pool.start()
+        atexit.register(_sandbox_pool.close)
+    return _sandbox_pool
+
+# ============================================================================
+# SUBMISSION CACHE
+# ============================================================================
+
+SUBMISSION_CACHE_DIR = '.submission_cache'
+SUBMISSION_CACHE_BYTES = 8 * 1024 * 1024
+
+def submission_digest(source: str) -> str:
+    """Hash of a submission's normalized AST, so comments and formatting don't matter"""
+    import ast
+    import hashlib
+    return hashlib.sha256(ast.dump(ast.parse(source)).encode('utf-8')).hexdigest()
+
+class SubmissionCache:
+    """Persistent LRU cache of compiled submissions and their verdicts
+    
+    Code objects are stored marshaled (one file per digest and interpreter
+    version) and verdicts live in a JSON index; least recently used entries
+    are evicted once the cache grows past max_bytes. Lookups only update the
+    index in memory; save() writes it, once per grading batch and at exit.
+    """
+    
+    def __init__(self, directory: str = SUBMISSION_CACHE_DIR, max_bytes: int = SUBMISSION_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(directory, 'index.json')
+        self._index: Optional[Dict[str, dict]] = None
+        self._bytes = 0
+        self._dirty = False
+    
+    @property
+    def index(self) -> Dict[str, dict]:
+        """digest -> {'size', 'last_used', 'verdicts'} (loaded on first use)"""
+        if self._index is None:
+            try:
+                with open(self.index_file, 'r') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+            self._bytes = sum(entry.get('size', 0) for entry in self._index.values())
+        return self._index
+    
+    def _code_path(self, digest: str) -> str:
+        """File holding the marshaled code object for this interpreter"""
+        return os.path.join(self.directory, f"{digest}.{sys.implementation.cache_tag}.bin")
+    
+    def compile(self, source: str) -> Tuple[str, bytes]:
+        """Return (digest, marshaled code object), compiling only on a cache miss
+        
+        Raises SyntaxError (or ValueError) for source that does not compile.
+        """
+        digest = submission_digest(source)
+        entry = self.index.get(digest)
+        if entry is not None:
+            try:
+                with open(self._code_path(digest), 'rb') as f:
+                    code = f.read()
+                self._touch(entry)
+                return digest, code
+            except OSError:
+                pass
+        
+        code = marshal.dumps(compile(source, '<submission>', 'exec'))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._code_path(digest), 'wb') as f:
+                f.write(code)
+        except OSError:
+            pass  # read-only location: behave as an in-memory cache
+        entry = self.index.setdefault(digest, {'verdicts': {}})
+        entry['code_size'] = len(code)
+        self._resize(digest)
+        return digest, code
+    
+    def get_verdict(self, digest: str, key: str):
+        """Cached verdict for a check of this submission, or None"""
+        entry = self.index.get(digest)
+        if entry is None or key not in entry['verdicts']:
+            return None
+        self._touch(entry)
+        return entry['verdicts'][key]
+    
+    def put_verdict(self, digest: str, key: str, verdict):
+        """Remember a (JSON-serializable) verdict"""
+        entry = self.index.setdefault(digest, {'verdicts': {}, 'code_size': 0})
+        entry['verdicts'][key] = verdict
+        self._resize(digest)
+    
+    def _touch(self, entry: dict):
+        """Mark an entry as used (in memory only)"""
+        entry['last_used'] = time.time()
+        self._dirty = True
+    
+    def _resize(self, digest: str):
+        """Recount a changed entry's size and evict least recently used entries if over budget"""
+        entry = self.index[digest]
+        size = entry.get('code_size', 0) + len(json.dumps(entry['verdicts']))
+        self._bytes += size - entry.get('size', 0)
+        entry['size'] = size
+        self._touch(entry)
+        if self._bytes <= self.max_bytes:
+            return
+        for old in sorted(self.index, key=lambda d: self.index[d]['last_used']):
+            if self._bytes <= self.max_bytes:
+                break
+            if old == digest:
+                continue
+            self._bytes -= self.index.pop(old)['size']
+            try:
+                os.remove(self._code_path(old))
+            except OSError:
+                pass
+    
+    def save(self):
+        """Write the index atomically, if anything changed since the last save"""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.index, f)
+            os.replace(tmp_file, self.index_file)
+            self._dirty = False
+        except OSError:
+            pass
+
+_submission_cache: Optional[SubmissionCache] = None
+
+def get_submission_cache() -> SubmissionCache:
+    """Shared submission cache"""
+    global _submission_cache
+    if _submission_cache is None:
+        _submission_cache = SubmissionCache()
+        atexit.register(_submission_cache.save)
+    return _submission_cache
+
+# ============================================================================
+# CODING CHALLENGES
+# ============================================================================
+
+class TransientVerdict(tuple):
+    """A check result caused by a timeout or crash rather than the code itself; never cached"""
+
+class CodingChallenge:
+    """Represents a coding challenge"""
+    
+    def __init__(self, week: int, title: str, description: str, 
+                 example_input: str, example_output: str, hint: str, 
+                 test_cases: List[Tuple], solution: str,
+                 input_generator: Optional[Callable[[int, random.Random], tuple]] = None):
+        self.week = week
+        self.title = title
+        self.description = description
+        self.example_input = example_input
+        self.example_output = example_output
+        self.hint = hint
+        self.test_cases = test_cases
+        self.solution = solution
+        self.input_generator = input_generator  # (size, rng) -> argument tuple
+    
+    def display(self):
+        """Display the challenge"""
+        print_subheader(f"🔨 Coding Challenge - Week {self.week}")
+        print(f"{Colors.BOLD}{self.title}{Colors.RESET}\n")
+        print(f"{self.description}\n")
+        print(f"{Colors.CYAN}Example Input:{Colors.RESET} {self.example_input}")
+        print(f"{Colors.GREEN}Expected Output:{Colors.RESET} {self.example_output}\n")
+    
+    @property
+    def fingerprint(self) -> str:
+        """Digest of the test cases and reference solution, so editing either invalidates cached verdicts"""
+        import hashlib
+        return hashlib.sha256(repr((self.test_cases, self.solution)).encode('utf-8')).hexdigest()[:16]
+    
+    def _cached_check(self, user_code: str, check: str, run: Callable, error: Callable):
+        """Run a check on the compiled submission, reusing any cached verdict"""
+        cache = get_submission_cache()
+        try:
+            digest, code = cache.compile(user_code)
+        except (SyntaxError, ValueError) as e:
+            return error(f"Error: {type(e).__name__}: {e}")
+        key = f"{self.title}/{self.fingerprint}/{check}"
+        verdict = cache.get_verdict(digest, key)
+        if verdict is None:
+            verdict = run(code)
+            if not isinstance(verdict, TransientVerdict):
+                cache.put_verdict(digest, key, verdict)
+        return tuple(verdict)
+    
+    def test_solution(self, user_code: str) -> Tuple[bool, str]:
+        """Test user's solution against test cases (cached by normalized AST)"""
+        return self._cached_check(user_code, 'tests', self._run_tests, lambda message: (False, message))
+    
+    def _run_tests(self, user_code) -> Tuple[bool, str]:
+        """Run the test cases in the sandbox pool"""
+        pool = get_sandbox_pool()
+        start = time.perf_counter()
+        results = pool.run(user_code, self.test_cases)
+        METRICS.observe('aws_quiz_challenge_seconds', time.perf_counter() - start)
+        
+        for (input_data, expected), (status, detail) in zip(self.test_cases, results):
+            if status == 'fail':
+                return False, f"Test failed: input {input_data}, expected {expected}, got {detail}"
+            if status == 'error':
+                return False, f"Error: {detail}"
+            if status == 'timeout':
+                return TransientVerdict((False, f"Time limit exceeded ({pool.timeout:g}s) on input {input_data}"))
+            if status == 'crash':
+                return TransientVerdict((False, f"Solution crashed (CPU or memory limit exceeded) "
+                                                f"on input {input_data}"))
+        
+        return True, f"All {len(self.test_cases)}/{len(self.test_cases)} tests passed!"
+    
+    def differential_test(self, user_code: str, count: int = DIFF_TEST_COUNT,
+                          seed: Optional[int] = None) -> Tuple[bool, str]:
+        """Compare the solution with the reference on generated inputs (differential testing)"""
+        if self.input_generator is None:
+            return True, "No generated tests for this challenge"
+        return self._cached_check(user_code, f"generated/{count}/{seed}",
+                                  lambda code: self._run_differential(code, count, seed),
+                                  lambda message: (False, message))
+    
+    def _run_differential(self, user_code, count: int, seed: Optional[int]) -> Tuple[bool, str]:
+        """Run the differential test batches in the sandbox pool"""
+        if self.input_generator is None:
+            return True, "No generated tests for this challenge"
+        
+        # Edge-case sizes first, then random sizes skewed towards small inputs
+        rng = random.Random(seed)
+        sizes = [0, 1, 2, 3] + [int(rng.expovariate(1 / 16)) for _ in range(count - 4)]
+        inputs = [self.input_generator(n, rng) for n in sizes]
+        
+        pool = get_sandbox_pool()
+        batch = -(-len(inputs) // pool.size)
+        jobs = [(user_code, self.solution, inputs[i:i + batch]) for i in range(0, len(inputs), batch)]
+        replies = pool.map('diff', jobs, timeout=DIFF_TIMEOUT)
+        
+        failures = []
+        for status, detail in replies:
+            if status == 'fail':
+                failures.append(detail)
+            elif status == 'timeout':
+                return TransientVerdict((False, f"Generated tests timed out after {DIFF_TIMEOUT:g}s"))
+            elif status == 'crash':
+                return TransientVerdict((False, "Solution crashed (CPU or memory limit exceeded) on generated tests"))
+            elif status == 'error':
+                return False, f"Error: {detail}"
+        if failures:
+            args, expected, got = min(failures, key=lambda f: len(repr(f[0])))
+            return False, f"Generated test failed: input {args}, expected {expected}, got {got}"
+        return True, f"All {len(inputs):,} generated tests match the reference solution"
+    
+    def judge_performance(self, user_code: str, sizes: Tuple[int, ...] = PERF_SIZES,
+                          seed: int = 0) -> Tuple[bool, str, List[Tuple[int, float, float, int, int]]]:
+        """Compare the solution's empirical growth against the reference solution
+        
+        Returns (passed, message, rows) where rows are (size, user time,
+        reference time, user peak bytes, reference peak bytes).
+        """
+        if self.input_generator is None:
+            return True, "No performance test for this challenge", []
+        passed, message, rows = self._cached_check(
+            user_code, f"performance/{','.join(map(str, sizes))}/{seed}",
+            lambda code: self._run_performance(code, sizes, seed),
+            lambda message: (False, message, []))
+        return passed, message, [tuple(row) for row in rows]
+    
+    def _run_performance(self, user_code, sizes: Tuple[int, ...],
+                         seed: int) -> Tuple[bool, str, List[Tuple[int, float, float, int, int]]]:
+        """Run the benchmark job in the sandbox pool and judge its growth"""
+        rng = random.Random(seed)
+        inputs = [(n, self.input_generator(n, rng)) for n in sizes]
+        pool = get_sandbox_pool()
+        reply = pool.call('bench', (user_code, self.solution, inputs), timeout=PERF_TIMEOUT)
+        if not isinstance(reply, list):
+            status, detail = reply
+            if status == 'timeout':
+                return TransientVerdict((False, f"Performance test timed out after {PERF_TIMEOUT:g}s", []))
+            if status == 'crash':
+                return TransientVerdict((False, "Solution crashed during the performance test", []))
+            return False, f"Error: {detail}", []
+        
+        rows = reply
+        if len(rows) < len(sizes):
+            return False, (f"Too slow: one call on {rows[-1][0]:,} items took "
+                           f"{rows[-1][1] * 1000:.0f} ms"), rows
+        
+        user_exp = growth_exponent([r[0] for r in rows], [r[1] for r in rows])
+        ref_exp = growth_exponent([r[0] for r in rows], [r[2] for r in rows])
+        ratio = rows[-1][1] / rows[-1][2] if rows[-1][2] > 0 else float('inf')
+        summary = (f"Your growth ~{complexity_label(user_exp)} (n^{user_exp:.2f}), "
+                   f"reference ~{complexity_label(ref_exp)} (n^{ref_exp:.2f}); "
+                   f"{ratio:.1f}x the reference time at n={rows[-1][0]:,}")
+        if user_exp > ref_exp + PERF_EXPONENT_SLACK and ratio > PERF_RATIO_LIMIT:
+            return False, f"Asymptotically slower than the reference. {summary}", rows
+        return True, summary, rows
+
+def growth_exponent(sizes: List[int], times: List[float]) -> float:
+    """Least-squares slope of log(time) against log(size)"""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in times]
+    if len(xs) < 2:
+        return 0.0
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    sxx = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx if sxx else 0.0
+
+def complexity_label(exponent: float) -> str:
+    """Nearest familiar complexity class for an empirical growth exponent"""
+    if exponent < 0.4:
+        return "O(1)"
+    if exponent < 1.4:
+        return "O(n)"
+    if exponent < 2.4:
+        return "O(n²)"
+    return "O(n³+)"
+
+def create_coding_challenges() -> List[CodingChallenge]:
+    """Create coding challenges"""
+    return [
+        CodingChallenge(
+            week=3,
+            title="Remove Duplicates",
+            description="Write a function that removes duplicates from a list while preserving order.",
+            example_input="[1, 2, 2, 3, 4, 3, 5]",
+            example_output="[1, 2, 3, 4, 5]",
+            hint="Use a set to track seen items, but build a new list to preserve order.",
+            test_cases=[
+                (([1, 2, 2, 3, 4, 3, 5],), [1, 2, 3, 4, 5]),
+                (([5, 5, 5],), [5]),
+                (([ ],), []),
+            ],
+            solution="""def remove_duplicates(lst):
+    seen = set()
+    result = []
+    for item in lst:
+        if item not in seen:
+            seen.add(item)
+            result.append(item)
+    return result""",
+            input_generator=lambda n, rng: ([rng.randrange(max(1, n)) for _ in range(n)],)
+        ),
+        
+        CodingChallenge(
+            week=4,
+            title="Count Word Frequency",
+            description="Write a function that counts the frequency of each word in a string.",
+            example_input='"hello world hello"',
+            example_output='{"hello": 2, "world": 1}',
+            hint="Use a dictionary to track counts. Split the string into words first.",
+            test_cases=[
+                (("hello world hello",), {"hello": 2, "world": 1}),
+                (("test",), {"test": 1}),
+            ],
+            solution="""def word_frequency(text):
+    words = text.split()
+    freq = {}
+    for word in words:
+        freq[word] = freq.get(word, 0) + 1
+    return freq""",
+            input_generator=lambda n, rng: (' '.join(f"w{rng.randrange(max(1, n // 4))}" for _ in range(n)),)
+        ),
+        
+        CodingChallenge(
+            week=2,
+            title="FizzBuzz",
+            description="Write a function that returns 'Fizz' for multiples of 3, 'Buzz' for multiples of 5, 'FizzBuzz' for multiples of both, and the number otherwise.",
+            example_input="15",
             example_output='"FizzBuzz"',
             hint="Use modulo operator % and check divisibility.",
             test_cases=[
@@ -1413,10 +3219,1745 @@ def create_coding_challenges() -> List[CodingChallenge]:
     elif n % 5 == 0:
         return "Buzz"
     else:
-        return str(n)"""
+        return str(n)""",
+            input_generator=lambda n, rng: (rng.randrange(1, max(2, n * 100)),)
         ),
     ]
 
+# ============================================================================
+# BATCH AUTOGRADER
+# ============================================================================
+
+# Wall-clock budget per submission and generated inputs per submission
+GRADE_TIMEOUT = 2.0
+GRADE_GENERATED_TESTS = 500
+
+def load_submissions(path: str) -> Dict[str, str]:
+    """Read every *.py submission from a directory tree or a tarball"""
+    import tarfile
+    submissions = {}
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for filename in sorted(files):
+                if filename.endswith('.py'):
+                    full_path = os.path.join(root, filename)
+                    with open(full_path, 'rb') as f:
+                        submissions[os.path.relpath(full_path, path)] = f.read().decode('utf-8', 'replace')
+    elif tarfile.is_tarfile(path):
+        # Read members in memory; nothing from the archive touches the disk
+        with tarfile.open(path) as archive:
+            for member in archive.getmembers():
+                if member.isfile() and member.name.endswith('.py'):
+                    submissions[member.name] = archive.extractfile(member).read().decode('utf-8', 'replace')
+    else:
+        raise ValueError(f"{path} is neither a directory nor a tar archive")
+    return dict(sorted(submissions.items()))
+
+def grade_submissions(challenge: CodingChallenge, submissions: Dict[str, str],
+                      workers: Optional[int] = None,
+                      generated: int = GRADE_GENERATED_TESTS) -> List[dict]:
+    """Grade submissions in parallel; sources with the same normalized AST are graded once"""
+    import hashlib
+    inputs = []
+    if challenge.input_generator is not None and generated:
+        rng = random.Random(0)
+        sizes = [0, 1, 2, 3] + [int(rng.expovariate(1 / 16)) for _ in range(max(0, generated - 4))]
+        inputs = [challenge.input_generator(n, rng) for n in sizes]
+    
+    # Group by normalized AST; compiled code and verdicts come from the cache
+    cache = get_submission_cache()
+    key = f"{challenge.title}/{challenge.fingerprint}/grade/{generated}"
+    digests = {}
+    verdicts = {}
+    unique: Dict[str, bytes] = {}
+    for name, source in submissions.items():
+        try:
+            digest, code = cache.compile(source)
+        except (SyntaxError, ValueError) as e:
+            digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+            verdicts[digest] = ('error', f"{type(e).__name__}: {e}", 0.0)
+        else:
+            cached = cache.get_verdict(digest, key)
+            if cached is not None:
+                verdicts[digest] = tuple(cached)
+            elif digest not in verdicts:
+                unique[digest] = code
+        digests[name] = digest
+    
+    if unique:
+        pool = SandboxPool(workers=workers or os.cpu_count() or 1, timeout=GRADE_TIMEOUT)
+        try:
+            replies = pool.map('grade', [(code, challenge.test_cases, challenge.solution, inputs)
+                                         for code in unique.values()])
+        finally:
+            pool.close()
+        for digest, reply in zip(unique, replies):
+            verdicts[digest] = reply
+            if reply[0] not in TRANSIENT_STATUSES:
+                cache.put_verdict(digest, key, reply)
+    cache.save()
+    
+    rows = []
+    first_seen = {}
+    for name in submissions:
+        digest = digests[name]
+        reply = verdicts[digest]
+        if reply[0] == 'timeout':
+            reply = ('timeout', f"Time limit exceeded ({GRADE_TIMEOUT:g}s)", GRADE_TIMEOUT)
+        elif reply[0] == 'crash':
+            reply = ('crash', reply[1] or "CPU or memory limit exceeded", None)
+        elif len(reply) == 2:
+            reply = (reply[0], reply[1], None)
+        verdict, failing_case, seconds = reply
+        original = first_seen.setdefault(digest, name)
+        rows.append({
+            'submission': name,
+            'sha256': digest,
+            'verdict': verdict,
+            'failing_case': failing_case or '',
+            'runtime_ms': round(seconds * 1000, 2) if seconds is not None else '',
+            'duplicate_of': original if original != name else '',
+        })
+    return rows
+
+def write_grade_report(rows: List[dict], path: str):
+    """Write grading results as CSV or JSON (chosen by file extension)"""
+    import csv
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump(rows, f, indent=2)
+        return
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['submission', 'sha256', 'verdict', 'failing_case',
+                                               'runtime_ms', 'duplicate_of'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+def find_challenge(challenges: List[CodingChallenge], key: str) -> CodingChallenge:
+    """Look a challenge up by 1-based number or by title"""
+    if key.isdigit() and 1 <= int(key) <= len(challenges):
+        return challenges[int(key) - 1]
+    for challenge in challenges:
+        if challenge.title.lower() == key.lower():
+            return challenge
+    raise ValueError(f"No coding challenge '{key}'")
+
+# ============================================================================
+# ITEM RESPONSE THEORY CALIBRATION
+# ============================================================================
+
+# Nominal 2PL difficulty implied by each hand-assigned label
+LABEL_DIFFICULTY = {'Beginner': -1.0, 'Intermediate': 0.0, 'Advanced': 1.0}
+
+# Prior variances for the MAP fit (ability, difficulty, discrimination)
+THETA_PRIOR_VAR = 1.0
+B_PRIOR_VAR = 4.0
+A_PRIOR_VAR = 0.25
+
+# Calibrated difficulty range that each label is expected to cover
+DIFFICULTY_BANDS = {
+    'Beginner': (-math.inf, -0.5),
+    'Intermediate': (-0.5, 0.5),
+    'Advanced': (0.5, math.inf),
+}
+
+def sigmoid(z: float) -> float:
+    """Logistic function, safe for large |z|"""
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+def label_for_difficulty(b: float) -> str:
+    """Map a calibrated difficulty back onto the Beginner/Intermediate/Advanced scale"""
+    for label, (low, high) in DIFFICULTY_BANDS.items():
+        if low <= b < high:
+            return label
+    return 'Advanced'
+
+class IRTCalibrator:
+    """Fits a two-parameter logistic (2PL) IRT model to the attempt history
+    
+    Attempts are aggregated into one (user, question, attempts, correct) row per
+    pair and kept column-wise in flat arrays, so a sweep is a single pass over
+    the rows however many raw attempts they summarize. Abilities and item
+    parameters are updated alternately with damped Newton steps on the MAP
+    objective.
+    """
+    
+    def __init__(self):
+        self.user_ids: List[str] = []
+        self.item_ids: List[str] = []
+        self._user_index: Dict[str, int] = {}
+        self._item_index: Dict[str, int] = {}
+        self.users = array('l')
+        self.items = array('l')
+        self.attempts = array('d')
+        self.correct = array('d')
+    
+    def _index(self, key: str, index: Dict[str, int], ids: List[str]) -> int:
+        """Return the dense index for key, assigning one if needed"""
+        idx = index.get(key)
+        if idx is None:
+            idx = index[key] = len(ids)
+            ids.append(key)
+        return idx
+    
+    def add_response(self, user: str, q_id: str, attempts: int, correct: int):
+        """Add aggregated responses of one user to one question"""
+        if attempts <= 0:
+            return
+        self.users.append(self._index(user, self._user_index, self.user_ids))
+        self.items.append(self._index(q_id, self._item_index, self.item_ids))
+        self.attempts.append(float(attempts))
+        self.correct.append(float(min(correct, attempts)))
+    
+    def add_profiles(self, profiles: Dict[str, 'UserProfile']):
+        """Add the attempt history of every profile"""
+        for name, profile in profiles.items():
+            for q_id, history in profile.question_history.items():
+                self.add_response(name, q_id, history['attempts'], history['correct'])
+    
+    def fit(self, max_iter: int = 100, tol: float = 1e-3) -> dict:
+        """Fit abilities and item parameters; return a JSON-serializable result"""
+        n_users, n_items = len(self.user_ids), len(self.item_ids)
+        rows = list(zip(self.users, self.items, self.attempts, self.correct))
+        # Parameters are clamped so |z| stays small enough for a bare exp()
+        exp = math.exp
+        
+        theta = [0.0] * n_users
+        a = [1.0] * n_items
+        b = [0.0] * n_items
+        
+        # Start difficulties at the logit of each item's failure rate
+        tries, hits = [0.0] * n_items, [0.0] * n_items
+        for _, i, n, k in rows:
+            tries[i] += n
+            hits[i] += k
+        for i in range(n_items):
+            p = (hits[i] + 0.5) / (tries[i] + 1.0)
+            b[i] = max(-4.0, min(4.0, math.log((1 - p) / p)))
+        
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            # Ability step
+            grad, info = [0.0] * n_users, [0.0] * n_users
+            for u, i, n, k in rows:
+                ai = a[i]
+                p = 1.0 / (1.0 + exp(ai * (b[i] - theta[u])))
+                grad[u] += ai * (k - n * p)
+                info[u] += n * p * (1 - p) * ai * ai
+            max_step = 0.0
+            for u in range(n_users):
+                step = (grad[u] - theta[u] / THETA_PRIOR_VAR) / (info[u] + 1 / THETA_PRIOR_VAR)
+                step = max(-1.0, min(1.0, step))
+                theta[u] = max(-4.0, min(4.0, theta[u] + step))
+                max_step = max(max_step, abs(step))
+            
+            # Item step
+            grad_a, info_a = [0.0] * n_items, [0.0] * n_items
+            grad_b, info_b = [0.0] * n_items, [0.0] * n_items
+            for u, i, n, k in rows:
+                ai = a[i]
+                d = theta[u] - b[i]
+                p = 1.0 / (1.0 + exp(-ai * d))
+                r = k - n * p
+                w = n * p * (1 - p)
+                grad_a[i] += d * r
+                info_a[i] += w * d * d
+                grad_b[i] -= ai * r
+                info_b[i] += w * ai * ai
+            for i in range(n_items):
+                step_b = (grad_b[i] - b[i] / B_PRIOR_VAR) / (info_b[i] + 1 / B_PRIOR_VAR)
+                step_a = (grad_a[i] - (a[i] - 1.0) / A_PRIOR_VAR) / (info_a[i] + 1 / A_PRIOR_VAR)
+                step_b = max(-1.0, min(1.0, step_b))
+                step_a = max(-0.5, min(0.5, step_a))
+                b[i] = max(-4.0, min(4.0, b[i] + step_b))
+                a[i] = max(0.2, min(4.0, a[i] + step_a))
+                max_step = max(max_step, abs(step_a), abs(step_b))
+            
+            if max_step < tol:
+                break
+        
+        return {
+            'fitted': datetime.now().isoformat(),
+            'iterations': iterations,
+            'responses': int(sum(self.attempts)),
+            'items': {
+                q_id: {
+                    'a': round(a[i], 4),
+                    'b': round(b[i], 4),
+                    'se_b': round(1 / math.sqrt(info_b[i] + 1 / B_PRIOR_VAR), 4),
+                    'attempts': int(tries[i]),
+                }
+                for i, q_id in enumerate(self.item_ids)
+            },
+            'abilities': {
+                name: {
+                    'theta': round(theta[u], 4),
+                    'se': round(1 / math.sqrt(info[u] + 1 / THETA_PRIOR_VAR), 4),
+                }
+                for u, name in enumerate(self.user_ids)
+            },
+        }
+
+def apply_calibration(questions: List[Question], params: dict):
+    """Attach calibrated parameters to the matching questions"""
+    items = params.get('items', {})
+    for question in questions:
+        item = items.get(question.q_id)
+        if item:
+            question.irt_a = item['a']
+            question.irt_b = item['b']
+
+def find_mislabeled(questions: List[Question], params: dict,
+                    min_attempts: int = 20) -> List[Tuple[Question, str, dict]]:
+    """Return (question, calibrated label, item params) for questions whose label disagrees"""
+    items = params.get('items', {})
+    mislabeled = []
+    for question in questions:
+        item = items.get(question.q_id)
+        if not item or item['attempts'] < min_attempts:
+            continue
+        # Only flag when the whole 95% interval lies outside the labeled band
+        low, high = DIFFICULTY_BANDS.get(question.difficulty, (-math.inf, math.inf))
+        margin = 1.96 * item['se_b']
+        if item['b'] - margin > high or item['b'] + margin < low:
+            mislabeled.append((question, label_for_difficulty(item['b']), item))
+    mislabeled.sort(key=lambda entry: -abs(entry[2]['b'] - LABEL_DIFFICULTY.get(entry[0].difficulty, 0.0)))
+    return mislabeled
+
+# ============================================================================
+# ADAPTIVE TESTING
+# ============================================================================
+
+# Ability grid shared by the information index and the EAP estimator
+ABILITY_GRID = [-4.0 + 0.1 * i for i in range(81)]
+
+def fisher_information(a: float, b: float, theta: float) -> float:
+    """Fisher information of a 2PL item at ability theta"""
+    p = sigmoid(a * (theta - b))
+    return a * a * p * (1 - p)
+
+class AbilityEstimate:
+    """Running EAP ability estimate over a fixed quadrature grid"""
+    
+    def __init__(self, prior_mean: float = 0.0, prior_sd: float = 1.0):
+        self.grid = ABILITY_GRID
+        self.posterior = [math.exp(-0.5 * ((t - prior_mean) / prior_sd) ** 2) for t in self.grid]
+        self._summarize()
+    
+    def _summarize(self):
+        """Recompute the posterior mean and standard deviation"""
+        total = sum(self.posterior)
+        self.posterior = [w / total for w in self.posterior]
+        self.theta = sum(w * t for w, t in zip(self.posterior, self.grid))
+        variance = sum(w * (t - self.theta) ** 2 for w, t in zip(self.posterior, self.grid))
+        self.se = math.sqrt(variance)
+    
+    def update(self, a: float, b: float, correct: bool):
+        """Fold one graded response into the posterior"""
+        self.posterior = [
+            w * (sigmoid(a * (t - b)) if correct else 1 - sigmoid(a * (t - b)))
+            for w, t in zip(self.posterior, self.grid)
+        ]
+        self._summarize()
+
+class ItemInformationIndex:
+    """Questions ranked by Fisher information for each ability bin
+    
+    Each bin keeps only its top `depth` questions; a session asks far fewer
+    than that, so selection is a short scan of one precomputed list. The full
+    bank is only scanned once a bin's shortlist is exhausted.
+    """
+    
+    def __init__(self, questions: List[Question], bin_width: float = 0.25, depth: int = 64):
+        self.questions = questions
+        self.low = ABILITY_GRID[0]
+        self.bin_width = bin_width
+        self.params = [q.irt_params() for q in questions]
+        n_bins = int((ABILITY_GRID[-1] - self.low) / bin_width + 0.5) + 1
+        self.rankings = []
+        for k in range(n_bins):
+            theta = self.low + k * bin_width
+            info = [fisher_information(a, b, theta) for a, b in self.params]
+            self.rankings.append(heapq.nlargest(depth, range(len(questions)), key=info.__getitem__))
+    
+    def select(self, theta: float, seen: set) -> Optional[Question]:
+        """Return the most informative question not in seen (by q_id)"""
+        k = int(round((theta - self.low) / self.bin_width))
+        k = max(0, min(len(self.rankings) - 1, k))
+        for i in self.rankings[k]:
+            if self.questions[i].q_id not in seen:
+                return self.questions[i]
+        
+        # Shortlist exhausted: fall back to a full scan
+        best, best_info = None, -1.0
+        for question, (a, b) in zip(self.questions, self.params):
+            if question.q_id not in seen:
+                info = fisher_information(a, b, theta)
+                if info > best_info:
+                    best, best_info = question, info
+        return best
+
+# ============================================================================
+# QUESTION RECOMMENDER
+# ============================================================================
+
+def cholesky_solve(A: List[List[float]], b: List[float]) -> List[float]:
+    """Solve A x = b for a small symmetric positive-definite A"""
+    n = len(A)
+    L = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1):
+            total = A[i][j] - sum(L[i][k] * L[j][k] for k in range(j))
+            L[i][j] = math.sqrt(total) if i == j else total / L[j][j]
+    y = [0.0] * n
+    for i in range(n):
+        y[i] = (b[i] - sum(L[i][k] * y[k] for k in range(i))) / L[i][i]
+    x = [0.0] * n
+    for i in reversed(range(n)):
+        x[i] = (y[i] - sum(L[k][i] * x[k] for k in range(i + 1, n))) / L[i][i]
+    return x
+
+def als_solve(rows: List[Tuple[int, float, float]], factors: List[List[float]],
+              rank: int, reg: float) -> List[float]:
+    """Weighted ridge regression of (index, residual, weight) rows onto fixed factors"""
+    A = [[reg if i == j else 0.0 for j in range(rank)] for i in range(rank)]
+    b = [0.0] * rank
+    for idx, residual, weight in rows:
+        vec = factors[idx]
+        for i in range(rank):
+            wv = weight * vec[i]
+            b[i] += wv * residual
+            row = A[i]
+            for j in range(i + 1):
+                row[j] += wv * vec[j]
+    for i in range(rank):
+        for j in range(i):
+            A[j][i] = A[i][j]
+    return cholesky_solve(A, b)
+
+class ALSRecommender:
+    """Factorizes the sparse user x question correctness matrix with alternating least squares
+    
+    Each observed cell is the user's success rate on the question, weighted
+    by the number of attempts behind it and centered on the global mean.
+    """
+    
+    def __init__(self, rank: int = 8, reg: float = 5.0, iterations: int = 10, seed: int = 0):
+        self.rank = rank
+        self.reg = reg
+        self.iterations = iterations
+        self.seed = seed
+    
+    def fit(self, profiles: Dict[str, 'UserProfile']) -> dict:
+        """Train on every profile's history; return a JSON-serializable model"""
+        user_ids, item_ids, item_index = [], [], {}
+        cells = []
+        for name, profile in profiles.items():
+            u = len(user_ids)
+            user_ids.append(name)
+            for q_id, history in profile.question_history.items():
+                if history['attempts'] <= 0:
+                    continue
+                i = item_index.get(q_id)
+                if i is None:
+                    i = item_index[q_id] = len(item_ids)
+                    item_ids.append(q_id)
+                cells.append((u, i, history['correct'] / history['attempts'], float(history['attempts'])))
+        
+        weight_total = sum(c[3] for c in cells) or 1.0
+        mean = sum(c[2] * c[3] for c in cells) / weight_total
+        
+        # Sparse rows in both orientations (CSR by user and by item)
+        by_user = [[] for _ in user_ids]
+        by_item = [[] for _ in item_ids]
+        for u, i, value, weight in cells:
+            by_user[u].append((i, value - mean, weight))
+            by_item[i].append((u, value - mean, weight))
+        
+        rng = random.Random(self.seed)
+        user_factors = [[0.0] * self.rank for _ in user_ids]
+        item_factors = [[rng.gauss(0, 0.1) for _ in range(self.rank)] for _ in item_ids]
+        for _ in range(self.iterations):
+            user_factors = [als_solve(rows, item_factors, self.rank, self.reg) for rows in by_user]
+            item_factors = [als_solve(rows, user_factors, self.rank, self.reg) for rows in by_item]
+        
+        return {
+            'trained': datetime.now().isoformat(),
+            'mean': mean,
+            'rank': self.rank,
+            'reg': self.reg,
+            'users': {name: [round(x, 5) for x in vec] for name, vec in zip(user_ids, user_factors)},
+            'items': {q_id: [round(x, 5) for x in vec] for q_id, vec in zip(item_ids, item_factors)},
+        }
+
+def train_recommender(data_file: str, model_file: str):
+    """Train on the whole user store and atomically replace the saved model"""
+    with open(data_file, 'r') as f:
+        data = json.load(f)
+    profiles = {name: UserProfile.from_dict(profile) for name, profile in data.items()}
+    model = ALSRecommender().fit(profiles)
+    tmp_file = f"{model_file}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(model, f)
+    os.replace(tmp_file, model_file)
+
+class RecommenderModel:
+    """Cached factor matrices for per-user top-N retrieval at quiz time"""
+    
+    def __init__(self, model: dict):
+        self.mean = model['mean']
+        self.rank = model['rank']
+        self.reg = model['reg']
+        self.users = model['users']
+        self.item_ids = list(model['items'])
+        self.item_factors = [model['items'][q_id] for q_id in self.item_ids]
+        self._item_index = {q_id: i for i, q_id in enumerate(self.item_ids)}
+    
+    def user_vector(self, profile: 'UserProfile') -> List[float]:
+        """Cached factors for the user, folded in from their history if they are new"""
+        vec = self.users.get(profile.name)
+        if vec is not None:
+            return vec
+        rows = [(self._item_index[q_id], h['correct'] / h['attempts'] - self.mean, float(h['attempts']))
+                for q_id, h in profile.question_history.items()
+                if q_id in self._item_index and h['attempts'] > 0]
+        if not rows:
+            return [0.0] * self.rank
+        return als_solve(rows, self.item_factors, self.rank, self.reg)
+    
+    def recommend(self, profile: 'UserProfile', n: int = 10) -> List[Tuple[str, float]]:
+        """(q_id, predicted success) for the n unseen questions the user is most likely to miss"""
+        vec = self.user_vector(profile)
+        seen = profile.question_history
+        scores = ((q_id, min(1.0, max(0.0, self.mean + sum(x * y for x, y in zip(vec, factors)))))
+                  for q_id, factors in zip(self.item_ids, self.item_factors)
+                  if q_id not in seen)
+        return heapq.nsmallest(n, scores, key=lambda entry: entry[1])
+
+# ============================================================================
+# EXAM READINESS
+# ============================================================================
+
+def wilson_interval(successes: int, trials: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion"""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denom = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+def exam_blueprint(questions: List[Question], form_length: int) -> Dict[Tuple[int, str], int]:
+    """Questions per (week, difficulty) stratum, proportional to the bank (largest remainder)"""
+    strata = defaultdict(int)
+    for q in questions:
+        strata[(q.week, q.difficulty)] += 1
+    total = len(questions)
+    form_length = min(form_length, total)
+    quotas = {key: form_length * size / total for key, size in strata.items()}
+    counts = {key: int(quota) for key, quota in quotas.items()}
+    leftover = form_length - sum(counts.values())
+    for key in sorted(quotas, key=lambda k: quotas[k] - counts[k], reverse=True)[:leftover]:
+        counts[key] += 1
+    return counts
+
+def simulate_readiness(profile: 'UserProfile', questions: List[Question], n_forms: int = 5000,
+                       form_length: int = 50, pass_mark: float = 0.7,
+                       seed: Optional[int] = None) -> dict:
+    """Estimate the probability of passing a blueprint exam form by Monte Carlo
+    
+    Every simulated sitting draws a fresh form from the blueprint, redraws the
+    user's per-week success rates from their Beta posteriors (so thin evidence
+    widens the spread), shifts each question by its difficulty and adds the
+    user's own history on that question before drawing the outcome.
+    """
+    rng = random.Random(seed)
+    blueprint = exam_blueprint(questions, form_length)
+    length = sum(blueprint.values())
+    pass_score = math.ceil(pass_mark * length)
+    
+    # Per-stratum arrays of (week, difficulty offset, correct, attempts)
+    strata = defaultdict(list)
+    history = profile.question_history
+    for q in questions:
+        h = history.get(q.q_id)
+        _, b = q.irt_params()
+        strata[(q.week, q.difficulty)].append(
+            (q.week, b - LABEL_DIFFICULTY['Intermediate'], h['correct'] if h else 0, h['attempts'] if h else 0))
+    plan = [(strata[key], count) for key, count in blueprint.items() if count]
+    
+    week_posteriors = {week: (stats['correct'] + 1, stats['attempted'] - stats['correct'] + 1)
+                       for week, stats in profile.week_stats.items()}
+    prior_strength = 4.0
+    exp, betavariate, uniform, sample = math.exp, rng.betavariate, rng.random, rng.sample
+    
+    passes = 0
+    scores = []
+    for _ in range(n_forms):
+        week_logit = {}
+        for week, (alpha, beta) in week_posteriors.items():
+            p = min(max(betavariate(alpha, beta), 1e-6), 1 - 1e-6)
+            week_logit[week] = math.log(p / (1 - p))
+        score = 0
+        for items, count in plan:
+            # Strata mostly contribute one or two questions; draw those inline
+            size = len(items)
+            if count == 1:
+                drawn = (items[int(uniform() * size)],)
+            elif count == 2:
+                i, j = int(uniform() * size), int(uniform() * (size - 1))
+                drawn = (items[i], items[j + (j >= i)])
+            else:
+                drawn = sample(items, count)
+            for week, offset, correct, attempts in drawn:
+                p = 1.0 / (1.0 + exp(offset - week_logit[week]))
+                if attempts:
+                    p = (correct + prior_strength * p) / (attempts + prior_strength)
+                if uniform() < p:
+                    score += 1
+        scores.append(score)
+        if score >= pass_score:
+            passes += 1
+    
+    scores.sort()
+    low, high = wilson_interval(passes, n_forms)
+    return {
+        'pass_probability': passes / n_forms,
+        'ci_low': low,
+        'ci_high': high,
+        'form_length': length,
+        'pass_score': pass_score,
+        'expected_score': sum(scores) / n_forms,
+        'score_p5': scores[int(0.05 * (n_forms - 1))],
+        'score_p95': scores[int(0.95 * (n_forms - 1))],
+        'forms': n_forms,
+    }
+
+# ============================================================================
+# EXAM FORMS
+# ============================================================================
+
+def largest_remainder(total: int, shares: Dict[str, float]) -> Dict[str, int]:
+    """Split total into whole counts proportional to shares"""
+    scale = sum(shares.values())
+    quotas = {key: total * share / scale for key, share in shares.items()}
+    counts = {key: int(quota) for key, quota in quotas.items()}
+    leftover = total - sum(counts.values())
+    for key in sorted(quotas, key=lambda k: quotas[k] - counts[k], reverse=True)[:leftover]:
+        counts[key] += 1
+    return counts
+
+class FormBlueprint:
+    """What every exam form must contain
+    
+    per_week questions from each week, difficulty labels split by
+    difficulty_mix (fractions, rounded by largest remainder) and at least
+    min_types[type] questions of each listed type. Raises ValueError for a
+    blueprint that cannot describe any form.
+    """
+    
+    def __init__(self, per_week: int = 2, difficulty_mix: Optional[Dict[str, float]] = None,
+                 min_types: Optional[Dict[str, int]] = None, weeks: Optional[List[int]] = None):
+        self.per_week = per_week
+        self.weeks = list(weeks or WEEK_TOPICS)
+        self.difficulty_mix = difficulty_mix or {'Beginner': 0.3, 'Intermediate': 0.5, 'Advanced': 0.2}
+        self.min_types = min_types or {}
+        if per_week < 1:
+            raise ValueError("A form needs at least 1 question per week")
+        if any(share < 0 for share in self.difficulty_mix.values()) or sum(self.difficulty_mix.values()) <= 0:
+            raise ValueError("The difficulty mix must be non-negative and add up to more than 0")
+        if any(count < 0 for count in self.min_types.values()):
+            raise ValueError("Minimum question counts cannot be negative")
+        self.length = per_week * len(self.weeks)
+        self.difficulty_counts = largest_remainder(self.length, self.difficulty_mix)
+    
+    def violations(self, form: List[Question]) -> List[str]:
+        """Ways a form breaks the blueprint (empty if it meets it)"""
+        problems = []
+        weeks = defaultdict(int)
+        difficulties = defaultdict(int)
+        types = defaultdict(int)
+        for q in form:
+            weeks[q.week] += 1
+            difficulties[q.difficulty] += 1
+            types[q.q_type] += 1
+        problems += [f"week {w}: {weeks[w]} questions" for w in self.weeks if weeks[w] != self.per_week]
+        problems += [f"{d}: {difficulties[d]} questions, need {n}"
+                     for d, n in self.difficulty_counts.items() if difficulties[d] != n]
+        problems += [f"{t}: {types[t]} questions, need at least {n}"
+                     for t, n in self.min_types.items() if types[t] < n]
+        if len({q.q_id for q in form}) != len(form):
+            problems.append("repeated question")
+        return problems
+
+def predicted_score(question: Question, theta: float = 0.0) -> float:
+    """2PL probability that a student of ability theta answers correctly"""
+    a, b = question.irt_params()
+    return sigmoid(a * (theta - b))
+
+class FormGenerator:
+    """Assembles blueprint-exact exam forms that share as few questions as possible
+    
+    Each form is built in three steps: a randomized allocation of the
+    per-week counts to difficulty labels (restarted if it paints itself into
+    a corner), the least-used questions of each (week, difficulty) cell, then
+    repair swaps inside a cell until the type minimums hold and the form's
+    predicted score for an average student is within tolerance of the
+    target. Usage counts carry over between forms, so the bank is rotated
+    through before any question is reused.
+    """
+    
+    def __init__(self, questions: List[Question], blueprint: FormBlueprint,
+                 seed: Optional[int] = None, tolerance: float = 0.01):
+        self.blueprint = blueprint
+        self.rng = random.Random(seed)
+        self.tolerance = tolerance
+        self.cells: Dict[Tuple[int, str], List[Question]] = defaultdict(list)
+        for q in questions:
+            if q.week in blueprint.weeks and q.difficulty in blueprint.difficulty_counts:
+                self.cells[(q.week, q.difficulty)].append(q)
+        self.score = {q.q_id: predicted_score(q) for cell in self.cells.values() for q in cell}
+        self.usage: Dict[str, int] = defaultdict(int)
+        self.check_bank()
+        
+        # Target: the blueprint's mix of the bank's mean score per difficulty label
+        # (check_bank guarantees every label the blueprint uses has questions)
+        by_label = defaultdict(list)
+        for (_, difficulty), cell in self.cells.items():
+            by_label[difficulty].extend(self.score[q.q_id] for q in cell)
+        self.target = sum(count * sum(by_label[d]) / len(by_label[d])
+                          for d, count in blueprint.difficulty_counts.items() if count) / blueprint.length
+    
+    def check_bank(self):
+        """Raise ValueError if the bank cannot meet the blueprint at all"""
+        blueprint = self.blueprint
+        for week in blueprint.weeks:
+            available = sum(len(self.cells[(week, d)]) for d in blueprint.difficulty_counts)
+            if available < blueprint.per_week:
+                raise ValueError(f"Week {week} has only {available} questions, the blueprint needs {blueprint.per_week}")
+        for difficulty, count in blueprint.difficulty_counts.items():
+            available = sum(min(len(self.cells[(w, difficulty)]), blueprint.per_week) for w in blueprint.weeks)
+            if available < count:
+                raise ValueError(f"Only {available} {difficulty} questions fit the blueprint, it needs {count}")
+        for q_type, count in blueprint.min_types.items():
+            available = sum(1 for cell in self.cells.values() for q in cell if q.q_type == q_type)
+            if available < count:
+                raise ValueError(f"The bank has only {available} {q_type} questions, the blueprint needs {count}")
+    
+    def allocate(self) -> Optional[Dict[Tuple[int, str], int]]:
+        """Random per-cell counts meeting the week and difficulty totals, or None if stuck"""
+        need = dict(self.blueprint.difficulty_counts)
+        counts = defaultdict(int)
+        self.cell_usage = {cell: sorted(self.usage[q.q_id] for q in questions)
+                           for cell, questions in self.cells.items()}
+        weeks = list(self.blueprint.weeks)
+        self.rng.shuffle(weeks)
+        for week in weeks:
+            for _ in range(self.blueprint.per_week):
+                options = [d for d, n in need.items() if n > 0 and counts[(week, d)] < len(self.cells[(week, d)])]
+                if not options:
+                    return None
+                # Lean towards cells whose next question has been used least
+                weights = [need[d] * 0.25 ** self.cell_usage[(week, d)][counts[(week, d)]] for d in options]
+                difficulty = self.rng.choices(options, weights=weights)[0]
+                counts[(week, difficulty)] += 1
+                need[difficulty] -= 1
+        return counts
+    
+    def least_used(self, candidates: List[Question], count: int) -> List[Question]:
+        rng = self.rng
+        return sorted(candidates, key=lambda q: (self.usage[q.q_id], rng.random()))[:count]
+    
+    def repair_types(self, form: List[Question]) -> bool:
+        """Swap questions within their cells until every type minimum holds"""
+        minimums = self.blueprint.min_types
+        types = defaultdict(int)
+        for q in form:
+            types[q.q_type] += 1
+        in_form = {q.q_id for q in form}
+        for q_type, minimum in minimums.items():
+            while types[q_type] < minimum:
+                # Replace a question whose type can spare one, with a same-cell question of the needed type
+                swaps = [(i, candidate) for i, q in enumerate(form)
+                         if q.q_type != q_type and types[q.q_type] > minimums.get(q.q_type, 0)
+                         for candidate in self.cells[(q.week, q.difficulty)]
+                         if candidate.q_type == q_type and candidate.q_id not in in_form]
+                if not swaps:
+                    return False
+                i, candidate = min(swaps, key=lambda swap: (self.usage[swap[1].q_id], self.rng.random()))
+                types[form[i].q_type] -= 1
+                types[q_type] += 1
+                in_form.discard(form[i].q_id)
+                in_form.add(candidate.q_id)
+                form[i] = candidate
+        return True
+    
+    def repair_difficulty(self, form: List[Question], max_swaps: int = 20):
+        """Swap same-cell, same-type questions to bring the predicted score to the target"""
+        length = len(form)
+        total = sum(self.score[q.q_id] for q in form)
+        in_form = {q.q_id for q in form}
+        for _ in range(max_swaps):
+            gap = total / length - self.target
+            if abs(gap) <= self.tolerance:
+                return
+            best = None
+            for i, q in enumerate(form):
+                for candidate in self.cells[(q.week, q.difficulty)]:
+                    if candidate.q_type != q.q_type or candidate.q_id in in_form:
+                        continue
+                    new_gap = abs(gap + (self.score[candidate.q_id] - self.score[q.q_id]) / length)
+                    if new_gap < abs(gap) and (best is None or (new_gap, self.usage[candidate.q_id]) < best[0]):
+                        best = ((new_gap, self.usage[candidate.q_id]), i, candidate)
+            if best is None:
+                return
+            _, i, candidate = best
+            total += self.score[candidate.q_id] - self.score[form[i].q_id]
+            in_form.discard(form[i].q_id)
+            in_form.add(candidate.q_id)
+            form[i] = candidate
+    
+    def generate(self, attempts: int = 100) -> List[Question]:
+        """One form that meets the blueprint; raises ValueError if none is found"""
+        for _ in range(attempts):
+            counts = self.allocate()
+            if counts is None:
+                continue
+            form = []
+            for cell, count in counts.items():
+                form.extend(self.least_used(self.cells[cell], count))
+            if not self.repair_types(form):
+                continue
+            self.repair_difficulty(form)
+            for q in form:
+                self.usage[q.q_id] += 1
+            self.rng.shuffle(form)
+            return form
+        raise ValueError("Could not assemble a form that meets the blueprint from this bank")
+    
+    def generate_many(self, count: int) -> List[List[Question]]:
+        return [self.generate() for _ in range(count)]
+
+def form_report(forms: List[List[Question]], generator: FormGenerator) -> dict:
+    """Overlap, exposure and predicted-score spread of a set of forms"""
+    ids = [{q.q_id for q in form} for form in forms]
+    # Pairwise overlap through an inverted index: only forms sharing a question are compared
+    holders = defaultdict(list)
+    for n, form_ids in enumerate(ids):
+        for q_id in form_ids:
+            holders[q_id].append(n)
+    max_overlap = 0
+    shared_pairs = 0
+    for n, form_ids in enumerate(ids):
+        overlap = defaultdict(int)
+        for q_id in form_ids:
+            for other in holders[q_id]:
+                if other > n:
+                    overlap[other] += 1
+        shared_pairs += len(overlap)
+        max_overlap = max(max_overlap, max(overlap.values(), default=0))
+    scores = [sum(generator.score[q.q_id] for q in form) / len(form) for form in forms]
+    usage = [generator.usage[q_id] for cell in generator.cells.values() for q_id in (q.q_id for q in cell)]
+    pairs = len(forms) * (len(forms) - 1) // 2
+    return {
+        'forms': len(forms),
+        'length': generator.blueprint.length,
+        'violations': sum(1 for form in forms if generator.blueprint.violations(form)),
+        'max_overlap': max_overlap,
+        'overlapping_pairs': shared_pairs / pairs if pairs else 0.0,
+        'exposure_min': min(usage, default=0),
+        'exposure_max': max(usage, default=0),
+        'target_score': generator.target,
+        'score_min': min(scores, default=0.0),
+        'score_max': max(scores, default=0.0),
+    }
+
+# ============================================================================
+# QUIZ SESSION ENGINE
+# ============================================================================
+
+class QuizSession:
+    """One quiz as a state machine with no I/O of its own
+    
+    Drive it with start(), answer() and advance(); each returns the events
+    that follow, as tuples:
+    
+        ('question', number, question)
+        ('skipped', question)
+        ('graded', question, is_correct, streak)
+        ('timeout',)
+        ('finished', score, total, duration)
+        ('achievement', achievement)
+    
+    Answers are recorded on the profile; saving it is left to the caller.
+    States go ready -> asking <-> answered -> finished.
+    """
+    
+    def __init__(self, questions: List[Question], profile: 'UserProfile',
+                 time_limit: float = 0, clock: Callable[[], float] = time.time):
+        self.questions = questions
+        self.profile = profile
+        self.time_limit = time_limit
+        self.clock = clock
+        self.state = 'ready'
+        self.index = 0
+        self.score = 0
+        self.start_time = 0.0
+    
+    @property
+    def deadline(self) -> Optional[float]:
+        """Clock time at which the quiz ends, if it is timed"""
+        return self.start_time + self.time_limit if self.time_limit else None
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left, if the quiz is timed"""
+        return max(0.0, self.deadline - self.clock()) if self.time_limit else None
+    
+    def _expect(self, state: str):
+        if self.state != state:
+            raise ValueError(f"Quiz session is {self.state}, not {state}")
+    
+    def _timed_out(self) -> bool:
+        return self.clock() >= self.start_time + self.time_limit
+    
+    def start(self) -> List[tuple]:
+        """Begin the quiz with the first question"""
+        self._expect('ready')
+        self.start_time = self.clock()
+        METRICS.inc('aws_quiz_quizzes_started_total')
+        if not self.questions:
+            return self._finish()
+        self.state = 'asking'
+        return [('question', 1, self.questions[0])]
+    
+    def answer(self, answer: str) -> List[tuple]:
+        """Grade an answer to the current question ('S' skips it)"""
+        self._expect('asking')
+        if self.time_limit and self._timed_out():
+            return self.expire()
+        question = self.questions[self.index]
+        self.state = 'answered'
+        if answer.upper() == 'S':
+            return [('skipped', question)]
+        is_correct = question.check_answer(answer)
+        self.profile.update_stats(is_correct, question.week, question.q_id)
+        METRICS.inc('aws_quiz_answers_graded_total', (('result', 'correct' if is_correct else 'incorrect'),))
+        if is_correct:
+            self.score += 1
+        return [('graded', question, is_correct, self.profile.current_streak)]
+    
+    def advance(self) -> List[tuple]:
+        """Move on from the answered question to the next one, or finish"""
+        self._expect('answered')
+        self.index += 1
+        if self.index == len(self.questions):
+            return self._finish()
+        if self.time_limit and self._timed_out():
+            return self.expire()
+        self.state = 'asking'
+        return [('question', self.index + 1, self.questions[self.index])]
+    
+    def expire(self) -> List[tuple]:
+        """End the quiz because its time ran out"""
+        if self.state == 'finished':
+            return []
+        return [('timeout',)] + self._finish()
+    
+    def _finish(self) -> List[tuple]:
+        self.state = 'finished'
+        METRICS.inc('aws_quiz_quizzes_completed_total')
+        total = len(self.questions)
+        if total and self.score == total:
+            self.profile.perfect_quizzes += 1
+        events = [('finished', self.score, total, self.clock() - self.start_time)]
+        events.extend(('achievement', achievement) for achievement in self.profile.check_achievements())
+        return events
+
+def simulate_sessions(questions: List[Question], sessions: int = 100000, num_questions: int = 10,
+                      learners: int = 1000, seed: int = 0, workers: int = 1) -> dict:
+    """Run synthetic quizzes through QuizSession as fast as possible
+    
+    Each synthetic learner has an ability drawn from N(0, 1) and answers
+    correctly with the 2PL probability for the question; learners take many
+    quizzes each, so streak and achievement logic is exercised too. With
+    workers > 1 the sessions are split across processes.
+    """
+    if workers > 1:
+        import multiprocessing
+        start = time.perf_counter()
+        chunks = [(simulate_sessions, questions, sessions // workers + (i < sessions % workers), num_questions,
+                   max(1, learners // workers), seed + i) for i in range(workers)]
+        with multiprocessing.Pool(workers) as pool:
+            parts = collect_metered(pool.starmap(_metered, chunks))
+        elapsed = time.perf_counter() - start
+        result = {key: sum(part[key] for part in parts)
+                  for key in ('sessions', 'answers', 'perfect_quizzes', 'achievements')}
+        result.update(seconds=elapsed, sessions_per_minute=sessions / elapsed * 60)
+        return result
+    
+    rng = random.Random(seed)
+    profiles = [UserProfile(f"sim{i}") for i in range(learners)]
+    abilities = [rng.gauss(0, 1) for _ in profiles]
+    params = {id(q): q.irt_params() for q in questions}
+    clock = lambda: 0.0
+    answered = perfect = achievements = 0
+    
+    start = time.perf_counter()
+    for n in range(sessions):
+        learner = n % learners
+        profile, theta = profiles[learner], abilities[learner]
+        session = QuizSession(rng.sample(questions, num_questions), profile, clock=clock)
+        events = session.start()
+        while session.state != 'finished':
+            question = events[0][2]
+            a, b = params[id(question)]
+            session.answer(question.correct if rng.random() < sigmoid(a * (theta - b)) else '?')
+            events = session.advance()
+            answered += 1
+        perfect += session.score == num_questions
+        achievements += sum(1 for event in events if event[0] == 'achievement')
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'sessions': sessions,
+        'answers': answered,
+        'seconds': elapsed,
+        'sessions_per_minute': sessions / elapsed * 60,
+        'perfect_quizzes': perfect,
+        'achievements': achievements,
+    }
+
+# ============================================================================
+# QUIZ SERVER
+# ============================================================================
+
+SERVER_MAX_SESSIONS = 10000
+SERVER_SESSION_TTL = 30 * 60
+SERVER_FLUSH_SECONDS = 30
+SERVER_MAX_BODY = 64 * 1024
+
+HTTP_REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+                405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large',
+                500: 'Internal Server Error'}
+
+class HTTPError(Exception):
+    """An error response: status code and message"""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class SessionStore:
+    """Active quiz sessions, evicted least recently used first and after ttl idle seconds"""
+    
+    def __init__(self, max_sessions: int = SERVER_MAX_SESSIONS, ttl: float = SERVER_SESSION_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self._sessions: 'OrderedDict[str, Tuple[float, QuizSession]]' = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def add(self, session: QuizSession) -> str:
+        """Store a session under a new random id"""
+        import secrets
+        self.evict_expired()
+        while len(self._sessions) >= self.max_sessions:
+            self._sessions.popitem(last=False)
+        session_id = secrets.token_urlsafe(16)
+        self._sessions[session_id] = (self.clock(), session)
+        return session_id
+    
+    def get(self, session_id: str) -> Optional[QuizSession]:
+        """Look up a session and mark it as just used"""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        now = self.clock()
+        if now - entry[0] > self.ttl:
+            del self._sessions[session_id]
+            return None
+        self._sessions[session_id] = (now, entry[1])
+        self._sessions.move_to_end(session_id)
+        return entry[1]
+    
+    def discard(self, session_id: str):
+        self._sessions.pop(session_id, None)
+    
+    def evict_expired(self) -> int:
+        """Drop sessions idle for longer than ttl; the oldest are always at the front"""
+        cutoff = self.clock() - self.ttl
+        evicted = 0
+        while self._sessions:
+            session_id, (last_used, _) = next(iter(self._sessions.items()))
+            if last_used > cutoff:
+                break
+            del self._sessions[session_id]
+            evicted += 1
+        return evicted
+
+def question_payload(question: Question) -> dict:
+    """What a client may see of a question (no answer, hint or explanation)"""
+    return {
+        'id': question.q_id,
+        'week': question.week,
+        'difficulty': question.difficulty,
+        'type': question.q_type,
+        'question': question.question,
+        'code': question.code,
+        'options': question.options,
+    }
+
+class QuizServer:
+    """JSON-over-HTTP front end for QuizSession, served from one asyncio event loop
+    
+    All sessions share the manager's question bank read-only. Profiles are
+    built on first use, and changed ones are written back in the background
+    every SERVER_FLUSH_SECONDS and on shutdown.
+    
+        GET  /weeks                      topics and question counts
+        POST /sessions                   {"user", "week"?, "questions"?, "time_limit"?}
+        GET  /sessions/<id>              progress and the current question
+        POST /sessions/<id>/answer       {"answer"}
+        GET  /users/<name>/stats         profile summary
+        GET  /metrics                    Prometheus metrics (text format)
+    """
+    
+    def __init__(self, manager: 'QuizManager', store: Optional[SessionStore] = None):
+        self.manager = manager
+        self.store = store or SessionStore()
+        self.questions = manager.questions
+        self.by_week: Dict[int, List[Question]] = defaultdict(list)
+        for question in self.questions:
+            self.by_week[question.week].append(question)
+        self.saved = manager.read_data_file()
+        self.profiles: Dict[str, UserProfile] = {}
+        self.dirty = set()
+        self.connections = {}  # handler task -> StreamWriter
+        self.routes = [
+            ('GET', re.compile(r'/weeks'), self.list_weeks),
+            ('POST', re.compile(r'/sessions'), self.start_session),
+            ('GET', re.compile(r'/sessions/([\w-]+)'), self.session_status),
+            ('POST', re.compile(r'/sessions/([\w-]+)/answer'), self.submit_answer),
+            ('GET', re.compile(r'/users/([^/]+)/stats'), self.user_stats),
+            ('GET', re.compile(r'/metrics'), self.metrics),
+        ]
+    
+    def profile(self, name: str, create: bool = False) -> UserProfile:
+        """A user's profile, built from the saved data on first use"""
+        profile = self.profiles.get(name)
+        if profile is None:
+            if name in self.saved:
+                profile = UserProfile.from_dict(self.saved[name])
+            elif create:
+                profile = UserProfile(name)
+                self.dirty.add(name)
+            else:
+                raise HTTPError(404, f"No such user: {name}")
+            self.profiles[name] = profile
+        return profile
+    
+    def session(self, session_id: str) -> QuizSession:
+        session = self.store.get(session_id)
+        if session is None:
+            raise HTTPError(404, "No such session (it may have expired)")
+        return session
+    
+    # ---- handlers --------------------------------------------------------
+    
+    def list_weeks(self, body: dict) -> dict:
+        return {'weeks': [{'week': week, 'topic': topic, 'questions': len(self.by_week[week])}
+                          for week, topic in WEEK_TOPICS.items()]}
+    
+    def start_session(self, body: dict) -> Tuple[int, dict]:
+        name = str(body.get('user', '')).strip()
+        if not name:
+            raise HTTPError(400, "'user' is required")
+        try:
+            week = int(body.get('week') or 0)
+            count = int(body.get('questions', 10))
+            time_limit = float(body.get('time_limit', 0))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "'week', 'questions' and 'time_limit' must be numbers")
+        pool = self.by_week.get(week, []) if week else self.questions
+        if not pool or count < 1:
+            raise HTTPError(400, "No questions match that request")
+        
+        session = QuizSession(random.sample(pool, min(count, len(pool))), self.profile(name, create=True),
+                              time_limit)
+        session.user = name
+        events = session.start()
+        session_id = self.store.add(session)
+        return 201, {'session': session_id, 'total': len(session.questions),
+                     'time_limit': time_limit or None, **self.progress(session, events)}
+    
+    def session_status(self, body: dict, session_id: str) -> dict:
+        session = self.session(session_id)
+        if session.state == 'asking' and session.time_limit and session.remaining() == 0:
+            return self.progress(session, session.expire())
+        return self.progress(session, [])
+    
+    def submit_answer(self, body: dict, session_id: str) -> dict:
+        session = self.session(session_id)
+        if session.state != 'asking':
+            raise HTTPError(409, "This quiz has already finished")
+        answer = body.get('answer')
+        if not isinstance(answer, str):
+            raise HTTPError(400, "'answer' must be a string")
+        events = session.answer(answer)
+        result = None
+        if session.state == 'answered':
+            self.dirty.add(session.user)
+            if events[0][0] == 'graded':
+                _, question, is_correct, streak = events[0]
+                result = {'correct': is_correct, 'correct_answer': question.correct,
+                          'explanation': question.explanation, 'streak': streak}
+            else:
+                result = {'skipped': True, 'correct_answer': events[0][1].correct}
+            events = session.advance()
+        return {'result': result, **self.progress(session, events)}
+    
+    def user_stats(self, body: dict, name: str) -> dict:
+        return self.profile(name).summary()
+    
+    def metrics(self, body: dict) -> str:
+        return METRICS.render()
+    
+    def progress(self, session: QuizSession, events: List[tuple]) -> dict:
+        """Session state for a response, including what the events announced"""
+        payload = {'state': session.state, 'score': session.score,
+                   'remaining': session.remaining(), 'question': None, 'number': None}
+        if session.state == 'asking':
+            payload['question'] = question_payload(session.questions[session.index])
+            payload['number'] = session.index + 1
+        for event in events:
+            if event[0] == 'timeout':
+                payload['timed_out'] = True
+            elif event[0] == 'finished':
+                _, score, total, duration = event
+                payload['finished'] = {'score': score, 'total': total, 'seconds': round(duration, 1)}
+                self.dirty.add(session.user)
+            elif event[0] == 'achievement':
+                payload.setdefault('achievements', []).append(event[1].name)
+        return payload
+    
+    # ---- HTTP ------------------------------------------------------------
+    
+    def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        """Route a request to its handler; returns (status, JSON payload or plain text)"""
+        from urllib.parse import unquote
+        path = path.split('?', 1)[0].rstrip('/') or '/'
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            try:
+                data = json.loads(body) if body else {}
+            except ValueError:
+                raise HTTPError(400, "Request body is not valid JSON")
+            if not isinstance(data, dict):
+                raise HTTPError(400, "Request body must be a JSON object")
+            result = handler(data, *map(unquote, match.groups()))
+            return result if isinstance(result, tuple) else (200, result)
+        if allowed:
+            raise HTTPError(405, f"{method} is not supported here")
+        raise HTTPError(404, f"Unknown path: {path}")
+    
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (keep-alive)"""
+        import asyncio
+        handler = asyncio.current_task()
+        self.connections[handler] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                body_read = 0 <= length <= SERVER_MAX_BODY
+                if length < 0:
+                    status, payload = 400, {'error': "Bad Content-Length"}
+                elif length > SERVER_MAX_BODY:
+                    status, payload = 413, {'error': "Request body too large"}
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        status, payload = self.dispatch(method, path, body)
+                    except HTTPError as e:
+                        status, payload = e.status, {'error': str(e)}
+                    except Exception:
+                        import traceback
+                        print_error(f"{method} {path} failed:")
+                        traceback.print_exc()
+                        status, payload = 500, {'error': "Internal server error"}
+                
+                # An unread body would be parsed as the next request, so such connections close
+                keep_alive = (body_read and version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                if isinstance(payload, str):
+                    data, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    data, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+                writer.write(f"{version} {status} {HTTP_REASONS.get(status, '')}\r\n"
+                             f"Content-Type: {content_type}\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                             + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self.connections.pop(handler, None)
+    
+    def snapshot(self) -> Optional[str]:
+        """Saved data with the changed profiles merged in, as JSON text, or None if nothing changed
+        
+        Serialized here on the loop thread: to_dict() shares the profiles'
+        live lists and dicts, which handlers keep changing while a writer
+        thread would be dumping them.
+        """
+        if not self.dirty:
+            return None
+        for name in self.dirty:
+            self.saved[name] = self.profiles[name].to_dict()
+        self.dirty = set()
+        return json.dumps(self.saved, indent=2)
+    
+    async def maintain(self):
+        """Periodically evict idle sessions and write changed profiles (off the event loop)"""
+        import asyncio
+        import traceback
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(SERVER_FLUSH_SECONDS)
+            try:
+                self.store.evict_expired()
+            except Exception:
+                print_error("Evicting idle sessions failed:")
+                traceback.print_exc()
+            try:
+                text = self.snapshot()
+                if text is not None:
+                    await loop.run_in_executor(None, self.manager.write_data_text, text)
+            except Exception:
+                # Keep maintaining; the profiles are still in memory, so the next flush retries them
+                self.dirty.update(self.profiles)
+                print_error("Saving profiles failed:")
+                traceback.print_exc()
+    
+    async def serve(self, host: str = '127.0.0.1', port: int = 8080, ready: Optional[Callable] = None):
+        """Run until cancelled, then save changed profiles"""
+        import asyncio
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        maintenance = asyncio.ensure_future(self.maintain())
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            maintenance.cancel()
+            # Hang up idle keep-alive connections so their handlers end cleanly
+            handlers = list(self.connections)
+            for writer in self.connections.values():
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            text = self.snapshot()
+            if text is not None:
+                self.manager.write_data_text(text)
+
+# ============================================================================
+# CLASSROOM MODE
+# ============================================================================
+
+CLASSROOM_PORT = 8765
+CLASSROOM_ROUND_SECONDS = 30
+CLASSROOM_RESULTS_SECONDS = 5
+
+def classroom_form(questions: List[Question], length: int = 10, week: int = 0,
+                   seed: Optional[int] = None) -> List[Question]:
+    """The shared form: a sample of one week, or a blueprint draw across all weeks"""
+    rng = random.Random(seed)
+    if week:
+        pool = [q for q in questions if q.week == week]
+        return rng.sample(pool, min(length, len(pool)))
+    strata = defaultdict(list)
+    for q in questions:
+        strata[(q.week, q.difficulty)].append(q)
+    form = []
+    for key, count in exam_blueprint(questions, length).items():
+        form.extend(rng.sample(strata[key], count))
+    rng.shuffle(form)
+    return form
+
+def encode_message(message: dict) -> bytes:
+    """One newline-delimited JSON message"""
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf-8')
+
+async def open_classroom(host: str, port: int, unix: Optional[str] = None):
+    import asyncio
+    if unix:
+        return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, port)
+
+async def read_stdin_line() -> str:
+    """One line from stdin without blocking the event loop"""
+    import asyncio
+    loop = asyncio.get_running_loop()
+    fd = sys.stdin.fileno()
+    line_ready = loop.create_future()
+    
+    def on_readable():
+        if not line_ready.done():
+            line_ready.set_result(os.read(fd, 4096))
+    
+    loop.add_reader(fd, on_readable)
+    try:
+        return (await line_ready).decode('utf-8', 'replace')
+    finally:
+        loop.remove_reader(fd)
+
+class ClassroomHost:
+    """Instructor side of a live classroom quiz
+    
+    Students connect over TCP or a Unix socket and speak newline-delimited
+    JSON. Every round sends the same question to the whole class at once and
+    closes when everyone has answered or time is up; answers are graded with
+    Question.check_answer and a single results message (the answer histogram)
+    is encoded once and written to every student. Progress is reported
+    through on_event, with events in the style of QuizSession:
+    
+        ('joined', name, students)
+        ('left', name, students)
+        ('asking', number)
+        ('round', number, answered, correct, latency)
+    """
+    
+    def __init__(self, form: List[Question], round_seconds: float = CLASSROOM_ROUND_SECONDS,
+                 results_seconds: float = CLASSROOM_RESULTS_SECONDS,
+                 on_event: Optional[Callable[..., None]] = None):
+        self.form = form
+        self.round_seconds = round_seconds
+        self.results_seconds = results_seconds
+        self.on_event = on_event or (lambda *event: None)
+        self.students = {}  # name -> StreamWriter
+        self.scores: Dict[str, int] = {}
+        self.round = 0
+        self.answers: Dict[str, str] = {}
+        self.round_open = None  # asyncio.Event, set once the open round can close
+        self.latencies: List[float] = []
+        self.handlers = set()
+        self.finished = False
+    
+    async def handle_student(self, reader, writer):
+        """Register a student, then collect their answers until they disconnect"""
+        import asyncio
+        handler = asyncio.current_task()
+        self.handlers.add(handler)
+        name = None
+        try:
+            message = json.loads(await reader.readline() or 'null')
+            requested = str(message.get('name', '')).strip()[:40] if isinstance(message, dict) else ''
+            if not requested or requested in self.students:
+                writer.write(encode_message({'type': 'error', 'error': "Name missing or already in use"}))
+                await writer.drain()
+                return
+            name = requested
+            self.students[name] = writer
+            self.scores.setdefault(name, 0)
+            writer.write(encode_message({'type': 'welcome', 'name': name, 'questions': len(self.form)}))
+            self.on_event('joined', name, len(self.students))
+            
+            async for line in reader:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if (isinstance(message, dict) and message.get('type') == 'answer'
+                        and message.get('round') == self.round and self.round_open is not None
+                        and not self.round_open.is_set() and name not in self.answers):
+                    self.answers[name] = str(message.get('answer', ''))
+                    self.check_round()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            if name is not None and self.students.get(name) is writer:
+                del self.students[name]
+                if not self.finished:
+                    self.on_event('left', name, len(self.students))
+                    self.check_round()
+            writer.close()
+            self.handlers.discard(handler)
+    
+    def check_round(self):
+        """Close the open round once every connected student has answered"""
+        if self.round_open is not None and all(name in self.answers for name in self.students):
+            self.round_open.set()
+    
+    async def broadcast(self, message: dict):
+        """Send one message to every student, encoding it once"""
+        import asyncio
+        data = encode_message(message)
+        writers = list(self.students.values())
+        for writer in writers:
+            writer.write(data)
+        await asyncio.gather(*(writer.drain() for writer in writers), return_exceptions=True)
+    
+    async def run_round(self, question: Question):
+        """Ask one question, wait for the answers and broadcast the histogram"""
+        import asyncio
+        from collections import Counter
+        self.round += 1
+        self.answers = {}
+        self.round_open = asyncio.Event()
+        self.on_event('asking', self.round)
+        start = time.perf_counter()
+        await self.broadcast({'type': 'question', 'round': self.round, 'total': len(self.form),
+                              'seconds': self.round_seconds, 'question': question_payload(question)})
+        sent = time.perf_counter()
+        self.check_round()
+        try:
+            await asyncio.wait_for(self.round_open.wait(), self.round_seconds)
+        except asyncio.TimeoutError:
+            self.round_open.set()
+        closed = time.perf_counter()
+        
+        histogram = Counter(answer.strip().upper() for answer in self.answers.values())
+        marks = {answer: question.check_answer(answer) for answer in histogram}
+        for name, answer in self.answers.items():
+            if marks[answer.strip().upper()] and name in self.scores:
+                self.scores[name] += 1
+        correct = sum(count for answer, count in histogram.items() if marks[answer])
+        await self.broadcast({
+            'type': 'results',
+            'round': self.round,
+            'correct_answer': question.correct,
+            'explanation': question.explanation,
+            'histogram': [[answer, count, marks[answer]] for answer, count in histogram.most_common()],
+            'answered': len(self.answers),
+            'correct': correct,
+            'students': len(self.students),
+        })
+        # What the class waits on besides thinking: the question going out,
+        # then grading and the results coming back
+        latency = (sent - start) + (time.perf_counter() - closed)
+        self.latencies.append(latency)
+        self.on_event('round', self.round, len(self.answers), correct, latency)
+    
+    async def run(self):
+        """Play every round, then send the final leaderboard"""
+        import asyncio
+        for number, question in enumerate(self.form):
+            await self.run_round(question)
+            if number < len(self.form) - 1:
+                await asyncio.sleep(self.results_seconds)
+        leaderboard = sorted(self.scores.items(), key=lambda item: (-item[1], item[0]))
+        await self.broadcast({'type': 'final', 'total': len(self.form),
+                              'leaderboard': [list(entry) for entry in leaderboard]})
+        
+        # Hang up on everyone and let their handlers finish before the server closes
+        self.finished = True
+        for writer in list(self.students.values()):
+            writer.close()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+
+async def host_classroom(form: List[Question], round_seconds: float, host: str, port: int,
+                         unix: Optional[str] = None) -> ClassroomHost:
+    """Instructor console: wait for students, start on Enter and report each round"""
+    import asyncio
+    
+    def on_event(kind, *details):
+        if kind == 'joined':
+            print_success(f"{details[0]} joined ({details[1]} students)")
+        elif kind == 'left':
+            print_warning(f"{details[0]} left ({details[1]} students)")
+        elif kind == 'round':
+            number, answered, correct, latency = details
+            print_info(f"Round {number}/{len(form)}: {answered} answered, {correct} correct "
+                       f"({latency * 1000:.1f} ms round latency)")
+    
+    classroom = ClassroomHost(form, round_seconds, on_event=on_event)
+    if unix:
+        server = await asyncio.start_unix_server(classroom.handle_student, unix)
+        where = f"--unix {unix}"
+    else:
+        server = await asyncio.start_server(classroom.handle_student, host, port, backlog=1024)
+        where = f"--host {host} --port {port}"
+    try:
+        async with server:
+            print_header("🏫 LIVE CLASSROOM")
+            print(f"{len(form)} questions, {round_seconds:g} seconds each. Students join with:\n")
+            print(f"  {Colors.CYAN}python3 aws_quiz_ultimate.py classroom join --name NAME {where}{Colors.RESET}\n")
+            print_info("Press Enter to start once everyone has joined")
+            while True:
+                await read_stdin_line()
+                if classroom.students:
+                    break
+                print_warning("Nobody has joined yet")
+            await classroom.run()
+    finally:
+        if unix and os.path.exists(unix):
+            os.unlink(unix)
+    
+    print_subheader("Final Leaderboard")
+    for rank, (name, score) in enumerate(sorted(classroom.scores.items(), key=lambda item: -item[1])[:10], 1):
+        print(f"  {rank:>2}. {name:<20} {score}/{len(form)}")
+    return classroom
+
+async def join_classroom(name: str, host: str, port: int, unix: Optional[str] = None):
+    """Student console: show each question as it arrives and send the typed answer"""
+    import asyncio
+    reader, writer = await open_classroom(host, port, unix)
+    writer.write(encode_message({'type': 'join', 'name': name}))
+    loop = asyncio.get_running_loop()
+    fd = sys.stdin.fileno()
+    state = {'round': None, 'answer': None}
+    
+    def on_readable():
+        data = os.read(fd, 4096)
+        if not data:
+            loop.remove_reader(fd)
+            return
+        answer = data.decode('utf-8', 'replace').strip()
+        if state['round'] is not None and state['answer'] is None and answer:
+            state['answer'] = answer
+            writer.write(encode_message({'type': 'answer', 'round': state['round'], 'answer': answer}))
+            print_info("Answer locked in - waiting for the rest of the class")
+    
+    loop.add_reader(fd, on_readable)
+    try:
+        async for line in reader:
+            message = json.loads(line)
+            kind = message['type']
+            if kind == 'error':
+                print_error(message['error'])
+                return
+            if kind == 'welcome':
+                print_success(f"Joined as {message['name']}. Waiting for the instructor to start...")
+            elif kind == 'question':
+                state['round'], state['answer'] = message['round'], None
+                payload = message['question']
+                question = Question(payload['week'], payload['difficulty'], payload['type'], payload['question'],
+                                    payload['options'], '', '', code=payload['code'], q_id=payload['id'])
+                clear_screen()
+                print_header(f"Question {message['round']}/{message['total']}")
+                question.display()
+                print(f"{Colors.WHITE}Your answer ({message['seconds']:g}s): {Colors.RESET}", end='', flush=True)
+            elif kind == 'results':
+                state['round'] = None
+                print()
+                mine = (state['answer'] or '').strip().upper()
+                mark = next((correct for answer, _, correct in message['histogram'] if answer == mine), None)
+                if mark:
+                    print_success(f"Correct! The answer is {message['correct_answer']}")
+                else:
+                    print_error(f"{'Not answered' if mark is None else 'Incorrect'}. "
+                                f"The answer is {message['correct_answer']}")
+                print(f"{Colors.DIM}{message['explanation']}{Colors.RESET}\n")
+                print(f"Class: {message['correct']}/{message['answered']} correct "
+                      f"({message['students']} students)\n")
+                most = max((count for _, count, _ in message['histogram']), default=1)
+                for answer, count, correct in message['histogram'][:8]:
+                    color = Colors.GREEN if correct else Colors.RED
+                    print(f"  {answer[:12]:>12} {color}{'█' * max(1, count * 30 // most)}{Colors.RESET} {count}")
+            elif kind == 'final':
+                leaderboard = message['leaderboard']
+                print_subheader("Final Leaderboard")
+                for rank, (student, score) in enumerate(leaderboard[:10], 1):
+                    print(f"  {rank:>2}. {student:<20} {score}/{message['total']}")
+                for rank, (student, score) in enumerate(leaderboard, 1):
+                    if student == name:
+                        print(f"\nYou placed {rank} of {len(leaderboard)} with {score}/{message['total']}")
+                return
+        print_warning("The instructor closed the classroom")
+    finally:
+        loop.remove_reader(fd)
+        writer.close()
+
+def benchmark_classroom(clients: int = 300, rounds: int = 10, seed: int = 0) -> Dict[str, float]:
+    """Full round time with bot students that answer at once, over local TCP
+    
+    Measured from the question broadcast until every bot has read the
+    results, so it covers both fan-outs, the answers coming back and grading.
+    """
+    import asyncio
+    form = classroom_form(create_question_database(), rounds, seed=seed)
+    
+    async def bot(port: int, number: int, done: List[float]):
+        rng = random.Random(seed + number)
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(encode_message({'type': 'join', 'name': f"bot{number}"}))
+        async for line in reader:
+            message = json.loads(line)
+            if message['type'] == 'question':
+                question = message['question']
+                choices = ([chr(65 + i) for i in range(len(question['options']))]
+                           if question['type'] == 'MCQ' else question['options']) or ['True', 'False']
+                writer.write(encode_message({'type': 'answer', 'round': message['round'],
+                                             'answer': rng.choice(choices)}))
+            elif message['type'] == 'results':
+                done[message['round'] - 1] = max(done[message['round'] - 1], time.perf_counter())
+            elif message['type'] == 'final':
+                break
+        writer.close()
+    
+    async def run() -> List[float]:
+        everyone_in = asyncio.Event()
+        started: List[float] = []
+        
+        def on_event(kind, *details):
+            if kind == 'joined' and details[1] == clients:
+                everyone_in.set()
+            elif kind == 'asking':
+                started.append(time.perf_counter())
+        
+        classroom = ClassroomHost(form, results_seconds=0, on_event=on_event)
+        server = await asyncio.start_server(classroom.handle_student, '127.0.0.1', 0, backlog=clients)
+        port = server.sockets[0].getsockname()[1]
+        done = [0.0] * len(form)
+        async with server:
+            bots = [asyncio.ensure_future(bot(port, n, done)) for n in range(clients)]
+            await everyone_in.wait()
+            await classroom.run()
+            await asyncio.gather(*bots)
+        return [finish - begin for begin, finish in zip(started, done)]
+    
+    latencies = sorted(asyncio.run(run()))
+    return {
+        'clients': clients,
+        'rounds': len(latencies),
+        'median_ms': latencies[len(latencies) // 2] * 1000,
+        'max_ms': latencies[-1] * 1000,
+    }
+
 # ============================================================================
 # QUIZ MANAGER
 # ============================================================================
@@ -1425,11 +4966,53 @@ class QuizManager:
     """Main quiz management class"""
     
     def __init__(self):
-        self.questions = create_question_database()
-        self.coding_challenges = create_coding_challenges()
+        self._questions: Optional[List[Question]] = None
+        self._coding_challenges: Optional[List[CodingChallenge]] = None
+        self._users: Optional[Dict[str, UserProfile]] = None
         self.current_user: Optional[UserProfile] = None
         self.data_file = 'quiz_data.json'
-        self.load_data()
+        self.irt_file = 'irt_params.json'
+        self.recommender_file = 'recommender.json'
+        self.variant_file = TEMPLATE_CACHE_FILE
+        self._recommender: Optional[RecommenderModel] = None
+        self._templates: Optional[Dict[str, QuestionTemplate]] = None
+        self._variant_cache: Optional[VariantCache] = None
+        self._variant_pool = None
+        self._recommender_mtime = 0.0
+        self._calibration: Optional[dict] = None
+        self._information_index: Optional[ItemInformationIndex] = None
+        self._question_index: Optional[Dict[str, Question]] = None
+        self._questions_by_week: Optional[Dict[int, List[Question]]] = None
+    
+    @property
+    def questions(self) -> List[Question]:
+        """The question bank (built on first use, with any saved calibration applied)"""
+        if self._questions is None:
+            self._questions = create_question_database()
+            if self.calibration:
+                apply_calibration(self._questions, self.calibration)
+        return self._questions
+    
+    @property
+    def calibration(self) -> dict:
+        """Saved IRT calibration, or {} if none has been run (loaded on first use)"""
+        if self._calibration is None:
+            self.load_calibration()
+        return self._calibration
+    
+    @property
+    def coding_challenges(self) -> List[CodingChallenge]:
+        """Coding challenges (built on first use)"""
+        if self._coding_challenges is None:
+            self._coding_challenges = create_coding_challenges()
+        return self._coding_challenges
+    
+    @property
+    def users(self) -> Dict[str, UserProfile]:
+        """User profiles by name (loaded on first use)"""
+        if self._users is None:
+            self.load_data()
+        return self._users
     
     def load_data(self):
         """Load user data from file"""
@@ -1437,18 +5020,230 @@ class QuizManager:
             try:
                 with open(self.data_file, 'r') as f:
                     data = json.load(f)
-                    self.users = {name: UserProfile.from_dict(profile_data) 
-                                 for name, profile_data in data.items()}
+                    self._users = {name: UserProfile.from_dict(profile_data) 
+                                   for name, profile_data in data.items()}
             except:
-                self.users = {}
+                self._users = {}
         else:
-            self.users = {}
+            self._users = {}
     
     def save_data(self):
         """Save user data to file"""
         data = {name: profile.to_dict() for name, profile in self.users.items()}
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.write_data_file(data)
+    
+    def read_data_file(self) -> Dict[str, dict]:
+        """Saved profiles as plain dicts, without building UserProfile objects"""
+        if not os.path.exists(self.data_file):
+            return {}
+        try:
+            with open(self.data_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def load_profile(self, name: str) -> Optional[UserProfile]:
+        """One saved profile, or None; the other profiles are not built"""
+        data = self.read_data_file().get(name)
+        return UserProfile.from_dict(data) if data is not None else None
+    
+    def save_profile(self, profile: UserProfile):
+        """Write one profile back, leaving the other saved profiles untouched"""
+        data = self.read_data_file()
+        data[profile.name] = profile.to_dict()
+        self.write_data_file(data)
+    
+    def write_data_file(self, data: Dict[str, dict]):
+        """Serialize profiles and replace the data file atomically"""
+        self.write_data_text(json.dumps(data, indent=2))
+    
+    def write_data_text(self, text: str):
+        """Replace the data file atomically with already serialized data, so readers never see half a file
+        
+        The temporary file is unique to the writer; concurrent savers would
+        otherwise truncate each other's half-written copy.
+        """
+        import threading
+        tmp_file = f"{self.data_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        start = time.perf_counter()
+        try:
+            with open(tmp_file, 'w') as f:
+                f.write(text)
+                size = f.tell()
+            os.replace(tmp_file, self.data_file)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.unlink(tmp_file)
+            raise
+        METRICS.inc('aws_quiz_saves_total')
+        METRICS.observe('aws_quiz_save_seconds', time.perf_counter() - start)
+        METRICS.set('aws_quiz_data_file_bytes', size)
+    
+    def answer_quiz(self, week: int, answers: List[str],
+                    profile: Optional[UserProfile] = None) -> List[Tuple[Question, str, Optional[bool]]]:
+        """Grade answers to a week's questions in bank order, recording them on profile
+        
+        An empty answer or 'S' skips the question (graded as None).
+        """
+        questions = [q for q in self.questions if q.week == week]
+        results = []
+        for question, answer in zip(questions, answers):
+            if not answer or answer.upper() == 'S':
+                results.append((question, answer, None))
+                continue
+            is_correct = question.check_answer(answer)
+            METRICS.inc('aws_quiz_answers_graded_total', (('result', 'correct' if is_correct else 'incorrect'),))
+            if profile is not None:
+                profile.update_stats(is_correct, question.week, question.q_id)
+            results.append((question, answer, is_correct))
+        return results
+    
+    def load_calibration(self):
+        """Load calibrated IRT parameters, if a calibration has been run"""
+        self._calibration = {}
+        if os.path.exists(self.irt_file):
+            try:
+                with open(self.irt_file, 'r') as f:
+                    self._calibration = json.load(f)
+                if self._questions is not None:
+                    apply_calibration(self._questions, self._calibration)
+            except (OSError, ValueError, KeyError):
+                self._calibration = {}
+    
+    @property
+    def question_index(self) -> Dict[str, Question]:
+        """Questions keyed by q_id (built on first use)"""
+        if self._question_index is None:
+            self._question_index = {q.q_id: q for q in self.questions}
+        return self._question_index
+    
+    @property
+    def templates(self) -> Dict[str, QuestionTemplate]:
+        """Question templates by id (built on first use)"""
+        if self._templates is None:
+            self._templates = create_question_templates()
+        return self._templates
+    
+    @property
+    def variant_cache(self) -> VariantCache:
+        """Rendered template variants (loaded on first use)"""
+        if self._variant_cache is None:
+            self._variant_cache = VariantCache(self.variant_file)
+        return self._variant_cache
+    
+    def refresh_variants(self, workers: int = 2) -> bool:
+        """Render any uncached template variants in a background worker pool"""
+        import multiprocessing
+        cache = self.variant_cache
+        jobs = cache.missing(list(self.templates.values()))
+        if not jobs or self._variant_pool is not None:
+            return False
+        
+        def finished(results: List[dict]):
+            cache.store(jobs, results)
+            cache.save()
+        
+        # Kept on the manager: a pool that is garbage collected terminates its workers
+        self._variant_pool = multiprocessing.Pool(workers)
+        self._variant_pool.starmap_async(render_variant, jobs, chunksize=TEMPLATE_BATCH, callback=finished)
+        self._variant_pool.close()
+        return True
+    
+    def vary(self, question: Question) -> Question:
+        """A cached variant of a templated question, or the question itself"""
+        template = self.templates.get(question.template) if question.template else None
+        variants = self.variant_cache.variants(template) if template else []
+        if not variants:
+            return question
+        variant = copy.copy(question)
+        for field, value in random.choice(variants).items():
+            setattr(variant, field, value)
+        return variant
+    
+    @property
+    def questions_by_week(self) -> Dict[int, List[Question]]:
+        """Questions grouped by week (built on first use)"""
+        if self._questions_by_week is None:
+            self._questions_by_week = defaultdict(list)
+            for q in self.questions:
+                self._questions_by_week[q.week].append(q)
+        return self._questions_by_week
+    
+    @property
+    def information_index(self) -> 'ItemInformationIndex':
+        """Ability-binned question index for adaptive quizzes (built on first use)"""
+        if self._information_index is None:
+            self._information_index = ItemInformationIndex(self.questions)
+        return self._information_index
+    
+    def calibrate(self, min_attempts: int = 20, report_file: str = 'irt_report.csv'):
+        """Fit the 2PL model over all users, save it and report mislabeled questions"""
+        import csv
+        print_header("📐 QUESTION DIFFICULTY CALIBRATION")
+        
+        calibrator = IRTCalibrator()
+        calibrator.add_profiles(self.users)
+        if not calibrator.item_ids:
+            print_warning("No attempt history recorded yet - nothing to calibrate.")
+            return
+        
+        print_info(f"Fitting {len(calibrator.item_ids)} questions x {len(calibrator.user_ids)} users "
+                   f"({int(sum(calibrator.attempts))} attempts)...")
+        start = time.time()
+        params = calibrator.fit()
+        print_success(f"Converged in {params['iterations']} iterations ({time.time() - start:.2f}s)")
+        
+        with open(self.irt_file, 'w') as f:
+            json.dump(params, f, indent=2)
+        self._calibration = params
+        apply_calibration(self.questions, params)
+        self._information_index = None
+        print_success(f"Calibrated parameters saved to: {self.irt_file}")
+        
+        mislabeled = find_mislabeled(self.questions, params, min_attempts)
+        print_subheader(f"Mislabeled Questions ({len(mislabeled)})")
+        for question, label, item in mislabeled:
+            print(f"  {question.q_id}: {Colors.YELLOW}{question.difficulty}{Colors.RESET} -> "
+                  f"{Colors.CYAN}{label}{Colors.RESET} (b={item['b']:+.2f}, a={item['a']:.2f}, "
+                  f"n={item['attempts']})")
+        
+        with open(report_file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Question ID', 'Week', 'Labeled', 'Calibrated', 'Difficulty (b)',
+                             'SE (b)', 'Discrimination (a)', 'Attempts', 'Question'])
+            for question, label, item in mislabeled:
+                writer.writerow([question.q_id, question.week, question.difficulty, label, item['b'],
+                                 item['se_b'], item['a'], item['attempts'], question.question])
+        print_success(f"Report written to: {report_file}")
+    
+    def refresh_recommender(self) -> bool:
+        """Retrain the recommender in a background process if it is older than the user data"""
+        import multiprocessing
+        if not os.path.exists(self.data_file):
+            return False
+        if (os.path.exists(self.recommender_file) and
+                os.path.getmtime(self.recommender_file) >= os.path.getmtime(self.data_file)):
+            return False
+        worker = multiprocessing.Process(target=train_recommender,
+                                         args=(self.data_file, self.recommender_file), daemon=True)
+        worker.start()
+        return True
+    
+    @property
+    def recommender(self) -> Optional[RecommenderModel]:
+        """Saved recommender model, reloaded only when the file changes"""
+        try:
+            mtime = os.path.getmtime(self.recommender_file)
+        except OSError:
+            return None
+        if self._recommender is None or mtime != self._recommender_mtime:
+            try:
+                with open(self.recommender_file, 'r') as f:
+                    self._recommender = RecommenderModel(json.load(f))
+                self._recommender_mtime = mtime
+            except (OSError, ValueError, KeyError):
+                return None
+        return self._recommender
     
     def select_user(self):
         """Select or create user profile"""
@@ -1479,7 +5274,7 @@ class QuizManager:
             self.users[name] = self.current_user
             self.save_data()
             print_success(f"Welcome, {name}!")
-            time.sleep(1)
+            pause(1)
     
     def main_menu(self):
         """Display main menu"""
@@ -1506,6 +5301,8 @@ class QuizManager:
                 "⏰ Timed Quiz Mode",
                 "⏱️  Pomodoro Study Timer",
                 "💾 Export Progress to CSV",
+                "🎯 Adaptive Quiz",
+                "💡 Recommended Practice",
                 "⚙️  Settings",
                 "🚪 Exit"
             ]
@@ -1538,34 +5335,25 @@ class QuizManager:
                 elif choice == 10:
                     self.export_to_csv()
                 elif choice == 11:
-                    self.settings()
+                    self.adaptive_quiz()
                 elif choice == 12:
+                    self.recommended_practice()
+                elif choice == 13:
+                    self.settings()
+                elif choice == 14:
                     self.save_data()
                     print_success("\n👋 Thanks for studying! Keep up the great work!")
                     sys.exit(0)
             except:
                 print_error("Invalid choice!")
-                time.sleep(1)
+                pause(1)
     
     def practice_by_week(self):
         """Practice questions from a specific week"""
         clear_screen()
         print_header("📚 PRACTICE BY WEEK")
         
-        weeks = {
-            1: "Python Basics",
-            2: "Control Flow",
-            3: "Lists & APIs",
-            4: "Dictionaries & Functions",
-            5: "Files & Error Handling",
-            6: "Object-Oriented Programming",
-            7: "Git & Version Control",
-            8: "Databases (SQL & DynamoDB)",
-            9: "Cloud Storage (S3 & Textract)",
-            10: "Serverless (Lambda & API Gateway)"
-        }
-        
-        for week, topic in weeks.items():
+        for week, topic in WEEK_TOPICS.items():
             stats = self.current_user.week_stats[week]
             if stats['attempted'] > 0:
                 accuracy = (stats['correct'] / stats['attempted']) * 100
@@ -1586,36 +5374,47 @@ class QuizManager:
                 return
         except:
             print_error("Invalid choice!")
-            time.sleep(1)
+            pause(1)
     
     def random_quiz(self, num_questions: int = 10):
         """Run a random quiz with mixed questions"""
         self.run_quiz(num_questions=num_questions, random_mix=True)
     
+    def select_questions(self, week: Optional[int] = None, num_questions: int = 10) -> List[Question]:
+        """Questions for a quiz, from one week or the whole bank, picked the user's chosen way"""
+        available = self.questions_by_week.get(week, []) if week else self.questions
+        user = self.current_user
+        if user is not None and user.question_selection == 'weakness':
+            return user.weakness_sampler(available, week).sample(num_questions)
+        if user is not None and user.question_selection == 'no_repeat':
+            return user.next_questions(available, num_questions, str(week) if week else 'all')
+        return random.sample(available, min(num_questions, len(available)))
+    
     def run_quiz(self, week: Optional[int] = None, num_questions: int = 10, 
-                 random_mix: bool = False, timed: bool = False, time_limit: int = 0):
-        """Run a quiz session"""
+                 random_mix: bool = False, timed: bool = False, time_limit: int = 0,
+                 questions: Optional[List[Question]] = None, title: str = "Quiz"):
+        """Run a quiz session (the terminal front end for QuizSession)"""
         clear_screen()
         
         # Select questions
-        if week:
-            available = [q for q in self.questions if q.week == week]
-            title = f"Week {week} Quiz"
-        elif random_mix:
-            available = self.questions
-            title = "Random Quiz"
+        if questions is not None:
+            quiz_questions = random.sample(questions, min(num_questions, len(questions)))
         else:
-            available = self.questions
-            title = "Quiz"
-        
-        if not available:
+            quiz_questions = self.select_questions(week, num_questions)
+            if week:
+                title = f"Week {week} Quiz"
+            elif random_mix:
+                title = "Random Quiz"
+        quiz_questions = [self.vary(q) for q in quiz_questions]
+        for q in quiz_questions:
+            if q.code:
+                highlight_code(q.code)  # tokenize now rather than between answers
+        
+        if not quiz_questions:
             print_error("No questions available!")
             press_enter()
             return
         
-        # Randomize and limit
-        quiz_questions = random.sample(available, min(num_questions, len(available)))
-        
         print_header(title)
         print(f"{Colors.BOLD}Questions: {len(quiz_questions)}{Colors.RESET}")
         if timed:
@@ -1625,84 +5424,73 @@ class QuizManager:
         press_enter()
         
         # Run quiz
-        score = 0
-        start_time = time.time()
+        session = QuizSession(quiz_questions, self.current_user, time_limit if timed else 0)
+        events = session.start()
         
-        for i, question in enumerate(quiz_questions, 1):
-            clear_screen()
-            
-            # Time check
-            if timed:
-                elapsed = time.time() - start_time
-                remaining = time_limit - elapsed
-                if remaining <= 0:
-                    print_warning("⏰ Time's up!")
+        # With a live terminal the deadline also interrupts a pending answer
+        live = live_terminal() if timed else None
+        if live is not None:
+            live.deadline = session.deadline
+            live.start_timer('quiz', "⏰ Time left", time_limit)
+        
+        try:
+            while session.state != 'finished':
+                _, number, question = events[0]
+                clear_screen()
+                
+                if timed and live is None:
+                    print(f"{Colors.YELLOW}Time Remaining: {int(session.remaining())}s{Colors.RESET}\n")
+                
+                print(f"{Colors.BOLD}Question {number}/{len(quiz_questions)}{Colors.RESET}")
+                print(f"{Colors.DIM}Current Score: {session.score}/{number - 1}{Colors.RESET}\n")
+                
+                question.display()
+                events = session.answer(self.prompt_answer(question))
+                if session.state == 'finished':
                     break
-                print(f"{Colors.YELLOW}Time Remaining: {int(remaining)}s{Colors.RESET}\n")
-            
-            print(f"{Colors.BOLD}Question {i}/{len(quiz_questions)}{Colors.RESET}")
-            print(f"{Colors.DIM}Current Score: {score}/{i-1}{Colors.RESET}\n")
-            
-            question.display()
-            
-            # Get answer
-            if question.q_type == 'TrueFalse':
-                answer = get_input("Your answer (T/F) [H for hint, S to skip]: ")
-            elif question.q_type == 'FillBlank':
-                answer = get_input("Your answer [H for hint, S to skip]: ")
-            else:
-                answer = get_input("Your answer (A/B/C/D) [H for hint, S to skip]: ")
-            
-            # Handle hints and skips
-            if answer.upper() == 'H':
-                print(f"\n{Colors.YELLOW}💡 Hint: {question.hint}{Colors.RESET}\n")
-                if question.q_type == 'TrueFalse':
-                    answer = get_input("Your answer (T/F): ")
-                elif question.q_type == 'FillBlank':
-                    answer = get_input("Your answer: ")
+                
+                if events[0][0] == 'skipped':
+                    print_warning("⏭️  Skipped")
                 else:
-                    answer = get_input("Your answer (A/B/C/D): ")
-            
-            if answer.upper() == 'S':
-                print_warning("⏭️  Skipped")
+                    _, question, is_correct, streak = events[0]
+                    if is_correct:
+                        print_success("CORRECT!")
+                    else:
+                        print_error(f"INCORRECT! Correct answer: {question.correct}")
+                    
+                    print(f"\n{Colors.CYAN}💡 Explanation: {question.explanation}{Colors.RESET}")
+                    
+                    # Show streak
+                    if is_correct and streak >= 3:
+                        print(f"\n{Colors.YELLOW}🔥 Streak: {streak}!{Colors.RESET}")
+                
                 press_enter()
-                continue
-            
-            # Check answer
-            is_correct = question.check_answer(answer)
-            
-            if is_correct:
-                score += 1
-                print_success("CORRECT!")
-                self.current_user.update_stats(True, question.week, question.q_id)
-            else:
-                print_error(f"INCORRECT! Correct answer: {question.correct}")
-                self.current_user.update_stats(False, question.week, question.q_id)
-            
-            print(f"\n{Colors.CYAN}💡 Explanation: {question.explanation}{Colors.RESET}")
-            
-            # Show streak
-            if is_correct and self.current_user.current_streak >= 3:
-                print(f"\n{Colors.YELLOW}🔥 Streak: {self.current_user.current_streak}!{Colors.RESET}")
-            
-            press_enter()
+                events = session.advance()
+        except InputTimeout:
+            events = session.expire()
+        finally:
+            if live is not None:
+                live.deadline = None
+                live.timers.pop('quiz', None)
+        
+        if events[0][0] == 'timeout':
+            print_warning("⏰ Time's up!")
+            pause(1)
         
         # Quiz complete
-        end_time = time.time()
-        duration = end_time - start_time
+        _, score, total, duration = next(event for event in events if event[0] == 'finished')
         
         clear_screen()
         print_header("📊 QUIZ COMPLETE!", Colors.GREEN)
         
-        percentage = (score / len(quiz_questions)) * 100
+        percentage = (score / total) * 100
         
-        print(f"{Colors.BOLD}Final Score: {score}/{len(quiz_questions)} ({percentage:.1f}%){Colors.RESET}\n")
+        print(f"{Colors.BOLD}Final Score: {score}/{total} ({percentage:.1f}%){Colors.RESET}\n")
         print(f"Time Taken: {int(duration // 60)}m {int(duration % 60)}s\n")
         
         # Performance message
         if percentage == 100:
             print(f"{Colors.BRIGHT_GREEN}🌟 PERFECT SCORE! Outstanding work!{Colors.RESET}")
-            self.current_user.perfect_quizzes += 1
         elif percentage >= 80:
             print(f"{Colors.GREEN}🎉 Excellent work! You're mastering this material!{Colors.RESET}")
         elif percentage >= 60:
@@ -1710,27 +5498,112 @@ class QuizManager:
         else:
             print(f"{Colors.RED}💪 Keep studying! Review the material and try again.{Colors.RESET}")
         
-        # Check for achievements
-        stats = {
-            'total_correct': self.current_user.total_correct,
-            'best_streak': self.current_user.best_streak,
-            'perfect_quizzes': self.current_user.perfect_quizzes,
-            'coding_completed': self.current_user.coding_completed,
-            'weeks_completed': self.current_user.weeks_completed
-        }
-        
-        new_achievements = self.current_user.achievements.check_achievements(stats)
+        self.announce_achievements([event[1] for event in events if event[0] == 'achievement'])
+        self.save_data()
+        press_enter()
+    
+    def prompt_answer(self, question: Question) -> str:
+        """Prompt for an answer, showing the hint first if the user asks for it"""
+        if question.q_type == 'TrueFalse':
+            answer = get_input("Your answer (T/F) [H for hint, S to skip]: ")
+        elif question.q_type == 'FillBlank':
+            answer = get_input("Your answer [H for hint, S to skip]: ")
+        else:
+            answer = get_input("Your answer (A/B/C/D) [H for hint, S to skip]: ")
         
+        # Handle hints (skips are left to the caller)
+        if answer.upper() == 'H':
+            print(f"\n{Colors.YELLOW}💡 Hint: {question.hint}{Colors.RESET}\n")
+            if question.q_type == 'TrueFalse':
+                answer = get_input("Your answer (T/F): ")
+            elif question.q_type == 'FillBlank':
+                answer = get_input("Your answer: ")
+            else:
+                answer = get_input("Your answer (A/B/C/D): ")
+        return answer
+    
+    def award_achievements(self):
+        """Check for newly earned achievements and announce them"""
+        self.announce_achievements(self.current_user.check_achievements())
+    
+    def announce_achievements(self, new_achievements: List[Achievement]):
+        """Print newly earned achievements"""
         if new_achievements:
             print(f"\n{Colors.BRIGHT_YELLOW}🏆 NEW ACHIEVEMENTS UNLOCKED!{Colors.RESET}\n")
             for achievement in new_achievements:
                 print(f"  {achievement.icon} {achievement.name}")
+    
+    def adaptive_quiz(self, max_questions: int = 20, min_questions: int = 5, se_target: float = 0.4):
+        """Computerized-adaptive quiz: always ask the most informative unseen question"""
+        clear_screen()
+        print_header("🎯 ADAPTIVE QUIZ")
+        
+        prior = self.calibration.get('abilities', {}).get(self.current_user.name, {}).get('theta', 0.0)
+        estimate = AbilityEstimate(prior_mean=prior)
+        index = self.information_index
+        
+        print("Each question is chosen to match your current ability estimate.")
+        print(f"The quiz stops once your level is measured precisely (at most {max_questions} questions).\n")
+        press_enter()
+        
+        seen = set()
+        score = 0
+        asked = 0
+        start_time = time.time()
+        
+        while asked < max_questions:
+            question = index.select(estimate.theta, seen)
+            if question is None:
+                break
+            seen.add(question.q_id)
+            
+            clear_screen()
+            print(f"{Colors.BOLD}Question {asked + 1}{Colors.RESET}")
+            print(f"{Colors.DIM}Current Score: {score}/{asked} | "
+                  f"Ability: {estimate.theta:+.2f} ± {estimate.se:.2f}{Colors.RESET}\n")
+            
+            question.display()
+            answer = self.prompt_answer(question)
+            
+            if answer.upper() == 'S':
+                print_warning("⏭️  Skipped")
+                press_enter()
+                continue
+            
+            is_correct = question.check_answer(answer)
+            asked += 1
+            estimate.update(*question.irt_params(), is_correct)
+            self.current_user.update_stats(is_correct, question.week, question.q_id)
+            
+            if is_correct:
+                score += 1
+                print_success("CORRECT!")
+            else:
+                print_error(f"INCORRECT! Correct answer: {question.correct}")
+            print(f"\n{Colors.CYAN}💡 Explanation: {question.explanation}{Colors.RESET}")
+            press_enter()
+            
+            if asked >= min_questions and estimate.se < se_target:
+                break
         
+        duration = time.time() - start_time
+        
+        clear_screen()
+        print_header("📊 ADAPTIVE QUIZ COMPLETE!", Colors.GREEN)
+        if asked:
+            print(f"{Colors.BOLD}Score: {score}/{asked}{Colors.RESET}")
+        print(f"Time Taken: {int(duration // 60)}m {int(duration % 60)}s\n")
+        print(f"{Colors.BOLD}Estimated Ability:{Colors.RESET} {estimate.theta:+.2f} "
+              f"(± {estimate.se:.2f})")
+        print(f"{Colors.BOLD}Working Level:{Colors.RESET} {label_for_difficulty(estimate.theta)}")
+        
+        self.award_achievements()
         self.save_data()
         press_enter()
     
     def coding_challenges_menu(self):
         """Coding challenges menu"""
+        get_sandbox_pool()  # warm the workers while the user reads and types
         clear_screen()
         print_header("🔨 CODING CHALLENGES")
         
@@ -1771,10 +5644,26 @@ class QuizManager:
         user_code = '\n'.join(lines)
         
         print(f"\n{Colors.CYAN}Testing your solution...{Colors.RESET}\n")
-        time.sleep(1)
+        pause(1)
         
         success, message = challenge.test_solution(user_code)
         
+        if success and challenge.input_generator is not None:
+            print_success(message)
+            print(f"\n{Colors.CYAN}Running generated tests against the reference solution...{Colors.RESET}\n", flush=True)
+            success, message = challenge.differential_test(user_code)
+        
+        if success and challenge.input_generator is not None:
+            print_success(message)
+            print(f"\n{Colors.CYAN}Judging performance against the reference solution...{Colors.RESET}\n", flush=True)
+            success, message, rows = challenge.judge_performance(user_code)
+            if rows:
+                print(f"  {'Size':>8}  {'Yours':>10}  {'Reference':>10}  {'Peak memory (yours/ref)':>24}")
+                for size, user_time, ref_time, user_peak, ref_peak in rows:
+                    print(f"  {size:>8,}  {user_time * 1000:>8.2f}ms  {ref_time * 1000:>8.2f}ms  "
+                          f"{user_peak / 1024:>10.0f}KB / {ref_peak / 1024:.0f}KB")
+                print()
+        
         if success:
             print_success(message)
             self.current_user.coding_completed += 1
@@ -1788,8 +5677,8 @@ class QuizManager:
         
         press_enter()
     
-    def flashcard_mode(self):
-        """Flashcard study mode"""
+    def flashcard_mode(self, new_cards_per_session: int = 20):
+        """Flashcard study mode with SM-2 spaced repetition"""
         clear_screen()
         print_header("📝 FLASHCARD MODE")
         
@@ -1812,17 +5701,28 @@ class QuizManager:
             return
         
         difficulty = difficulty_map[choice]
-        
-        if difficulty == 'Mixed':
-            cards = self.questions
-        else:
-            cards = [q for q in self.questions if q.difficulty == difficulty]
-        
-        random.shuffle(cards)
-        
-        for i, card in enumerate(cards, 1):
+        by_id = self.question_index
+        
+        def accept(q_id: str) -> bool:
+            question = by_id.get(q_id)
+            return question is not None and difficulty in ('Mixed', question.difficulty)
+        
+        # Due reviews first, then unseen cards in curriculum order
+        queue = self.current_user.review_queue
+        today = datetime.now().date()
+        known = self.current_user.flashcards
+        new_cards = (q.q_id for q in self.questions
+                     if q.q_id not in known and accept(q.q_id))
+        session = itertools.chain(queue.due(today, accept),
+                                  itertools.islice(new_cards, new_cards_per_session))
+        
+        reviewed = 0
+        for i, q_id in enumerate(session, 1):
+            card = by_id[q_id]
+            state = known.get(q_id)
             clear_screen()
-            print(f"{Colors.BOLD}Flashcard {i}/{len(cards)}{Colors.RESET}\n")
+            status = "New card" if state is None else f"Review (interval {state['interval']}d)"
+            print(f"{Colors.BOLD}Flashcard {i}{Colors.RESET} {Colors.DIM}{status}{Colors.RESET}\n")
             print(f"{Colors.CYAN}Week {card.week} - {card.difficulty}{Colors.RESET}\n")
             print(f"{Colors.BOLD}{card.question}{Colors.RESET}\n")
             
@@ -1831,9 +5731,20 @@ class QuizManager:
             print(f"\n{Colors.GREEN}Answer: {card.correct}{Colors.RESET}")
             print(f"\n{Colors.CYAN}Explanation: {card.explanation}{Colors.RESET}\n")
             
-            response = get_input("Continue? (Y/N): ")
-            if response.upper() != 'Y':
+            ratings = '  '.join(f"{key}) {label}" for key, (label, _) in RECALL_GRADES.items())
+            response = get_input(f"How well did you recall it? {ratings}  [Q to quit]: ")
+            if response not in RECALL_GRADES:
                 break
+            queue.review(q_id, RECALL_GRADES[response][1], today)
+            reviewed += 1
+        
+        clear_screen()
+        if reviewed:
+            print_success(f"Reviewed {reviewed} card(s). Progress saved!")
+            self.save_data()
+        else:
+            print_info("🎉 No cards due right now. Come back later!")
+        press_enter()
     
     def review_incorrect(self):
         """Review incorrect answers"""
@@ -1855,14 +5766,59 @@ class QuizManager:
         print("These are questions you've answered incorrectly. Time to master them!\n")
         press_enter()
         
-        self.run_quiz(week=None, num_questions=len(incorrect_qs), random_mix=False)
+        self.run_quiz(num_questions=len(incorrect_qs), questions=incorrect_qs, title="Review Quiz")
+    
+    def recommended_practice(self, num_questions: int = 10):
+        """Quiz on the unseen questions the recommender predicts you are most likely to miss"""
+        model = self.recommender
+        if model is None:
+            clear_screen()
+            started = self.refresh_recommender()
+            print_info("Your recommendations are still being prepared." if started else
+                       "Answer some questions first so we can learn what to recommend.")
+            press_enter()
+            return
+        
+        by_id = self.question_index
+        picks = [by_id[q_id] for q_id, _ in model.recommend(self.current_user, num_questions)
+                 if q_id in by_id]
+        if not picks:
+            clear_screen()
+            print_info("🎉 You've seen every question we have a prediction for. Try a Random Quiz!")
+            press_enter()
+            return
+        
+        self.run_quiz(num_questions=len(picks), questions=picks, title="Recommended Practice")
     
     def view_progress(self):
         """View detailed progress"""
         clear_screen()
         self.current_user.display_stats()
+        self.display_readiness()
         press_enter()
     
+    def display_readiness(self, min_questions: int = 20):
+        """Show the Monte Carlo exam-readiness estimate"""
+        print_subheader("🎓 Exam Readiness")
+        if self.current_user.total_questions < min_questions:
+            print(f"  {Colors.DIM}Answer at least {min_questions} questions for a readiness estimate.{Colors.RESET}")
+            return
+        
+        result = simulate_readiness(self.current_user, self.questions)
+        chance = result['pass_probability'] * 100
+        if chance >= 80:
+            color = Colors.GREEN
+        elif chance >= 50:
+            color = Colors.YELLOW
+        else:
+            color = Colors.RED
+        print(f"  Chance of passing: {color}{chance:.0f}%{Colors.RESET} "
+              f"{Colors.DIM}(95% CI {result['ci_low'] * 100:.1f}-{result['ci_high'] * 100:.1f}%, "
+              f"{result['forms']} simulated exams){Colors.RESET}")
+        print(f"  Expected score: {result['expected_score']:.1f}/{result['form_length']} "
+              f"(pass mark {result['pass_score']}; 90% of exams between "
+              f"{result['score_p5']} and {result['score_p95']})")
+    
     def view_achievements(self):
         """View achievements"""
         clear_screen()
@@ -1899,12 +5855,32 @@ class QuizManager:
         
         print("Pomodoro Technique: 25 minutes of focused study, 5-minute break.\n")
         
+        live = live_terminal()
+        if live is not None:
+            print(f"{Colors.DIM}The timer runs in the background and is shown at the top of the screen.{Colors.RESET}\n")
+        
         print("  1. Start Pomodoro Session")
         print("  2. Custom Timer")
         print("  3. Back")
+        if live is not None and 'pomodoro' in live.timers:
+            print("  4. Stop Running Timer")
         
         choice = get_input("\nYour choice: ")
         
+        if live is not None:
+            if choice == '1':
+                live.start_timer('pomodoro', "🍅 Study", 25 * 60,
+                                 on_expire=lambda: live.start_timer('pomodoro', "☕ Break", 5 * 60))
+            elif choice == '2':
+                try:
+                    live.start_timer('pomodoro', "🍅 Study", int(get_input("Enter minutes: ")) * 60)
+                except ValueError:
+                    print_error("Invalid input!")
+                    pause(1)
+            elif choice == '4':
+                live.timers.pop('pomodoro', None)
+            return
+        
         if choice == '1':
             self.run_timer(25 * 60, "Study Time")
             print_success("\n🎉 Great work! Time for a 5-minute break.")
@@ -1935,7 +5911,7 @@ class QuizManager:
             time.sleep(1)
         
         print(f"\r{Colors.BRIGHT_GREEN}✓ Complete!{Colors.RESET}")
-        time.sleep(1)
+        pause(1)
     
     def export_to_csv(self):
         """Export progress to CSV"""
@@ -1945,34 +5921,7 @@ class QuizManager:
         filename = f"quiz_progress_{self.current_user.name}_{datetime.now().strftime('%Y%m%d')}.csv"
         
         try:
-            with open(filename, 'w', newline='') as f:
-                writer = csv.writer(f)
-                
-                # Header
-                writer.writerow(['AWS Cloud Institute Quiz - Progress Report'])
-                writer.writerow(['User', self.current_user.name])
-                writer.writerow(['Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
-                writer.writerow([])
-                
-                # Overall stats
-                writer.writerow(['Overall Statistics'])
-                writer.writerow(['Total Questions', self.current_user.total_questions])
-                writer.writerow(['Correct Answers', self.current_user.total_correct])
-                writer.writerow(['Incorrect Answers', self.current_user.total_incorrect])
-                writer.writerow(['Accuracy', f"{self.current_user.get_accuracy():.1f}%"])
-                writer.writerow(['Best Streak', self.current_user.best_streak])
-                writer.writerow([])
-                
-                # Week breakdown
-                writer.writerow(['Week', 'Attempted', 'Correct', 'Accuracy'])
-                for week in range(1, 11):
-                    stats = self.current_user.week_stats[week]
-                    if stats['attempted'] > 0:
-                        accuracy = (stats['correct'] / stats['attempted']) * 100
-                        writer.writerow([f"Week {week}", stats['attempted'], stats['correct'], f"{accuracy:.1f}%"])
-                    else:
-                        writer.writerow([f"Week {week}", 0, 0, "N/A"])
-            
+            self.current_user.write_csv(filename)
             print_success(f"Progress exported to: {filename}")
         except Exception as e:
             print_error(f"Export failed: {e}")
@@ -1986,7 +5935,8 @@ class QuizManager:
         
         print("  1. Change User")
         print("  2. Reset Progress")
-        print("  3. Back")
+        print(f"  3. Question Selection ({QUESTION_SELECTION[self.current_user.question_selection][0]})")
+        print("  4. Back")
         
         choice = get_input("\nYour choice: ")
         
@@ -1999,7 +5949,443 @@ class QuizManager:
                 self.users[self.current_user.name] = self.current_user
                 self.save_data()
                 print_success("Progress reset!")
-                time.sleep(1)
+                pause(1)
+        elif choice == '3':
+            self.choose_question_selection()
+    
+    def choose_question_selection(self):
+        """Choose how Random Quiz and Practice by Week pick questions"""
+        print()
+        modes = list(QUESTION_SELECTION)
+        for i, mode in enumerate(modes, 1):
+            name, description = QUESTION_SELECTION[mode]
+            marker = f" {Colors.GREEN}(current){Colors.RESET}" if mode == self.current_user.question_selection else ""
+            print(f"  {i}. {name} - {Colors.DIM}{description}{Colors.RESET}{marker}")
+        choice = get_input("\nYour choice: ")
+        if choice.isdigit() and 1 <= int(choice) <= len(modes):
+            self.current_user.question_selection = modes[int(choice) - 1]
+            self.save_data()
+            print_success(f"Question selection: {QUESTION_SELECTION[self.current_user.question_selection][0]}")
+            pause(1)
+
+STARTUP_BUDGET_MS = 50.0
+
+def benchmark_startup(runs: int = 5) -> Tuple[Dict[str, float], List[Tuple[float, str]]]:
+    """Cold start in a fresh interpreter, best of runs (ms)
+    
+    Returns the module import time reported by -X importtime, the time until
+    the user picker can be drawn (import + QuizManager + profiles), and the
+    slowest imports of the last run as (ms, module) pairs. Running the file as
+    a script also recompiles it on every start, which this does not include.
+    """
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get('PYTHONPATH')])))
+    env.pop('PYTHONDONTWRITEBYTECODE', None)  # time the usual case: a warm bytecode cache
+    script = ("import time; start = time.perf_counter(); import aws_quiz_ultimate; "
+              "aws_quiz_ultimate.QuizManager().users; print((time.perf_counter() - start) * 1000)")
+    best = {'import': float('inf'), 'user picker': float('inf')}
+    slowest = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                                capture_output=True, text=True, env=env, check=True)
+        nested = []  # imports since the last top-level one, i.e. pulled in by it
+        for line in result.stderr.splitlines():
+            fields = line[len('import time:'):].split('|')
+            if not line.startswith('import time:') or not fields[0].strip().isdigit():
+                continue  # column headings
+            name = fields[2][1:].rstrip()
+            if name.startswith(' '):
+                nested.append((int(fields[0]) / 1000, name.strip()))
+            elif name == 'aws_quiz_ultimate':
+                best['import'] = min(best['import'], int(fields[1]) / 1000)
+                slowest = heapq.nlargest(5, nested)
+            else:
+                nested = []
+        best['user picker'] = min(best['user picker'], float(result.stdout.strip().splitlines()[-1]))
+    return best, slowest
+
+def benchmark_rendering(questions: int = 50, seed: int = 0) -> Dict[str, float]:
+    """Mean run_quiz latency per question (ms): spawning `clear` vs the frame renderer
+    
+    Runs the real quiz loop on scripted answers in a scratch directory, with
+    output sent to the null device so only the drawing cost is measured.
+    """
+    import io
+    import tempfile
+    
+    def spawn_clear():
+        os.system('cls' if os.name == 'nt' else 'clear')
+    
+    results = {}
+    real_stdin, real_stdout, real_clear = sys.stdin, sys.stdout, globals()['clear_screen']
+    cwd = os.getcwd()
+    saved_fds = [os.dup(1), os.dup(2)]
+    with tempfile.TemporaryDirectory() as scratch, open(os.devnull, 'w', buffering=1) as sink:
+        os.chdir(scratch)
+        manager = QuizManager()
+        manager.current_user = manager.users['bench'] = UserProfile('bench')
+        os.dup2(sink.fileno(), 1)
+        os.dup2(sink.fileno(), 2)
+        try:
+            for mode in ('os.system(clear)', 'renderer'):
+                answers = io.StringIO('\n' + 'A\n\n' * questions + '\n')
+                if mode == 'renderer':
+                    TerminalRenderer(sink, answers).install()
+                else:
+                    sys.stdin, sys.stdout = answers, sink
+                    globals()['clear_screen'] = spawn_clear
+                random.seed(seed)
+                start = time.perf_counter()
+                manager.run_quiz(num_questions=questions, random_mix=True)
+                results[mode] = (time.perf_counter() - start) * 1000 / questions
+                sys.stdin, sys.stdout = real_stdin, real_stdout
+                globals()['clear_screen'] = real_clear
+        finally:
+            sys.stdin, sys.stdout = real_stdin, real_stdout
+            globals()['clear_screen'] = real_clear
+            for fd, saved in zip((1, 2), saved_fds):
+                os.dup2(saved, fd)
+                os.close(saved)
+            os.chdir(cwd)
+    return results
+
+# ============================================================================
+# LOAD TESTING
+# ============================================================================
+
+LOAD_OPERATIONS = ('load_data', 'save_data', 'load_profile', 'select', 'answer', 'save_profile')
+
+_load_progress = None  # flows finished, shared by every load worker
+
+def process_usage(pid: int) -> Optional[Tuple[float, int]]:
+    """CPU seconds and resident bytes of a process, from /proc (None where unavailable)"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open(f'/proc/{pid}/statm') as f:
+            resident = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    ticks = os.sysconf('SC_CLK_TCK')
+    return (int(fields[11]) + int(fields[12])) / ticks, resident * os.sysconf('SC_PAGE_SIZE')
+
+def generate_load_data(data_file: str, questions: List[Question], users: int, attempts: int, seed: int = 0):
+    """Write a data file of synthetic profiles sharing `attempts` answers between them"""
+    rng = random.Random(seed)
+    per_user, extra = divmod(attempts, users)
+    data = {}
+    for n in range(users):
+        profile = UserProfile(f"load{n}")
+        ability = rng.random()
+        for _ in range(per_user + (n < extra)):
+            question = questions[int(rng.random() * len(questions))]
+            profile.update_stats(rng.random() < ability, question.week, question.q_id)
+        data[profile.name] = profile.to_dict()
+    with open(data_file, 'w') as f:
+        json.dump(data, f, indent=2)
+
+def _init_load_worker(progress):
+    global _load_progress
+    _load_progress = progress
+
+def _load_worker(data_file: str, users: int, flows: int, num_questions: int, full_every: int,
+                 seed: int) -> Tuple[Dict[str, array], Dict[str, int]]:
+    """Run quiz flows against one data file; returns timings (seconds) and errors per operation
+    
+    A flow is what a student does: open their profile, get a quiz, answer it
+    and save. Every full_every flows the worker also does what the menu does
+    at start and exit, loading and saving every profile.
+    """
+    rng = random.Random(seed)
+    manager = QuizManager()
+    manager.data_file = data_file
+    manager.questions  # built once, as in a running app
+    timings = {operation: array('d') for operation in LOAD_OPERATIONS}
+    errors = defaultdict(int)
+    clock = time.perf_counter
+    weeks = [None] + list(WEEK_TOPICS)
+    
+    def timed(operation, func, *args):
+        start = clock()
+        result = func(*args)
+        timings[operation].append(clock() - start)
+        return result
+    
+    for n in range(flows):
+        if full_every and n % full_every == 0:
+            timed('load_data', manager.load_data)
+            timed('save_data', manager.save_data)
+        name = f"load{rng.randrange(users)}"
+        profile = timed('load_profile', manager.load_profile, name)
+        if profile is None:
+            errors['load_profile'] += 1
+            profile = UserProfile(name)
+        session = QuizSession(timed('select', manager.select_questions, rng.choice(weeks), num_questions), profile)
+        events = session.start()
+        while session.state != 'finished':
+            question = events[0][2]
+            answer = question.correct if rng.random() < 0.6 else 'X'
+            timed('answer', session.answer, answer)
+            events = session.advance()
+        try:
+            timed('save_profile', manager.save_profile, profile)
+        except OSError:
+            errors['save_profile'] += 1
+        with _load_progress.get_lock():
+            _load_progress.value += 1
+    return timings, dict(errors)
+
+def latency_summary(samples, elapsed: float) -> Dict[str, float]:
+    """Count, throughput and p50/p99/max latency (ms) of one operation's timings"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {'count': 0, 'per_second': 0.0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    rank = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {'count': len(ordered), 'per_second': len(ordered) / elapsed,
+            'p50_ms': rank(0.50), 'p99_ms': rank(0.99), 'max_ms': ordered[-1] * 1000}
+
+def load_test(users: int = 200, attempts: int = 20000, flows: int = 200, workers: int = 4,
+              mode: str = 'threads', num_questions: int = 10, full_every: int = 50,
+              interval: float = 0.5, seed: int = 0) -> dict:
+    """Drive concurrent quiz flows against the engine and the data file
+    
+    A scratch data file with `users` profiles and `attempts` recorded answers
+    is generated first; then `workers` threads or processes share `flows`
+    quiz flows between them. A sampler records CPU use, resident memory and
+    progress every `interval` seconds (CPU and memory need /proc).
+    """
+    import multiprocessing
+    import multiprocessing.pool
+    import tempfile
+    import threading
+    
+    with tempfile.TemporaryDirectory() as scratch:
+        data_file = os.path.join(scratch, 'quiz_data.json')
+        start = time.perf_counter()
+        generate_load_data(data_file, create_question_database(), users, attempts, seed)
+        setup_seconds = time.perf_counter() - start
+        data_bytes = os.path.getsize(data_file)
+        
+        progress = multiprocessing.Value('l', 0)
+        chunks = [(data_file, users, flows // workers + (i < flows % workers), num_questions, full_every, seed + i)
+                  for i in range(workers)]
+        if mode == 'processes':
+            pool = multiprocessing.Pool(workers, _init_load_worker, (progress,))
+        else:
+            _init_load_worker(progress)
+            pool = multiprocessing.pool.ThreadPool(workers)
+        
+        timeline = []
+        stopped = threading.Event()
+        
+        def sample():
+            last_cpu = last_time = None
+            while True:
+                usage = [process_usage(pid) for pid in
+                         [os.getpid()] + [child.pid for child in multiprocessing.active_children()]]
+                usage = [u for u in usage if u is not None]
+                now = time.perf_counter()
+                cpu = sum(u[0] for u in usage)
+                timeline.append({
+                    'seconds': now - start,
+                    'cpu_percent': (max(0.0, cpu - last_cpu) / max(now - last_time, 1e-9) * 100
+                                    if usage and last_time is not None else None),
+                    'rss_mb': sum(u[1] for u in usage) / 2 ** 20 if usage else None,
+                    'flows': progress.value,
+                })
+                last_cpu, last_time = cpu, now
+                if stopped.is_set():
+                    break
+                stopped.wait(interval)
+        
+        start = time.perf_counter()
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        try:
+            if mode == 'processes':
+                parts = collect_metered(pool.starmap(_metered, [(_load_worker,) + chunk for chunk in chunks]))
+            else:
+                parts = pool.starmap(_load_worker, chunks)
+        finally:
+            pool.close()
+            pool.join()
+        elapsed = time.perf_counter() - start
+        stopped.set()
+        sampler.join()
+    
+    errors = defaultdict(int)
+    operations = {}
+    for operation in LOAD_OPERATIONS:
+        samples = array('d')
+        for timings, part_errors in parts:
+            samples.extend(timings[operation])
+        operations[operation] = latency_summary(samples, elapsed)
+    for _, part_errors in parts:
+        for operation, count in part_errors.items():
+            errors[operation] += count
+    
+    return {
+        'users': users,
+        'attempts': attempts,
+        'flows': flows,
+        'workers': workers,
+        'mode': mode,
+        'data_mb': data_bytes / 2 ** 20,
+        'setup_seconds': setup_seconds,
+        'seconds': elapsed,
+        'flows_per_second': flows / elapsed,
+        'operations': operations,
+        'errors': dict(errors),
+        'timeline': timeline,
+    }
+
+# ============================================================================
+# PROFILING
+# ============================================================================
+
+PROFILE_DIR = 'profiles'
+PROFILE_TOP = 25  # rows in each table of the report
+
+# What --profile times: module functions by name, then methods by class
+PROFILED_FUNCTIONS = ('clear_screen', 'create_question_database', 'create_coding_challenges', 'highlight_code')
+PROFILED_METHODS = (
+    (QuizManager, ('load_data', 'save_data', 'load_profile', 'save_profile', 'write_data_file', 'write_data_text',
+                   'select_user', 'refresh_recommender', 'refresh_variants', 'main_menu', 'practice_by_week', 'random_quiz',
+                   'coding_challenges_menu', 'run_coding_challenge', 'flashcard_mode', 'review_incorrect',
+                   'view_progress', 'view_achievements', 'timed_quiz', 'pomodoro_timer', 'export_to_csv',
+                   'adaptive_quiz', 'recommended_practice', 'settings', 'select_questions', 'run_quiz',
+                   'prompt_answer')),
+    (UserProfile, ('from_dict', 'to_dict', 'update_stats')),
+    (QuizSession, ('start', 'answer', 'advance')),
+    (Question, ('display',)),
+    (CodingChallenge, ('test_solution',)),
+)
+
+class SessionProfiler:
+    """Timing spans over the app's hot paths for one --profile session
+    
+    Nothing is wrapped until instrument() runs, so without --profile the app
+    pays nothing. Every span records its self time under its full call path
+    (per thread), which is the collapsed-stack format flame graph tools read.
+    """
+    
+    def __init__(self, directory: str = PROFILE_DIR, cprofile: bool = False, memory: bool = False):
+        import threading
+        self.directory = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}")
+        self.cprofile = cprofile
+        self.memory = memory
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.spans: Dict[str, List[float]] = {}      # name -> [calls, total, max]
+        self.paths: Dict[Tuple[str, ...], float] = defaultdict(float)  # call path -> self seconds
+        self.started = 0.0
+        self._profile = None
+        self._snapshot = None
+    
+    def wrap(self, name: str, function: Callable) -> Callable:
+        """function, timed as a span called name"""
+        def timed(*args, **kwargs):
+            frames = getattr(self.local, 'frames', None)
+            if frames is None:
+                import threading
+                frames = self.local.frames = [[threading.current_thread().name, 0.0]]
+            frame = [name, 0.0]
+            frames.append(frame)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                path = tuple(entry[0] for entry in frames)
+                frames.pop()
+                frames[-1][1] += elapsed
+                with self.lock:
+                    span = self.spans.setdefault(name, [0, 0.0, 0.0])
+                    span[0] += 1
+                    span[1] += elapsed
+                    span[2] = max(span[2], elapsed)
+                    self.paths[path] += elapsed - frame[1]
+        timed.__name__, timed.__doc__, timed.__wrapped__ = function.__name__, function.__doc__, function
+        return timed
+    
+    def instrument(self):
+        """Wrap every PROFILED_FUNCTIONS and PROFILED_METHODS entry in a span"""
+        module = globals()
+        for name in PROFILED_FUNCTIONS:
+            module[name] = self.wrap(name, module[name])
+        for cls, names in PROFILED_METHODS:
+            for name in names:
+                attribute = cls.__dict__[name]
+                if isinstance(attribute, (classmethod, staticmethod)):
+                    wrapped = type(attribute)(self.wrap(f"{cls.__name__}.{name}", attribute.__func__))
+                else:
+                    wrapped = self.wrap(f"{cls.__name__}.{name}", attribute)
+                setattr(cls, name, wrapped)
+    
+    def start(self):
+        self.started = time.perf_counter()
+        if self.memory:
+            import tracemalloc
+            tracemalloc.start()
+            self._snapshot = tracemalloc.take_snapshot()
+        if self.cprofile:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+    
+    def finish(self):
+        """Stop profiling and write the session report"""
+        duration = time.perf_counter() - self.started
+        if self._profile is not None:
+            self._profile.disable()
+        os.makedirs(self.directory, exist_ok=True)
+        lines = [f"Profile of: {' '.join(sys.argv)}", f"Session: {duration:.3f}s", "",
+                 f"{'Span':<34} {'Calls':>7} {'Total ms':>10} {'Mean ms':>9} {'Max ms':>9}"]
+        with self.lock:
+            spans = sorted(self.spans.items(), key=lambda item: -item[1][1])
+            paths = sorted(self.paths.items())
+        for name, (calls, total, longest) in spans:
+            lines.append(f"{name:<34} {calls:>7} {total * 1000:>10.2f} {total * 1000 / calls:>9.3f} "
+                         f"{longest * 1000:>9.3f}")
+        
+        # Self time in microseconds, one line per call path: flamegraph.pl, speedscope and inferno all read it
+        with open(os.path.join(self.directory, 'spans.collapsed'), 'w') as f:
+            for path, seconds in paths:
+                if round(seconds * 1e6) > 0:
+                    f.write(f"{';'.join(path)} {round(seconds * 1e6)}\n")
+        
+        if self._profile is not None:
+            import io
+            import pstats
+            self._profile.dump_stats(os.path.join(self.directory, 'cprofile.pstats'))
+            out = io.StringIO()
+            pstats.Stats(self._profile, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP)
+            lines += ["", "cProfile (by cumulative time):", out.getvalue().strip()]
+        
+        if self.memory:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            snapshot.dump(os.path.join(self.directory, 'memory.snapshot'))
+            lines += ["", f"Memory: {current / 1024:.0f} KB allocated at exit, {peak / 1024:.0f} KB peak",
+                      "", "Largest allocations:"]
+            lines += [f"  {stat}" for stat in snapshot.statistics('lineno')[:PROFILE_TOP]]
+            lines += ["", "Growth during the session:"]
+            lines += [f"  {stat}" for stat in snapshot.compare_to(self._snapshot, 'lineno')[:PROFILE_TOP]]
+        
+        with open(os.path.join(self.directory, 'report.txt'), 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        print_info(f"Profile written to: {self.directory}")
+
+def start_profiling(directory: str = PROFILE_DIR, cprofile: bool = False, memory: bool = False) -> SessionProfiler:
+    """Instrument the app and write a report when the process exits"""
+    profiler = SessionProfiler(directory, cprofile, memory)
+    profiler.instrument()
+    profiler.start()
+    atexit.register(profiler.finish)
+    return profiler
 
 # ============================================================================
 # MAIN
@@ -2007,6 +6393,355 @@ class QuizManager:
 
 def main():
     """Main entry point"""
+    import argparse
+    parser = argparse.ArgumentParser(description="AWS Cloud Institute - Developer Fundamentals Quiz")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"Time menu actions and hot paths; write a report to {PROFILE_DIR}/")
+    parser.add_argument('--profile-dir', default=PROFILE_DIR, metavar='DIR',
+                        help=f"Where --profile reports go (default: {PROFILE_DIR})")
+    parser.add_argument('--profile-cprofile', action='store_true', help="Also run cProfile (implies --profile)")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Also take tracemalloc snapshots (implies --profile)")
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help="Write Prometheus metrics here for node_exporter's textfile collector")
+    parser.add_argument('--metrics-interval', type=float, default=METRICS_INTERVAL, metavar='SECONDS',
+                        help=f"Seconds between metrics writes (default: {METRICS_INTERVAL})")
+    subparsers = parser.add_subparsers(dest='command')
+    calibrate_parser = subparsers.add_parser('calibrate', help="Calibrate question difficulty from attempt history")
+    calibrate_parser.add_argument('--min-attempts', type=int, default=20,
+                                  help="Minimum attempts before a question can be flagged (default: 20)")
+    calibrate_parser.add_argument('--report', default='irt_report.csv', help="Mislabeled-question report file")
+    subparsers.add_parser('train-recommender', help="Retrain the question recommender over all users")
+    variants_parser = subparsers.add_parser('build-variants', help="Pre-render question template variants")
+    variants_parser.add_argument('--count', type=int, default=TEMPLATE_VARIANTS,
+                                 help=f"Variants per template (default: {TEMPLATE_VARIANTS})")
+    variants_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                                 help="Worker processes (default: all cores)")
+    grade_parser = subparsers.add_parser('grade', help="Grade a directory or tarball of coding challenge submissions")
+    grade_parser.add_argument('path', help="Directory or tar archive of *.py submissions")
+    grade_parser.add_argument('--challenge', required=True, help="Challenge number (1-based) or title")
+    grade_parser.add_argument('--output', default='grades.csv', help="Report file, .csv or .json (default: grades.csv)")
+    grade_parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    grade_parser.add_argument('--generated', type=int, default=GRADE_GENERATED_TESTS,
+                              help=f"Generated tests per submission (default: {GRADE_GENERATED_TESTS})")
+    subparsers.add_parser('list-users', help="List saved profiles")
+    stats_parser = subparsers.add_parser('stats', help="Show statistics without starting the menu")
+    stats_parser.add_argument('--user', action='append', help="Profile name (repeatable; default: every user)")
+    stats_parser.add_argument('--json', action='store_true', help="Print one JSON object per user")
+    export_parser = subparsers.add_parser('export', help="Export a user's progress report")
+    export_parser.add_argument('--user', required=True, help="Profile name")
+    export_parser.add_argument('--format', choices=['csv', 'json'], default='csv', help="Report format (default: csv)")
+    export_parser.add_argument('--output', help="Report file (default: quiz_progress_USER_DATE.FORMAT)")
+    quiz_parser = subparsers.add_parser('quiz', help="Grade a file of answers to one week's questions")
+    quiz_parser.add_argument('--week', type=int, required=True, choices=range(1, 11), metavar='1-10',
+                             help="Week whose questions are answered")
+    quiz_parser.add_argument('--answers', required=True,
+                             help="File with one answer per line, in question order ('-' for stdin; S skips)")
+    quiz_parser.add_argument('--user', help="Record the answers on this profile")
+    simulate_parser = subparsers.add_parser('simulate', help="Benchmark the quiz engine on synthetic sessions")
+    simulate_parser.add_argument('--sessions', type=int, default=100000, help="Quizzes to run (default: 100000)")
+    simulate_parser.add_argument('--questions', type=int, default=10, help="Questions per quiz (default: 10)")
+    simulate_parser.add_argument('--learners', type=int, default=1000, help="Synthetic learners (default: 1000)")
+    simulate_parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    simulate_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                                 help="Processes to spread the sessions over (default: all cores)")
+    serve_parser = subparsers.add_parser('serve', help="Serve quizzes as a JSON API over HTTP")
+    serve_parser.add_argument('--host', default='127.0.0.1', help="Address to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument('--port', type=int, default=8080, help="Port to listen on (default: 8080)")
+    serve_parser.add_argument('--max-sessions', type=int, default=SERVER_MAX_SESSIONS,
+                              help=f"Active sessions kept (default: {SERVER_MAX_SESSIONS})")
+    serve_parser.add_argument('--ttl', type=float, default=SERVER_SESSION_TTL,
+                              help=f"Seconds before an idle session is dropped (default: {SERVER_SESSION_TTL})")
+    classroom_parser = subparsers.add_parser('classroom', help="Run or join a live classroom quiz")
+    classroom_parser.add_argument('role', choices=['host', 'join'], help="host (instructor) or join (student)")
+    classroom_parser.add_argument('--name', help="Your name on the leaderboard (join)")
+    classroom_parser.add_argument('--week', type=int, default=0, choices=range(0, 11), metavar='0-10',
+                                  help="Week to draw questions from; 0 mixes all weeks (host, default: 0)")
+    classroom_parser.add_argument('--questions', type=int, default=10, help="Questions in the form (host, default: 10)")
+    classroom_parser.add_argument('--seconds', type=float, default=CLASSROOM_ROUND_SECONDS,
+                                  help=f"Time per question (host, default: {CLASSROOM_ROUND_SECONDS})")
+    classroom_parser.add_argument('--host', default='127.0.0.1',
+                                  help="Address to listen on or connect to (default: 127.0.0.1)")
+    classroom_parser.add_argument('--port', type=int, default=CLASSROOM_PORT,
+                                  help=f"TCP port (default: {CLASSROOM_PORT})")
+    classroom_parser.add_argument('--unix', metavar='PATH', help="Use a Unix socket instead of TCP")
+    bench_classroom_parser = subparsers.add_parser('bench-classroom', help="Benchmark classroom round latency")
+    bench_classroom_parser.add_argument('--clients', type=int, default=300, help="Bot students (default: 300)")
+    bench_classroom_parser.add_argument('--rounds', type=int, default=10, help="Questions (default: 10)")
+    forms_parser = subparsers.add_parser('forms', help="Generate parallel exam forms from a blueprint")
+    forms_parser.add_argument('--count', type=int, default=10, help="Forms to generate (default: 10)")
+    forms_parser.add_argument('--per-week', type=int, default=2, help="Questions per week (default: 2)")
+    forms_parser.add_argument('--mix', default='30/50/20',
+                              help="Beginner/Intermediate/Advanced percentages (default: 30/50/20)")
+    forms_parser.add_argument('--min-type', action='append', default=[], metavar='TYPE=N',
+                              help="At least N questions of TYPE, e.g. CodeOutput=3 (repeatable)")
+    forms_parser.add_argument('--seed', type=int, help="Random seed, for reproducible forms")
+    forms_parser.add_argument('--output', default='exam_forms.csv', help="CSV or JSON file (default: exam_forms.csv)")
+    load_parser = subparsers.add_parser('load-test', help="Load-test the quiz engine and data file")
+    load_parser.add_argument('--users', type=int, default=200, help="Profiles in the data file (default: 200)")
+    load_parser.add_argument('--attempts', type=int, default=20000,
+                             help="Answers already recorded across them (default: 20000)")
+    load_parser.add_argument('--flows', type=int, default=200, help="Quiz flows to run (default: 200)")
+    load_parser.add_argument('--workers', type=int, default=4, help="Simulated users at once (default: 4)")
+    load_parser.add_argument('--mode', choices=['threads', 'processes'], default='threads',
+                             help="Run workers as threads or processes (default: threads)")
+    load_parser.add_argument('--interval', type=float, default=0.5,
+                             help="Seconds between CPU/memory samples (default: 0.5)")
+    load_parser.add_argument('--json', action='store_true', help="Print the full report as JSON")
+    startup_parser = subparsers.add_parser('bench-startup', help="Benchmark cold start against its budget")
+    startup_parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to time (default: 5)")
+    bench_parser = subparsers.add_parser('bench-render', help="Benchmark quiz screen drawing")
+    bench_parser.add_argument('--questions', type=int, default=50, help="Questions per run (default: 50)")
+    args = parser.parse_args()
+    if args.profile or args.profile_cprofile or args.profile_memory:
+        start_profiling(args.profile_dir, args.profile_cprofile, args.profile_memory)
+    if args.metrics_file:
+        start_metrics_export(args.metrics_file, args.metrics_interval)
+    
+    if args.command == 'calibrate':
+        QuizManager().calibrate(min_attempts=args.min_attempts, report_file=args.report)
+        return
+    if args.command == 'train-recommender':
+        manager = QuizManager()
+        train_recommender(manager.data_file, manager.recommender_file)
+        print_success(f"Recommender saved to: {manager.recommender_file}")
+        return
+    if args.command == 'build-variants':
+        manager = QuizManager()
+        start = time.perf_counter()
+        rendered = manager.variant_cache.fill(list(manager.templates.values()), args.count, args.workers)
+        print_success(f"Rendered {rendered} variants of {len(manager.templates)} templates "
+                      f"in {time.perf_counter() - start:.2f}s ({manager.variant_file})")
+        return
+    if args.command == 'grade':
+        import tarfile
+        try:
+            challenge = find_challenge(create_coding_challenges(), args.challenge)
+            submissions = load_submissions(args.path)
+        except (OSError, ValueError, tarfile.TarError) as e:
+            print_error(str(e))
+            sys.exit(2)
+        start = time.time()
+        rows = grade_submissions(challenge, submissions, workers=args.workers, generated=args.generated)
+        write_grade_report(rows, args.output)
+        passed = sum(1 for row in rows if row['verdict'] == 'pass')
+        print_success(f"Graded {len(rows)} submissions ({len({row['sha256'] for row in rows})} unique) "
+                      f"for '{challenge.title}' in {time.time() - start:.1f}s: {passed} passed, "
+                      f"{len(rows) - passed} failed")
+        print_info(f"Report written to: {args.output}")
+        return
+    if args.command == 'list-users':
+        profiles = QuizManager().read_data_file()
+        for name, data in profiles.items():
+            total = data.get('total_questions', 0)
+            accuracy = data.get('total_correct', 0) / total * 100 if total else 0.0
+            print(f"{name}\t{data.get('last_active', '')[:10]}\t{total} questions\t{accuracy:.1f}%")
+        return
+    if args.command in ('stats', 'export'):
+        manager = QuizManager()
+        names = [args.user] if args.command == 'export' else args.user
+        if names is None:
+            profiles = [UserProfile.from_dict(data) for data in manager.read_data_file().values()]
+        else:
+            saved = manager.read_data_file()
+            missing = [name for name in names if name not in saved]
+            if missing:
+                print_error(f"No such user: {', '.join(missing)}")
+                sys.exit(2)
+            profiles = [UserProfile.from_dict(saved[name]) for name in names]
+        if args.command == 'export':
+            profile = profiles[0]
+            output = args.output or f"quiz_progress_{profile.name}_{datetime.now().strftime('%Y%m%d')}.{args.format}"
+            if args.format == 'csv':
+                profile.write_csv(output)
+            else:
+                with open(output, 'w') as f:
+                    json.dump(profile.summary(), f, indent=2)
+            print_success(f"Progress exported to: {output}")
+        elif args.json:
+            for profile in profiles:
+                print(json.dumps(profile.summary()))
+        else:
+            for profile in profiles:
+                profile.display_stats()
+        return
+    if args.command == 'quiz':
+        manager = QuizManager()
+        profile = None
+        if args.user:
+            profile = manager.load_profile(args.user)
+            if profile is None:
+                print_error(f"No such user: {args.user}")
+                sys.exit(2)
+        try:
+            if args.answers == '-':
+                lines = sys.stdin.read().splitlines()
+            else:
+                with open(args.answers, 'r') as f:
+                    lines = f.read().splitlines()
+        except OSError as e:
+            print_error(str(e))
+            sys.exit(2)
+        answers = [line.strip() for line in lines if not line.lstrip().startswith('#')]
+        results = manager.answer_quiz(args.week, answers, profile)
+        for question, answer, is_correct in results:
+            if is_correct is None:
+                print(f"{Colors.YELLOW}-{Colors.RESET} {question.q_id}  skipped")
+            elif is_correct:
+                print(f"{Colors.GREEN}✓{Colors.RESET} {question.q_id}  {answer}")
+            else:
+                print(f"{Colors.RED}✗{Colors.RESET} {question.q_id}  {answer} (correct: {question.correct})")
+        score = sum(1 for _, _, is_correct in results if is_correct)
+        print(f"\nScore: {score}/{len(results)}")
+        if profile is not None:
+            manager.current_user = profile
+            manager.award_achievements()
+            manager.save_profile(profile)
+        return
+    if args.command == 'simulate':
+        questions = create_question_database()
+        for option in ('sessions', 'learners', 'workers'):
+            if getattr(args, option) < 1:
+                print_error(f"--{option} must be at least 1")
+                sys.exit(2)
+        if not 1 <= args.questions <= len(questions):
+            print_error(f"--questions must be between 1 and {len(questions)} (the size of the question bank)")
+            sys.exit(2)
+        result = simulate_sessions(questions, args.sessions, args.questions,
+                                   args.learners, args.seed, args.workers)
+        print(f"  {result['sessions']:,} sessions, {result['answers']:,} answers in {result['seconds']:.1f}s "
+              f"({result['sessions_per_minute']:,.0f} sessions/minute)")
+        print(f"  {result['perfect_quizzes']:,} perfect quizzes, {result['achievements']:,} achievements earned")
+        return
+    if args.command == 'serve':
+        import asyncio
+        server = QuizServer(QuizManager(), SessionStore(args.max_sessions, args.ttl))
+        ready = lambda listener: print_success(f"Serving {len(server.questions)} questions on "
+                                               f"http://{args.host}:{args.port} (Ctrl+C to stop)")
+        try:
+            asyncio.run(server.serve(args.host, args.port, ready))
+        except KeyboardInterrupt:
+            print_info("Server stopped")
+        return
+    if args.command == 'classroom':
+        import asyncio
+        try:
+            if args.role == 'host':
+                form = classroom_form(create_question_database(), args.questions, args.week)
+                asyncio.run(host_classroom(form, args.seconds, args.host, args.port, args.unix))
+            elif not args.name:
+                parser.error("classroom join needs --name")
+            else:
+                asyncio.run(join_classroom(args.name, args.host, args.port, args.unix))
+        except OSError as e:
+            print_error(f"Could not reach the classroom: {e}")
+            sys.exit(1)
+        except KeyboardInterrupt:
+            print_info("Left the classroom")
+        return
+    if args.command == 'bench-classroom':
+        result = benchmark_classroom(args.clients, args.rounds)
+        print(f"  {result['clients']} clients, {result['rounds']} rounds: "
+              f"median {result['median_ms']:.1f} ms, worst {result['max_ms']:.1f} ms per round")
+        return
+    if args.command == 'forms':
+        try:
+            parts = [float(part) for part in args.mix.split('/')]
+            if len(parts) != len(LABEL_DIFFICULTY):
+                raise ValueError(args.mix)
+            mix = dict(zip(LABEL_DIFFICULTY, parts))
+            min_types = {key: int(value) for key, value in (item.split('=') for item in args.min_type)}
+        except ValueError:
+            parser.error("--mix takes three numbers like 30/50/20 and --min-type takes TYPE=N")
+        try:
+            if args.count < 1:
+                raise ValueError("--count must be at least 1")
+            blueprint = FormBlueprint(args.per_week, mix, min_types)
+            generator = FormGenerator(QuizManager().questions, blueprint, args.seed)
+            start = time.perf_counter()
+            forms = generator.generate_many(args.count)
+        except ValueError as e:
+            print_error(str(e))
+            sys.exit(1)
+        elapsed = time.perf_counter() - start
+        report = form_report(forms, generator)
+        if args.output.endswith('.json'):
+            with open(args.output, 'w') as f:
+                json.dump({'report': report, 'forms': [[q.q_id for q in form] for form in forms]}, f, indent=2)
+        else:
+            import csv
+            with open(args.output, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['form', 'position', 'q_id', 'week', 'difficulty', 'type'])
+                for number, form in enumerate(forms, 1):
+                    for position, q in enumerate(form, 1):
+                        writer.writerow([number, position, q.q_id, q.week, q.difficulty, q.q_type])
+        print_success(f"{report['forms']} forms of {report['length']} questions in {elapsed:.2f}s -> {args.output}")
+        print(f"  Blueprint: {args.per_week} per week, "
+              f"{', '.join(f'{n} {d}' for d, n in blueprint.difficulty_counts.items())}"
+              + ''.join(f", {n}+ {t}" for t, n in min_types.items()))
+        print(f"  Most questions shared by two forms: {report['max_overlap']} "
+              f"({report['overlapping_pairs']:.0%} of pairs share any)")
+        print(f"  Times each question is used: {report['exposure_min']}-{report['exposure_max']}")
+        print(f"  Predicted score for an average student: {report['score_min']:.1%}-{report['score_max']:.1%} "
+              f"(target {report['target_score']:.1%})")
+        return
+    if args.command == 'load-test':
+        for option in ('users', 'flows', 'workers'):
+            if getattr(args, option) < 1:
+                print_error(f"--{option} must be at least 1")
+                sys.exit(2)
+        if args.attempts < 0:
+            print_error("--attempts cannot be negative")
+            sys.exit(2)
+        if args.interval <= 0:
+            print_error("--interval must be positive")
+            sys.exit(2)
+        report = load_test(args.users, args.attempts, args.flows, args.workers, args.mode, interval=args.interval)
+        if args.json:
+            print(json.dumps(report, indent=2))
+            return
+        print(f"  {report['users']:,} users, {report['attempts']:,} attempts ({report['data_mb']:.1f} MB data file), "
+              f"{report['workers']} {report['mode']}")
+        print(f"  {report['flows']:,} quiz flows in {report['seconds']:.1f}s ({report['flows_per_second']:.1f}/s)\n")
+        print(f"  {'operation':<14}{'count':>9}{'per sec':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for operation, stats in report['operations'].items():
+            print(f"  {operation:<14}{stats['count']:>9,}{stats['per_second']:>10.1f}{stats['p50_ms']:>10.2f}"
+                  f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+        for operation, count in report['errors'].items():
+            print_warning(f"{operation} failed {count} times")
+        timeline = report['timeline']
+        print(f"\n{Colors.DIM}Timeline:{Colors.RESET}")
+        print(f"  {'seconds':>8}{'cpu %':>8}{'rss MB':>9}{'flows':>8}")
+        rows = timeline[::max(1, len(timeline) // 20)]
+        if rows[-1] is not timeline[-1]:
+            rows.append(timeline[-1])
+        for sample in rows:
+            cpu = f"{sample['cpu_percent']:.0f}" if sample['cpu_percent'] is not None else '-'
+            rss = f"{sample['rss_mb']:.1f}" if sample['rss_mb'] is not None else '-'
+            print(f"  {sample['seconds']:>8.1f}{cpu:>8}{rss:>9}{sample['flows']:>8}")
+        return
+    if args.command == 'bench-startup':
+        best, slowest = benchmark_startup(args.runs)
+        for stage, ms in best.items():
+            print(f"  {stage:<12} {ms:8.1f} ms")
+        print(f"\n{Colors.DIM}Slowest imports:{Colors.RESET}")
+        for ms, name in slowest:
+            print(f"  {name:<30} {ms:6.1f} ms")
+        print()
+        if best['user picker'] > STARTUP_BUDGET_MS:
+            print_error(f"Cold start is over the {STARTUP_BUDGET_MS:g} ms budget")
+            sys.exit(1)
+        print_success(f"Cold start is within the {STARTUP_BUDGET_MS:g} ms budget")
+        return
+    if args.command == 'bench-render':
+        results = benchmark_rendering(args.questions)
+        for mode, latency in results.items():
+            print(f"  {mode:<18} {latency:8.2f} ms/question")
+        print_info(f"Frame renderer is {results['os.system(clear)'] / results['renderer']:.1f}x faster")
+        return
+    
+    renderer = use_terminal_renderer()
     try:
         manager = QuizManager()
         
@@ -2015,6 +6750,9 @@ def main():
             manager.select_user()
         
         if manager.current_user:
+            manager.refresh_recommender()
+            manager.refresh_variants()
+            
             # Show welcome message
             clear_screen()
             print_header("🎓 AWS CLOUD INSTITUTE", Colors.BRIGHT_CYAN)
@@ -2044,6 +6782,9 @@ def main():
         print(f"\n{Colors.RED}Error: {e}{Colors.RESET}")
         import traceback
         traceback.print_exc()
+    finally:
+        if renderer is not None:
+            renderer.uninstall()
 
 if __name__ == "__main__":
     main()